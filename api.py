@@ -0,0 +1,289 @@
+# api.py
+"""
+JSON API (Blueprint)
+
+    GET  /api/v1/draws?before=<회차>&limit=<개수>   당첨 번호 (최신순, 키셋 페이징)
+    GET  /api/v1/stats                             번호별 통계
+    GET  /api/v1/recommend                         로그인 사용자의 추천 번호
+    GET  /api/v1/recommend/tickets?count=<장수>&exclude=1,2&seed=<정수>
+                                                   로그인 사용자의 추천 티켓 여러 장 (최대 10,000장)
+    GET  /api/v1/analyze?numbers=1,2,3,4,5,6       번호 분석 (POST 로 {"numbers": [...]} 도 가능)
+    POST /api/v1/picks  {"tickets": [[...], ...]}  로그인 사용자의 번호 조합 일괄 저장 (최대 100개, 한 트랜잭션)
+
+/api/... 경로는 /api/v1/... 과 같은 응답을 반환합니다.
+
+  - 응답은 공백 없는 JSON 으로 직렬화합니다.
+  - GET 응답에는 강한 ETag 를 붙이고, If-None-Match 가 일치하면 본문을 만들지 않고 304 를 반환합니다.
+      · draws/stats/analyze : (데이터 버전, 회차 수, 최신 회차, 요청 인자) 로 계산 → DB 조회 없이 비교
+      · recommend           : 사용자별 결과이므로 본문의 해시로 계산
+  - 클라이언트가 gzip 을 허용하고 본문이 API_GZIP_MIN_SIZE 바이트 이상이면 gzip 으로 압축합니다.
+    압축 결과는 ETag 별로 캐시하여 같은 데이터를 반복해서 압축하지 않습니다.
+"""
+import gzip
+import hashlib
+import json
+import os
+from datetime import date, datetime
+from functools import wraps
+
+from flask import Blueprint, Response, request, session
+
+from services.cache import DataVersion, TTLCache
+from services.draw_store import DrawStore
+from services.lotto_service import LottoService
+from services.recommend_service import MAX_TICKETS, RecommendService
+from services.stat_service import StatService
+
+api_bp = Blueprint('api', __name__)
+
+API_PREFIXES = ('/api/v1', '/api')
+GZIP_MIN_SIZE = int(os.getenv("API_GZIP_MIN_SIZE", "512"))
+MAX_DRAW_LIMIT = 100
+
+# (ETag, 압축 여부) → 직렬화된 본문
+_body_cache = TTLCache(max_entries=int(os.getenv("API_BODY_CACHE_ENTRIES", "256")), ttl=3600)
+
+
+# =========================
+# 0. 공통 유틸리티
+# =========================
+def api_route(rule, **options):
+    """같은 뷰 함수를 /api/v1<rule> 과 /api<rule> 에 함께 등록합니다."""
+    def decorator(f):
+        for prefix in API_PREFIXES:
+            api_bp.add_url_rule(prefix + rule, endpoint=f"{f.__name__}{prefix.replace('/', '_')}",
+                                view_func=f, **options)
+        return f
+    return decorator
+
+
+def api_login_required(f):
+    """API 용 로그인 확인 (리다이렉트 대신 401 JSON)"""
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if "user_id" not in session:
+            return json_response({'error': '로그인이 필요합니다.'}, status=401)
+        return f(*args, **kwargs)
+    return decorated_function
+
+
+def _json_default(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if hasattr(value, 'item'):
+        # numpy 스칼라
+        return value.item()
+    raise TypeError(f"JSON 으로 변환할 수 없는 값입니다: {type(value).__name__}")
+
+
+def _dumps(payload):
+    return json.dumps(payload, ensure_ascii=False, separators=(',', ':'), default=_json_default).encode('utf-8')
+
+
+def _accepts_gzip():
+    return 'gzip' in request.headers.get('Accept-Encoding', '').lower()
+
+
+def data_etag(kind, *parts):
+    """
+    데이터 버전과 요청 인자로 ETag 값을 만듭니다. (본문을 만들기 전에 계산 가능)
+    당첨 데이터 적재 / 통계 갱신 시 데이터 버전과 최신 회차가 바뀌므로 ETag 도 바뀝니다.
+    """
+    shared_version, _ = DataVersion.current()
+    count, latest = DrawStore.signature() or (0, 0)
+    params = hashlib.sha1(repr(parts).encode('utf-8')).hexdigest()[:12]
+    return f"{kind}-{shared_version or 0}-{count}-{latest}-{params}"
+
+
+def not_modified(etag):
+    """If-None-Match 가 이 ETag(또는 gzip 변형)와 일치하면 304 응답을, 아니면 None 을 반환합니다."""
+    if etag and (request.if_none_match.contains(etag) or request.if_none_match.contains(etag + '-gz')):
+        response = Response(status=304)
+        response.set_etag(etag + '-gz' if request.if_none_match.contains(etag + '-gz') else etag)
+        response.headers['Vary'] = 'Accept-Encoding'
+        return response
+    return None
+
+
+def json_response(payload, status=200, etag=None, max_age=0, private=False):
+    """
+    압축 JSON 응답을 만듭니다.
+    etag 가 있으면 직렬화/압축 결과를 캐시하여 같은 데이터의 반복 요청은 캐시된 바이트를 그대로 보냅니다.
+    """
+    use_gzip = _accepts_gzip()
+    cache_key = (etag, use_gzip) if etag and status == 200 else None
+
+    found, body = _body_cache.get(cache_key) if cache_key else (False, None)
+    if not found:
+        body = _dumps(payload)
+        if use_gzip and len(body) >= GZIP_MIN_SIZE:
+            body = gzip.compress(body, compresslevel=6)
+        if cache_key:
+            _body_cache.set(cache_key, body)
+
+    response = Response(body, status=status, mimetype='application/json')
+    # gzip 여부는 압축 결과의 매직 바이트로 판단 (작은 본문은 압축하지 않음)
+    compressed = use_gzip and body[:2] == b'\x1f\x8b'
+    if compressed:
+        response.headers['Content-Encoding'] = 'gzip'
+    response.headers['Vary'] = 'Accept-Encoding'
+    if etag and status == 200:
+        # 같은 데이터라도 인코딩이 다르면 다른 표현이므로 강한 ETag 를 구분합니다.
+        response.set_etag(etag + '-gz' if compressed else etag)
+        response.headers['Cache-Control'] = f"{'private' if private else 'public'}, max-age={max_age}, must-revalidate"
+    else:
+        response.headers['Cache-Control'] = 'no-store'
+    return response
+
+
+def _parse_numbers(raw):
+    """'1,2,3,4,5,6' 또는 [1, 2, ...] → 정렬된 번호 6개. 잘못된 입력이면 ValueError."""
+    if isinstance(raw, str):
+        raw = [part for part in raw.split(',') if part.strip()]
+    if not isinstance(raw, (list, tuple)) or len(raw) != 6:
+        raise ValueError("6개의 로또 번호를 입력해야 합니다.")
+    try:
+        numbers = [int(n) for n in raw]
+    except (TypeError, ValueError):
+        raise ValueError("로또 번호는 정수여야 합니다.")
+    if not all(1 <= n <= 45 for n in numbers):
+        raise ValueError("로또 번호는 1부터 45 사이여야 합니다.")
+    if len(set(numbers)) != 6:
+        raise ValueError("중복된 번호가 있습니다.")
+    return sorted(numbers)
+
+
+# =========================
+# 1. 당첨 번호
+# =========================
+@api_route('/draws', methods=['GET'])
+def api_draws():
+    before = request.args.get('before', type=int)
+    limit = min(max(request.args.get('limit', 20, type=int), 1), MAX_DRAW_LIMIT)
+
+    etag = data_etag('draws', before, limit)
+    cached_response = not_modified(etag)
+    if cached_response:
+        return cached_response
+
+    data = LottoService.get_paginated_draws(per_page=limit, before=before)
+    payload = {
+        'draws': [
+            {'draw_no': d[0], 'draw_date': d[1], 'numbers': list(d[2:8]), 'bonus': d[8]}
+            for d in data['draws']
+        ],
+        'total_count': data['total_count'],
+        'next_cursor': data['next_cursor'],
+    }
+    return json_response(payload, etag=etag, max_age=60)
+
+
+# =========================
+# 2. 번호별 통계
+# =========================
+@api_route('/stats', methods=['GET'])
+def api_stats():
+    etag = data_etag('stats')
+    cached_response = not_modified(etag)
+    if cached_response:
+        return cached_response
+
+    stats = sorted(StatService.get_all_stats(), key=lambda s: s['number'])
+    # 통계가 아직 없거나 DB 오류인 경우 빈 결과를 ETag 로 고정하지 않음
+    return json_response({'stats': stats}, etag=etag if stats else None, max_age=60)
+
+
+# =========================
+# 3. 추천 번호 (로그인 필요)
+# =========================
+@api_route('/recommend', methods=['GET'])
+@api_login_required
+def api_recommend():
+    success, numbers, details = RecommendService.generate_recommendation(session['user_id'])
+    if not success:
+        return json_response({'error': numbers}, status=503)
+
+    payload = {
+        'numbers': numbers,
+        'details': [
+            {'number': d[0], 'total_score': d[1], 'frequency': d[2], 'last_draw_gap': d[3]}
+            for d in details
+        ],
+    }
+    # 사용자별 결과이므로 본문 해시로 ETag 를 만듭니다. (본문 생성은 캐시에서 오므로 비용이 작음)
+    etag = 'rec-' + hashlib.sha1(_dumps(payload)).hexdigest()[:16]
+    cached_response = not_modified(etag)
+    if cached_response:
+        return cached_response
+    return json_response(payload, etag=etag, private=True)
+
+
+@api_route('/recommend/tickets', methods=['GET'])
+@api_login_required
+def api_recommend_tickets():
+    count = request.args.get('count', 5, type=int)
+    seed = request.args.get('seed', type=int)
+    try:
+        exclude = sorted({int(part) for part in request.args.get('exclude', '').split(',') if part.strip()})
+    except ValueError:
+        return json_response({'error': "제외 번호는 정수여야 합니다."}, status=400)
+    if not 1 <= count <= MAX_TICKETS:
+        return json_response({'error': f"티켓 수는 1~{MAX_TICKETS}장이어야 합니다."}, status=400)
+    if len([n for n in exclude if 1 <= n <= 45]) > 39:
+        return json_response({'error': "제외 후 남은 번호가 6개 미만입니다."}, status=400)
+
+    success, tickets, info = RecommendService.generate_tickets(session['user_id'], count=count,
+                                                               exclude=exclude, seed=seed)
+    if not success:
+        return json_response({'error': tickets, 'conditions': info}, status=400 if info else 503)
+    # 매번 새로 뽑는 결과이므로 ETag/캐시 없이 반환 (seed 를 주면 같은 결과를 재현)
+    return json_response({'count': len(tickets), 'conditions': info, 'tickets': tickets})
+
+
+# =========================
+# 4. 번호 분석
+# =========================
+@api_route('/analyze', methods=['GET', 'POST'])
+def api_analyze():
+    if request.method == 'POST':
+        raw = (request.get_json(silent=True) or {}).get('numbers')
+    else:
+        raw = request.args.get('numbers', '')
+    try:
+        numbers = _parse_numbers(raw)
+    except ValueError as e:
+        return json_response({'error': str(e)}, status=400)
+
+    etag = data_etag('analyze', numbers) if request.method == 'GET' else None
+    cached_response = not_modified(etag)
+    if cached_response:
+        return cached_response
+
+    history, comments, detailed_stats = LottoService.check_pick_analysis(numbers)
+    if not history.get('total_draws'):
+        # 분석 실패(또는 데이터 없음) 결과는 캐시/ETag 대상에서 제외
+        etag = None
+    payload = {
+        'numbers': numbers,
+        'total_draws': history.get('total_draws', 0),
+        'ranks': {rank: history.get(rank, 0) for rank in (1, 2, 3, 4, 5, 0)},
+        'winning_draws': history.get('winning_draws', {}),
+        'patterns': history.get('patterns'),
+        'comments': comments,
+        'stats': detailed_stats,
+    }
+    return json_response(payload, etag=etag, max_age=60)
+
+
+# =========================
+# 5. 번호 일괄 저장 (로그인 필요)
+# =========================
+@api_route('/picks', methods=['POST'])
+@api_login_required
+def api_save_picks():
+    payload = request.get_json(silent=True)
+    tickets = payload.get('tickets') if isinstance(payload, dict) else payload
+    success, result = LottoService.save_user_picks(session['user_id'], tickets)
+    if not success:
+        return json_response({'error': result}, status=400)
+    return json_response({'count': len(result), 'pick_ids': result}, status=201)
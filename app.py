@@ -1,6 +1,7 @@
 # app.py
-from flask import Flask, render_template, request, redirect, session, url_for, flash
+from flask import Flask, render_template, request, redirect, session, url_for, flash, jsonify, Response
 from dotenv import load_dotenv
+import hmac
 import os
 from functools import wraps 
 
@@ -9,9 +10,17 @@ load_dotenv()
 
 # 서비스 레이어에서 비즈니스 로직과 DB 접근을 처리합니다.
 from services.user_service import UserService 
-from services.lotto_service import LottoService
+from services.lotto_service import LottoService, pick_history_cache
 from services.stat_service import StatService
 from services.recommend_service import RecommendService
+from services.reconcile_service import ReconcileService
+from services.cache import cache_stats
+from services.password_hasher import PasswordHasher, PasswordHasherBusyError
+from services.result_store import result_store
+from db.db_config import get_pool, close_pool
+from db.migrations import bootstrap_schema
+from api import api_bp
+import metrics
 
 app = Flask(__name__)
 # 세션 관리를 위한 SECRET_KEY 설정
@@ -23,6 +32,30 @@ if not secret_key or len(secret_key) < 16:
 else:
     app.secret_key = secret_key
 
+# JSON API (/api/v1/..., /api/...)
+app.register_blueprint(api_bp)
+
+# /recommend?tickets=N 페이지에서 한 번에 보여줄 최대 추천 티켓 수 (API 는 최대 10,000장)
+RECOMMEND_PAGE_MAX_TICKETS = 50
+
+# 요청/쿼리 계측 (/admin/metrics 로 조회, METRICS_ENABLED=0 이면 끔)
+metrics.init_app(app)
+metrics.registry.register_collector('db_pool', lambda: get_pool().status())
+metrics.registry.register_collector('cache', cache_stats)
+metrics.registry.register_collector('pick_history_cache', pick_history_cache.stats)
+metrics.registry.register_collector('password_hasher', PasswordHasher.stats)
+
+# 테이블/추천 VIEW 등 DDL 은 서버 시작 시 한 번만 실행합니다. (요청 경로에서는 조회만)
+# 운영 환경에서 DDL 권한이 없거나 별도로 관리하는 경우 DB_BOOTSTRAP_ON_STARTUP=0 으로 끌 수 있습니다.
+if os.getenv("DB_BOOTSTRAP_ON_STARTUP", "1") == "1":
+    try:
+        bootstrap_schema()
+    except Exception as e:
+        print(f"🚨 스키마 부트스트랩 실패 (DB 연결 확인 필요): {e}")
+    finally:
+        # 모듈을 읽는 프로세스는 fork 하는 서버의 부모일 수 있으므로, 부트스트랩에 쓴 연결을 남겨 두지 않습니다.
+        close_pool()
+
 # =========================
 # 0. 유틸리티 및 데코레이터
 # =========================
@@ -58,6 +91,14 @@ def get_ball_color_class(number):
         return 'ball-5'
     return '' 
 
+@app.errorhandler(PasswordHasherBusyError)
+def password_hasher_busy(e):
+    """비밀번호 해싱 대기열이 가득 찬 경우 429 로 응답합니다. (다른 라우트의 응답 속도를 지키기 위한 back-pressure)"""
+    flash(f"⏳ {e}", 'warning')
+    template = "signup.html" if request.endpoint == "signup" else "login.html"
+    title = "회원가입" if request.endpoint == "signup" else "로그인"
+    return render_template(template, title=title), 429, {"Retry-After": "2"}
+
 @app.context_processor
 def utility_processor():
     # 'getBallColorClass' 이름으로 위 함수를 Jinja 템플릿에 등록
@@ -154,10 +195,11 @@ def lotto_data():
     # 당첨 데이터 조회는 로그인 없이도 가능하도록 처리
     
     page = request.args.get('page', 1, type=int)
+    before = request.args.get('before', None, type=int) # 키셋 커서 (이 회차보다 이전 회차부터 조회)
     per_page = 20 # 한 페이지에 표시할 데이터 수
 
-    # LottoService를 통해 페이징된 데이터 가져오기 (SFW, ORDER BY, LIMIT 적용)
-    data = LottoService.get_paginated_draws(page, per_page)
+    # LottoService를 통해 페이징된 데이터 가져오기 (SFW, ORDER BY, LIMIT 적용 - OFFSET 없이 draw_no 커서 사용)
+    data = LottoService.get_paginated_draws(page, per_page, before)
     
     # lotto_data.html 템플릿은 별도로 생성해야 합니다.
     return render_template("lotto_data.html", 
@@ -251,23 +293,12 @@ def statistics_page():
     # 1. 정렬 기준 및 순서 파라미터 읽기 (기본값: frequency 내림차순)
     sort_by = request.args.get('sort', 'frequency')
     sort_order = request.args.get('order', 'desc')
-    reverse_flag = sort_order == 'desc'
 
     # 2. StatService를 통해 LOTTO_STAT 테이블의 모든 통계 데이터를 조회합니다.
     stats = StatService.get_all_stats() 
     
     # 3. Python 로직을 사용하여 데이터 정렬
-    try:
-        # last_draw_gap에 None이 있을 경우, -1로 처리하여 가장 낮은 값으로 둡니다.
-        if sort_by == 'last_draw_gap':
-            stats.sort(key=lambda x: x.get(sort_by) if x.get(sort_by) is not None else -1, reverse=reverse_flag)
-        else:
-            # frequency나 number는 None이 없으므로 단순 키 정렬
-            stats.sort(key=lambda x: x[sort_by], reverse=reverse_flag)
-            
-    except KeyError:
-        # 잘못된 정렬 기준이 들어왔을 경우 기본값(frequency 내림차순)으로 재정렬
-        stats.sort(key=lambda x: x['frequency'], reverse=True)
+    if not StatService.sort_stats(stats, sort_by, sort_order):
         flash("유효하지 않은 정렬 기준입니다. 기본 정렬(출현 횟수 내림차순)으로 표시됩니다.", 'warning')
 
     # 정렬된 데이터를 템플릿에 전달합니다.
@@ -285,16 +316,27 @@ def update_statistics_route():
         flash("❌ 접근 거부: 관리자 권한이 필요합니다.", 'error')
         return redirect(url_for('mypage')) 
 
-    # 통계 갱신 실행 
-    success, msg = StatService.update_statistics()
+    # 통계 갱신 실행 (기본: 증분 갱신, 관리자 페이지에서 전체 재계산/검증 선택 가능)
+    mode = request.form.get('mode', 'incremental')
+    if mode not in StatService.UPDATE_MODES:
+        flash("❌ 알 수 없는 통계 갱신 모드입니다.", 'error')
+        return redirect(url_for('admin_stats_management'))
+    success, msg = StatService.update_statistics(mode)
 
     if success:
-        # ⭐ 신규 기능: 통계 갱신 성공 시, 추천 시스템을 위한 VIEW도 갱신합니다. ⭐
-        # RecommendService를 import했는지 확인 (app.py 상단에 from services.recommend_service import RecommendService)
-        from services.recommend_service import RecommendService
-        RecommendService.create_recommend_view_only()
-        
-        flash(f"✅ 통계 데이터 갱신 성공 및 추천 VIEW 갱신 완료: {msg}", 'success')
+        # ⭐ 통계 갱신 성공 시, 추천 시스템을 위한 VIEW도 갱신합니다. ⭐
+        # (MATERIALIZED VIEW 모드에서는 CONCURRENTLY 갱신이므로 /recommend 조회가 막히지 않습니다.)
+        if RecommendService.refresh_recommend_view():
+            flash(f"✅ 통계 데이터 갱신 성공 및 추천 VIEW 갱신 완료: {msg}", 'success')
+        else:
+            flash(f"⚠️ 통계 데이터는 갱신되었으나 추천 VIEW 갱신에 실패했습니다: {msg}", 'warning')
+
+        # 적재 스크립트 밖에서 추가된 회차가 있을 수 있으므로 저장 번호 정산도 함께 실행합니다. (미정산 번호만 처리)
+        reconciled, summary = ReconcileService.reconcile_picks()
+        if reconciled:
+            flash(f"🎯 {ReconcileService.describe(summary)}", 'success')
+        else:
+            flash(f"⚠️ 저장 번호 정산 실패: {summary}", 'warning')
     else:
         flash(f"❌ 통계 데이터 갱신 실패: {msg}", 'error')
 
@@ -321,8 +363,62 @@ def admin_stats_management():
     return render_template(
         'admin_stats.html', 
         title="관리자 - 통계 관리",
-        stats_count=stats_count # 템플릿에 통계 개수 전달
+        stats_count=stats_count, # 템플릿에 통계 개수 전달
+        cache_stats=cache_stats(), # 조회 캐시 적중/실패 현황
+        profiler=metrics.profiler.status() # 느린 요청 프로파일러 상태
     )
+
+
+# =========================
+# 9-B. 계측 지표 (Admin 또는 METRICS_TOKEN)
+# =========================
+def _metrics_authorized():
+    # 관리자 세션 또는 Prometheus 수집기용 Bearer 토큰
+    if session.get('is_admin'):
+        return True
+    token = os.getenv("METRICS_TOKEN")
+    auth = request.headers.get('Authorization', '')
+    return bool(token) and auth.startswith('Bearer ') and hmac.compare_digest(auth[7:], token)
+
+@app.route('/admin/metrics')
+def admin_metrics():
+    """
+    라우트별/쿼리 지문별 지연 시간 히스토그램, 카운터, 풀/캐시/해싱 상태를 반환합니다.
+    ?format=prometheus (또는 Accept: text/plain) 이면 Prometheus 텍스트 형식으로 응답합니다.
+    """
+    if not _metrics_authorized():
+        return jsonify(success=False, message="❌ 접근 거부: 관리자 권한이 필요합니다."), 403
+
+    wants_text = request.args.get('format') == 'prometheus' or (
+        request.accept_mimetypes.best_match(['application/json', 'text/plain']) == 'text/plain'
+    )
+    if wants_text:
+        return Response(metrics.registry.prometheus_text(), mimetype='text/plain; version=0.0.4')
+    top = request.args.get('top', 50, type=int)
+    return jsonify(success=True, enabled=metrics.ENABLED, **metrics.registry.snapshot(top_queries=top))
+
+@app.route('/admin/metrics/profiler', methods=['POST'])
+def admin_metrics_profiler():
+    """느린 요청 샘플링 프로파일러를 켜고 끕니다. (form 또는 JSON: enabled, threshold_ms, interval_ms)"""
+    if not session.get('is_admin'):
+        flash("❌ 접근 거부: 관리자 권한이 필요합니다.", 'error')
+        return redirect(url_for('index'))
+
+    payload = request.get_json(silent=True) or request.form
+    try:
+        enabled = str(payload.get('enabled', '')).lower() in ('1', 'true', 'on')
+        threshold_ms = int(payload['threshold_ms']) if payload.get('threshold_ms') else None
+        interval_ms = int(payload['interval_ms']) if payload.get('interval_ms') else None
+    except (TypeError, ValueError):
+        flash("❌ 프로파일러 설정 값은 정수여야 합니다.", 'error')
+        return redirect(url_for('admin_stats_management'))
+
+    metrics.profiler.configure(enabled, threshold_ms, interval_ms)
+    if request.is_json:
+        return jsonify(success=True, profiler=metrics.profiler.status())
+    state = "켜짐" if enabled else "꺼짐"
+    flash(f"✅ 느린 요청 프로파일러: {state} (기준 {metrics.profiler.threshold_ms}ms)", 'success')
+    return redirect(url_for('admin_stats_management'))
     
 
 # =========================
@@ -360,13 +456,27 @@ def recommend_page():
         print(f"Recommend Service Error: {recommended_numbers}")
         flash(f"❌ 번호 추천에 실패했습니다: {recommended_numbers}", 'error')
     
+    # ?tickets=N 이면 가중치 샘플링으로 서로 다른 추천 티켓 N 장을 함께 생성 (최대 RECOMMEND_PAGE_MAX_TICKETS)
+    tickets, ticket_info = [], {}
+    ticket_count = request.args.get('tickets', type=int)
+    if success and ticket_count:
+        ticket_count = max(1, min(ticket_count, RECOMMEND_PAGE_MAX_TICKETS))
+        ok, tickets, ticket_info = RecommendService.generate_tickets(user_id, count=ticket_count)
+        if not ok:
+            flash(tickets, 'error')
+            tickets = []
+
     # 템플릿 렌더링
     return render_template(
         'recommend.html', 
         title="번호 추천",
         is_success=success,
         recommended_numbers=recommended_numbers, 
-        detailed_stats=detailed_stats
+        detailed_stats=detailed_stats,
+        tickets=tickets,
+        ticket_info=ticket_info,
+        ticket_count=ticket_count or 5,
+        max_tickets=RECOMMEND_PAGE_MAX_TICKETS
     )
 
 
@@ -403,6 +513,29 @@ def save_recommended_pick():
         # message는 실패 이유를 담고 있습니다.
         flash(f"❌ 번호 저장 실패: {message}", 'error')
         return redirect(url_for('recommend_page'))
+
+
+@app.route('/save_picks', methods=['POST'])
+@login_required
+def save_recommended_picks():
+    """추천 티켓 여러 장 일괄 저장 (폼 필드 ticket = "n1,n2,n3,n4,n5,n6" 를 여러 개 전송)"""
+    user_id = session.get('user_id')
+
+    try:
+        tickets = [[int(n) for n in value.split(',')] for value in request.form.getlist('ticket')]
+    except ValueError as e:
+        print(f"Save Picks Error: {e}")
+        flash("❌ 번호 저장 실패: 유효하지 않은 번호 형식입니다. 다시 시도해 주세요.", 'error')
+        return redirect(url_for('recommend_page'))
+
+    success, result = LottoService.save_user_picks(user_id, tickets)
+
+    if success:
+        flash(f"✅ 로또 번호 {len(result)}개가 나의 목록에 성공적으로 저장되었습니다.", 'success')
+        return redirect(url_for('my_picks'))
+    else:
+        flash(f"❌ 번호 저장 실패: {result}", 'error')
+        return redirect(url_for('recommend_page'))
     
     
     
@@ -412,14 +545,15 @@ def save_recommended_pick():
 @app.route('/check_pick', methods=['GET', 'POST'])
 @login_required 
 def check_pick_analysis_route():
-    # 1. GET: 세션에서 이전 분석 결과를 안전하게 가져옵니다.
-    comments = session.pop('analysis_comments', None)
-    detailed_stats = session.pop('analysis_detailed_stats', None)
-    input_numbers = session.pop('analysis_input_numbers', None)
-    history_analysis_results = session.pop('analysis_history_analysis_results', None)
+    # 1. GET: 세션에는 토큰만 있고, 이전 분석 결과는 서버 측 저장소에서 꺼냅니다. (한 번 표시 후 삭제)
+    stored = result_store.pop(session.pop('analysis_token', None), owner=session.get('user_id')) or {}
+    comments = stored.get('comments')
+    detailed_stats = stored.get('detailed_stats')
+    input_numbers = stored.get('input_numbers')
+    history_analysis_results = stored.get('history_analysis_results')
     
     # total_score 처리 로직 (이전 TypeError 방지 로직)
-    total_score = session.pop('analysis_total_score', None)
+    total_score = stored.get('total_score')
     if total_score is not None:
         try:
             total_score = float(total_score)
@@ -454,16 +588,20 @@ def check_pick_analysis_route():
             # 3. total_score 계산 (템플릿에 전달할 전체 점수 합계)
             current_total_score = None
             if detailed_stats:
-                # detailed_stats의 두 번째 요소(인덱스 1)가 total_score라고 가정하고 합산합니다.
-                # (detailed_stats 구조: [(number, total_score, frequency, last_draw_gap), ...])
-                current_total_score = sum(stat[1] for stat in detailed_stats if isinstance(stat, (list, tuple)) and len(stat) > 1 and isinstance(stat[1], (int, float)))
-
-            
-            # 4. 분석 결과를 세션에 저장 ⭐이 부분이 누락되었을 가능성이 높습니다.⭐
-            session['analysis_comments'] = comments
-            session['analysis_detailed_stats'] = detailed_stats
-            session['analysis_input_numbers'] = input_numbers
-            session['analysis_total_score'] = current_total_score # float 또는 None
+                # detailed_stats 구조: [{'number':.., 'frequency':.., 'last_draw_gap':.., 'total_score':..}, ...]
+                current_total_score = sum(
+                    stat.get('total_score', 0) for stat in detailed_stats
+                    if isinstance(stat, dict) and isinstance(stat.get('total_score'), (int, float))
+                )
+
+            # 4. 분석 결과는 서버 측 저장소에 두고, 세션(쿠키)에는 토큰만 저장합니다.
+            session['analysis_token'] = result_store.put({
+                'comments': comments,
+                'detailed_stats': detailed_stats,
+                'input_numbers': input_numbers,
+                'history_analysis_results': history_analysis_results,
+                'total_score': current_total_score, # float 또는 None
+            }, owner=session.get('user_id'))
 
             flash("✅ 입력하신 번호의 통계 분석이 완료되었습니다.", 'success') #
             
@@ -479,7 +617,7 @@ def check_pick_analysis_route():
             return redirect(url_for('check_pick_analysis_route'))
 
     # 3. GET: 템플릿 렌더링
-    # 세션에서 가져온 결과를 템플릿에 전달합니다.
+    # 저장소에서 가져온 결과를 템플릿에 전달합니다.
     return render_template(
         'check_pick.html', 
         title="내 번호 통계 분석",
@@ -489,7 +627,45 @@ def check_pick_analysis_route():
         history_analysis_results=history_analysis_results,       
         total_score=total_score # float 또는 None
     )
-        
-    
+
+
+# =========================
+# 13-A. 여러 티켓 일괄 분석 (JSON)
+# =========================
+@app.route('/check_pick/batch', methods=['POST'])
+@login_required
+def check_pick_batch_route():
+    """
+    여러 티켓을 전체 당첨 이력과 한 번에 비교하여 티켓별 등수 히스토그램을 반환합니다.
+
+    요청 형식 (셋 중 하나):
+      - JSON  {"tickets": [[1, 2, 3, 4, 5, 6], ...]}
+      - JSON  {"source": "my_picks"}   → 로그인 사용자가 저장한 모든 번호
+      - multipart 파일 업로드 (필드명 file), 한 줄에 번호 6개 (쉼표 또는 공백 구분)
+    """
+    uploaded = request.files.get('file')
+    if uploaded:
+        tickets = []
+        for line_no, line in enumerate(uploaded.read().decode('utf-8-sig').splitlines(), start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                tickets.append([int(x) for x in line.replace(',', ' ').split()])
+            except ValueError:
+                return jsonify(success=False, message=f"❌ {line_no}번째 줄: 번호는 정수여야 합니다."), 400
+        success, result = LottoService.check_picks_batch(tickets)
+    else:
+        payload = request.get_json(silent=True) or {}
+        if payload.get('source') == 'my_picks':
+            success, result = LottoService.check_user_picks_batch(session['user_id'])
+        else:
+            success, result = LottoService.check_picks_batch(payload.get('tickets'))
+
+    if not success:
+        return jsonify(success=False, message=result), 400
+    return jsonify(success=True, **result)
+
+
 if __name__ == "__main__":
     app.run(debug=True)
\ No newline at end of file
@@ -0,0 +1,131 @@
+# asgi.py
+"""
+ASGI 진입점.
+
+    uvicorn asgi:application --workers 1
+
+  - /lotto, /statistics (GET/HEAD) : asyncpg 로 조회하고, 기존 Flask 템플릿으로 렌더링합니다.
+                                     DB 왕복 동안 이벤트 루프가 다른 요청을 처리하므로
+                                     프로세스 하나로 수백 개의 동시 요청을 처리할 수 있습니다.
+  - 그 밖의 모든 경로               : 기존 Flask 앱(app.py)을 그대로 실행합니다. (asgiref WsgiToAsgi, 스레드 풀)
+
+세션 쿠키, flash 메시지, url_for 등은 Flask 요청 컨텍스트 안에서 렌더링하므로 WSGI 모드와 동일하게 동작합니다.
+"""
+from asgiref.wsgi import WsgiToAsgi
+from flask import flash, render_template, request
+
+from app import app as flask_app
+from db.async_db import close_async_pool
+from services.async_service import AsyncLottoService, AsyncStatService
+from services.stat_service import StatService
+
+wsgi_fallback = WsgiToAsgi(flask_app)
+
+
+# =========================
+# 0. Flask 요청 컨텍스트 / 응답 변환
+# =========================
+def _request_context(scope):
+    """ASGI scope 로 Flask 요청 컨텍스트를 만듭니다. (세션 쿠키, 쿼리 문자열, Host 등 포함)"""
+    headers = [(k.decode('latin-1'), v.decode('latin-1')) for k, v in scope.get('headers', [])]
+    client = scope.get('client') or ('', 0)
+    server = scope.get('server') or ('localhost', 80)
+    return flask_app.test_request_context(
+        path=scope.get('root_path', '') + scope['path'],
+        base_url=f"{scope.get('scheme', 'http')}://{server[0]}:{server[1]}{scope.get('root_path', '')}",
+        query_string=scope.get('query_string', b'').decode('latin-1'),
+        method=scope['method'],
+        headers=headers,
+        environ_base={'REMOTE_ADDR': client[0]},
+    )
+
+
+async def _send_response(send, response, head_only=False):
+    body = b'' if head_only else response.get_data()
+    await send({
+        'type': 'http.response.start',
+        'status': response.status_code,
+        'headers': [(k.lower().encode('latin-1'), v.encode('latin-1')) for k, v in response.headers.items()],
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+
+def _render(scope, view):
+    """
+    view(request) 를 Flask 요청 컨텍스트 안에서 실행하고 완성된 Response 를 반환합니다.
+    before_request / after_request 훅과 세션 저장(flash 등)도 WSGI 모드와 같이 수행합니다.
+    """
+    with _request_context(scope):
+        response = flask_app.preprocess_request()
+        if response is None:
+            response = view()
+        response = flask_app.make_response(response)
+        return flask_app.process_response(response)
+
+
+# =========================
+# 1. 비동기 라우트
+# =========================
+async def lotto_data(scope):
+    with _request_context(scope):
+        page = request.args.get('page', 1, type=int)
+        before = request.args.get('before', None, type=int)
+    per_page = 20
+
+    data = await AsyncLottoService.get_paginated_draws(page, per_page, before)
+
+    return _render(scope, lambda: render_template("lotto_data.html", title="당첨 번호 조회", data=data))
+
+
+async def statistics_page(scope):
+    with _request_context(scope):
+        sort_by = request.args.get('sort', 'frequency')
+        sort_order = request.args.get('order', 'desc')
+
+    stats = await AsyncStatService.get_all_stats()
+    valid = StatService.sort_stats(stats, sort_by, sort_order)
+
+    def view():
+        if not valid:
+            flash("유효하지 않은 정렬 기준입니다. 기본 정렬(출현 횟수 내림차순)으로 표시됩니다.", 'warning')
+        return render_template('statistics.html', title="번호 통계", stats=stats)
+
+    return _render(scope, view)
+
+
+ASYNC_ROUTES = {
+    '/lotto': lotto_data,
+    '/statistics': statistics_page,
+}
+
+
+# =========================
+# 2. ASGI 애플리케이션
+# =========================
+async def _lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await close_async_pool()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def application(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        await _lifespan(receive, send)
+        return
+
+    handler = ASYNC_ROUTES.get(scope.get('path')) if scope['type'] == 'http' else None
+    if handler is None or scope['method'] not in ('GET', 'HEAD'):
+        await wsgi_fallback(scope, receive, send)
+        return
+
+    try:
+        response = await handler(scope)
+    except Exception as e:
+        print(f"ASGI Error ({scope['path']}): {e}")
+        response = flask_app.response_class("Internal Server Error", status=500, mimetype='text/plain')
+    await _send_response(send, response, head_only=scope['method'] == 'HEAD')
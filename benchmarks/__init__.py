@@ -0,0 +1,12 @@
+"""
+부하 테스트 벤치마크 모음.
+
+    python -m benchmarks.run --temp-db --scale 10000 --picks 1000000 -c 50 -n 5000 -o bench.json
+    python -m benchmarks.compare before.json after.json
+
+  - pg_local   : initdb/pg_ctl 로 임시 PostgreSQL 클러스터를 띄웁니다. (로컬 DB 대용)
+  - seed       : 스키마 생성 + CSV 적재 + 가상 회차/사용자/번호로 데이터 규모 확대
+  - http_load  : asyncio 기반 HTTP/1.1 부하 발생기 (쿠키 세션, 폼 POST 지원)
+  - run        : 앱 서버 실행 → 주요 경로 부하 → 경로별 p50/p95/p99, 처리량을 JSON 으로 저장
+  - compare    : 두 결과 JSON 비교 (커밋 간 성능 회귀 확인)
+"""
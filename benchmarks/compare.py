@@ -0,0 +1,83 @@
+# benchmarks/compare.py
+"""
+두 벤치마크 결과(JSON)를 경로별로 비교합니다.
+
+    python -m benchmarks.compare before.json after.json [--threshold 10]
+
+지연 시간은 증가, 처리량은 감소가 회귀이며 --threshold(%) 를 넘는 회귀가 있으면 종료 코드 1 을 반환합니다.
+"""
+import argparse
+import json
+import sys
+
+METRICS = ('rps', 'p50', 'p95', 'p99')
+
+
+def _metric(route, name):
+    if route is None:
+        return None
+    return route['rps'] if name == 'rps' else route['latency_ms'].get(name)
+
+
+def _change(before, after):
+    if before in (None, 0) or after is None:
+        return None
+    return (after - before) / before * 100
+
+
+def compare(before, after, threshold=10.0):
+    """경로별 {지표: (이전, 이후, 변화율%)} 와 회귀 목록을 반환합니다."""
+    routes_before = {**before['results']['routes'], 'TOTAL': before['results']['total']}
+    routes_after = {**after['results']['routes'], 'TOTAL': after['results']['total']}
+
+    rows, regressions = {}, []
+    for name in [*routes_before, *(r for r in routes_after if r not in routes_before)]:
+        rows[name] = {}
+        for metric in METRICS:
+            old, new = _metric(routes_before.get(name), metric), _metric(routes_after.get(name), metric)
+            change = _change(old, new)
+            rows[name][metric] = (old, new, change)
+            if change is None:
+                continue
+            # 처리량은 감소, 지연 시간은 증가가 회귀
+            worse = -change if metric == 'rps' else change
+            if worse > threshold:
+                regressions.append((name, metric, round(change, 1)))
+    return rows, regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="두 벤치마크 결과 JSON 을 비교합니다.")
+    parser.add_argument('before')
+    parser.add_argument('after')
+    parser.add_argument('--threshold', type=float, default=10.0, help="회귀로 판단할 변화율(%%)")
+    args = parser.parse_args(argv)
+
+    with open(args.before, encoding='utf-8') as f:
+        before = json.load(f)
+    with open(args.after, encoding='utf-8') as f:
+        after = json.load(f)
+
+    print(f"before: {(before['meta'].get('commit') or '?')[:10]} ({before['meta'].get('timestamp')})")
+    print(f"after : {(after['meta'].get('commit') or '?')[:10]} ({after['meta'].get('timestamp')})")
+    if before.get('config', {}).get('mix') != after.get('config', {}).get('mix'):
+        print("⚠️ 두 결과의 경로 혼합(mix)이 다릅니다. 비교 결과 해석에 주의하세요.")
+
+    rows, regressions = compare(before, after, args.threshold)
+    print(f"{'route':<12}" + "".join(f"{m:>24}" for m in METRICS))
+    for name, metrics in rows.items():
+        cells = []
+        for metric in METRICS:
+            old, new, change = metrics[metric]
+            cells.append(f"{old!s:>8} → {new!s:<8}" + (f"{change:+6.1f}%" if change is not None else "      -"))
+        print(f"{name:<12}" + "".join(f"{c:>24}" for c in cells))
+
+    if regressions:
+        print(f"\n❌ {args.threshold}% 를 넘는 회귀: " + ", ".join(f"{n}.{m} {c:+}%" for n, m, c in regressions))
+        return 1
+    print("\n✅ 회귀 없음")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,190 @@
+# benchmarks/http_load.py
+"""
+asyncio 기반 HTTP/1.1 부하 발생기 (외부 패키지 없음).
+
+  - 가상 사용자(연결) 하나가 keep-alive 연결 하나와 쿠키 저장소를 가집니다.
+  - 시나리오의 각 동작(op)은 이름과 가중치, 요청을 보내는 코루틴으로 구성되며
+    동작 이름별로 지연 시간(여러 요청으로 이루어진 동작은 전체 시간)을 따로 집계합니다.
+
+    async def lotto(client, rng):
+        return await client.get(f"/lotto?page={rng.randint(1, 50)}")
+
+    result = await run_load("http://127.0.0.1:5000", [("lotto", 1, lotto)], concurrency=50, requests=5000)
+"""
+import asyncio
+import random
+import time
+from urllib.parse import urlencode, urlsplit
+
+
+class HttpClient:
+    """keep-alive 연결 하나 + 쿠키 저장소"""
+
+    def __init__(self, url):
+        self.base = urlsplit(url)
+        self.cookies = {}
+        self._reader = None
+        self._writer = None
+
+    async def _connect(self):
+        self._reader, self._writer = await asyncio.open_connection(self.base.hostname, self.base.port or 80)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+        self._reader = self._writer = None
+
+    async def _read_response(self):
+        """응답 하나를 읽고 (상태 코드, 헤더 목록, 본문 길이, 연결 유지 여부)를 반환합니다."""
+        reader = self._reader
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionError("서버가 연결을 닫았습니다.")
+        status = int(status_line.split()[1])
+        headers = []
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            key, _, value = line.decode('latin-1').partition(':')
+            headers.append((key.strip().lower(), value.strip()))
+        header_map = dict(headers)
+
+        length = 0
+        if header_map.get('transfer-encoding', '').lower() == 'chunked':
+            while True:
+                size = int((await reader.readline()).split(b';')[0], 16)
+                await reader.readexactly(size + 2)
+                length += size
+                if size == 0:
+                    break
+        elif 'content-length' in header_map:
+            length = int(header_map['content-length'])
+            await reader.readexactly(length)
+
+        connection = header_map.get('connection', '').lower()
+        if status_line.startswith(b'HTTP/1.0'):
+            keep_alive = connection == 'keep-alive'
+        else:
+            keep_alive = connection != 'close'
+        return status, headers, length, keep_alive
+
+    def _store_cookies(self, headers):
+        for key, value in headers:
+            if key != 'set-cookie':
+                continue
+            pair = value.split(';', 1)[0]
+            name, _, cookie_value = pair.partition('=')
+            if cookie_value:
+                self.cookies[name.strip()] = cookie_value.strip()
+            else:
+                # 빈 값 + 만료 = 쿠키 삭제
+                self.cookies.pop(name.strip(), None)
+
+    async def request(self, method, path, form=None, headers=None):
+        """요청 하나를 보내고 (상태 코드, 본문 길이)를 반환합니다. 연결이 끊겨 있으면 다시 연결합니다."""
+        body = urlencode(form).encode() if form is not None else b''
+        lines = [f"{method} {path} HTTP/1.1", f"Host: {self.base.netloc}", "Accept-Encoding: identity"]
+        if self.cookies:
+            lines.append("Cookie: " + "; ".join(f"{k}={v}" for k, v in self.cookies.items()))
+        if form is not None:
+            lines.append("Content-Type: application/x-www-form-urlencoded")
+            lines.append(f"Content-Length: {len(body)}")
+        for key, value in (headers or {}).items():
+            lines.append(f"{key}: {value}")
+        payload = ("\r\n".join(lines) + "\r\n\r\n").encode('latin-1') + body
+
+        for attempt in range(2):
+            if self._writer is None:
+                await self._connect()
+            try:
+                self._writer.write(payload)
+                await self._writer.drain()
+                status, response_headers, length, keep_alive = await self._read_response()
+                break
+            except (ConnectionError, asyncio.IncompleteReadError):
+                # keep-alive 연결이 서버 쪽에서 닫힌 경우 한 번만 다시 연결
+                self.close()
+                if attempt:
+                    raise
+        self._store_cookies(response_headers)
+        if not keep_alive:
+            self.close()
+        return status, length
+
+    async def get(self, path):
+        return (await self.request("GET", path))[0]
+
+    async def post(self, path, form):
+        return (await self.request("POST", path, form=form))[0]
+
+
+def _percentile(sorted_values, q):
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * q))]
+
+
+def summarize_latencies(latencies, errors, elapsed):
+    latencies = sorted(latencies)
+    return {
+        'ok': len(latencies),
+        'errors': errors,
+        'rps': round(len(latencies) / elapsed, 1) if elapsed > 0 else 0.0,
+        'latency_ms': {
+            name: round(_percentile(latencies, q) * 1000, 2) if latencies else None
+            for name, q in (('p50', 0.50), ('p95', 0.95), ('p99', 0.99), ('max', 1.0))
+        },
+    }
+
+
+async def run_load(url, ops, concurrency, requests, setup=None, seed=0, timeout=600):
+    """
+    ops     : [(이름, 가중치, async fn(client, rng) -> 상태 코드), ...]
+    setup   : async fn(client, worker_index) — 가상 사용자별 준비 (로그인 등). 측정에 포함하지 않음
+    반환    : {'seconds', 'total': {...}, 'routes': {이름: {...}}}
+    """
+    names = [name for name, _, _ in ops]
+    weights = [weight for _, weight, _ in ops]
+    funcs = {name: fn for name, _, fn in ops}
+    latencies = {name: [] for name in names}
+    errors = {name: {} for name in names}
+    remaining = [requests]
+    deadline = time.monotonic() + timeout
+
+    async def worker(index):
+        rng = random.Random(seed * 100_003 + index)
+        client = HttpClient(url)
+        try:
+            if setup is not None:
+                await setup(client, index)
+            while remaining[0] > 0 and time.monotonic() < deadline:
+                remaining[0] -= 1
+                name = rng.choices(names, weights)[0]
+                started = time.perf_counter()
+                try:
+                    status = await funcs[name](client, rng)
+                except Exception as e:
+                    errors[name][type(e).__name__] = errors[name].get(type(e).__name__, 0) + 1
+                    client.close()
+                    continue
+                if status >= 400:
+                    errors[name][str(status)] = errors[name].get(str(status), 0) + 1
+                else:
+                    latencies[name].append(time.perf_counter() - started)
+        finally:
+            client.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*[worker(i) for i in range(concurrency)])
+    elapsed = time.perf_counter() - started
+
+    all_errors = {}
+    for route_errors in errors.values():
+        for key, count in route_errors.items():
+            all_errors[key] = all_errors.get(key, 0) + count
+    return {
+        'seconds': round(elapsed, 3),
+        'total': summarize_latencies([v for values in latencies.values() for v in values], all_errors, elapsed),
+        'routes': {name: summarize_latencies(latencies[name], errors[name], elapsed) for name in names},
+    }
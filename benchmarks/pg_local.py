@@ -0,0 +1,104 @@
+# benchmarks/pg_local.py
+"""
+벤치마크용 임시 PostgreSQL 클러스터.
+
+initdb 로 임시 디렉터리에 클러스터를 만들고 비어 있는 포트에서 실행한 뒤,
+DB_HOST/DB_PORT/DB_NAME/DB_USER/DB_PASSWORD 환경 변수를 그 클러스터로 바꿉니다.
+종료 시 서버를 멈추고 디렉터리를 삭제합니다. (PostgreSQL 서버 바이너리가 PATH 또는 PG_BIN 에 있어야 합니다)
+
+    with TemporaryPostgres() as pg:
+        print(pg.env)   # 앱 서버 서브프로세스에 넘길 환경 변수
+"""
+import os
+import shutil
+import socket
+import subprocess
+import tempfile
+import time
+
+import psycopg2
+
+
+def _free_port():
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def _find_binary(name):
+    pg_bin = os.getenv("PG_BIN")
+    if pg_bin and os.path.exists(os.path.join(pg_bin, name)):
+        return os.path.join(pg_bin, name)
+    found = shutil.which(name)
+    if found:
+        return found
+    raise RuntimeError(f"PostgreSQL 실행 파일 '{name}' 을 찾을 수 없습니다. PATH 또는 PG_BIN 을 확인해 주세요.")
+
+
+class TemporaryPostgres:
+    def __init__(self, dbname="lotto_bench", user="postgres"):
+        self.dbname = dbname
+        self.user = user
+        self.port = None
+        self.data_dir = None
+        self._saved_env = {}
+
+    @property
+    def env(self):
+        return {
+            "DB_HOST": "127.0.0.1",
+            "DB_PORT": str(self.port),
+            "DB_NAME": self.dbname,
+            "DB_USER": self.user,
+            "DB_PASSWORD": "",
+        }
+
+    def start(self):
+        initdb, pg_ctl = _find_binary("initdb"), _find_binary("pg_ctl")
+        self.data_dir = tempfile.mkdtemp(prefix="lotto_bench_pg_")
+        self.port = _free_port()
+
+        subprocess.run(
+            [initdb, "-D", self.data_dir, "-U", self.user, "--auth=trust", "--encoding=UTF8", "--no-sync"],
+            check=True, stdout=subprocess.DEVNULL,
+        )
+        # 벤치마크 전용 설정 (디스크 동기화 생략, 연결 수 여유)
+        options = f"-p {self.port} -c listen_addresses=127.0.0.1 -c fsync=off -c max_connections=300 " \
+                  f"-k {self.data_dir}"
+        subprocess.run(
+            [pg_ctl, "-D", self.data_dir, "-o", options, "-l", os.path.join(self.data_dir, "server.log"), "-w", "start"],
+            check=True, stdout=subprocess.DEVNULL,
+        )
+
+        conn = psycopg2.connect(host="127.0.0.1", port=self.port, dbname="postgres", user=self.user)
+        conn.autocommit = True
+        with conn.cursor() as cur:
+            cur.execute(f'CREATE DATABASE "{self.dbname}"')
+        conn.close()
+
+        for key, value in self.env.items():
+            self._saved_env[key] = os.environ.get(key)
+            os.environ[key] = value
+        return self
+
+    def stop(self):
+        for key, value in self._saved_env.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+        if self.data_dir:
+            try:
+                subprocess.run([_find_binary("pg_ctl"), "-D", self.data_dir, "-m", "fast", "-w", "stop"],
+                               check=False, stdout=subprocess.DEVNULL)
+            finally:
+                # 서버가 파일을 놓을 때까지 잠시 대기 후 삭제
+                time.sleep(0.2)
+                shutil.rmtree(self.data_dir, ignore_errors=True)
+                self.data_dir = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,258 @@
+# benchmarks/run.py
+"""
+부하 테스트 실행기.
+
+  1. (--temp-db) 임시 PostgreSQL 클러스터를 띄우고 benchmarks.seed 로 데이터를 준비
+  2. 앱 서버를 서브프로세스로 실행 (--server wsgi | asgi) 하거나 --url 의 기존 서버를 사용
+  3. 가상 사용자마다 bench_user_{k} 로 로그인한 뒤 경로 혼합(--mix)으로 부하를 보냄
+  4. 경로별 p50/p95/p99/max 지연 시간과 처리량을 커밋/설정 정보와 함께 JSON 으로 저장
+
+    python -m benchmarks.run --temp-db --scale 10000 --picks 1000000 -c 50 -n 5000 -o bench.json
+    python -m benchmarks.run --url http://127.0.0.1:5000 --users 100 -c 20 -n 2000   # 이미 준비된 DB/서버
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from benchmarks.http_load import HttpClient, run_load
+from benchmarks.pg_local import TemporaryPostgres, _free_port
+from benchmarks.seed import BENCH_PASSWORD, add_seed_arguments, bench_username, seed
+
+# 경로 이름 -> 기본 가중치
+DEFAULT_MIX = {
+    'lotto': 40,
+    'statistics': 20,
+    'recommend': 15,
+    'check_pick': 15,
+    'login': 5,
+}
+
+
+def parse_mix(text):
+    """'lotto=40,statistics=20' 형식의 경로 혼합을 dict 로 변환합니다."""
+    if not text:
+        return dict(DEFAULT_MIX)
+    mix = {}
+    for item in text.split(','):
+        name, _, weight = item.partition('=')
+        name = name.strip()
+        if name not in DEFAULT_MIX:
+            raise ValueError(f"알 수 없는 경로 이름입니다: {name} (가능: {', '.join(DEFAULT_MIX)})")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def build_ops(mix, user_count, max_page):
+    async def lotto(client, rng):
+        return await client.get(f"/lotto?page={rng.randint(1, max_page)}")
+
+    async def statistics(client, rng):
+        sort = rng.choice(('frequency', 'last_draw_gap', 'number'))
+        return await client.get(f"/statistics?sort={sort}")
+
+    async def recommend(client, rng):
+        return await client.get("/recommend")
+
+    async def check_pick(client, rng):
+        # PRG 패턴: POST(분석) -> 302 -> GET(결과 표시) 전체를 한 동작으로 측정
+        numbers = rng.sample(range(1, 46), 6)
+        status = await client.post("/check_pick", {f"number_{i + 1}": n for i, n in enumerate(numbers)})
+        if status >= 400:
+            return status
+        return await client.get("/check_pick")
+
+    async def login(client, rng):
+        # 다른 벤치마크 사용자로 다시 로그인 (bcrypt 검증 경로)
+        return await client.post("/login", {
+            "username": bench_username(rng.randrange(user_count)), "password": BENCH_PASSWORD,
+        })
+
+    funcs = {
+        'lotto': lotto,
+        'statistics': statistics,
+        'recommend': recommend,
+        'check_pick': check_pick,
+        'login': login,
+    }
+    return [(name, weight, funcs[name]) for name, weight in mix.items() if weight > 0]
+
+
+def make_login_setup(user_count):
+    async def setup(client, index):
+        await client.post("/login", {"username": bench_username(index % user_count), "password": BENCH_PASSWORD})
+        # 로그인 보호 경로가 200 이어야 로그인 성공 (실패 시 /login 으로 302)
+        if await client.get("/mypage") != 200:
+            raise RuntimeError(f"{bench_username(index % user_count)} 로그인에 실패했습니다. 데이터 준비(seed)를 확인해 주세요.")
+    return setup
+
+
+def _git_info():
+    def git(*args):
+        try:
+            return subprocess.run(["git", *args], cwd=PROJECT_ROOT, capture_output=True, text=True,
+                                  check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+    return {'commit': git("rev-parse", "HEAD"), 'dirty': bool(git("status", "--porcelain", "--untracked-files=no"))}
+
+
+class AppServer:
+    """앱 서버 서브프로세스 (wsgi: flask 개발 서버 + 스레드, asgi: uvicorn)"""
+
+    def __init__(self, mode, workers=1):
+        self.mode = mode
+        self.workers = workers
+        self.port = _free_port()
+        self.url = f"http://127.0.0.1:{self.port}"
+        self.process = None
+
+    def command(self):
+        if self.mode == 'asgi':
+            return [sys.executable, "-m", "uvicorn", "asgi:application", "--host", "127.0.0.1",
+                    "--port", str(self.port), "--workers", str(self.workers), "--log-level", "warning"]
+        return [sys.executable, "-m", "flask", "--app", "app", "run", "--host", "127.0.0.1",
+                "--port", str(self.port), "--with-threads"]
+
+    def start(self, timeout=60):
+        self.process = subprocess.Popen(self.command(), cwd=PROJECT_ROOT, env=dict(os.environ),
+                                        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"앱 서버가 시작 직후 종료되었습니다:\n{self.process.stderr.read().decode(errors='replace')}")
+            try:
+                if asyncio.run(self._probe()) < 500:
+                    return self
+            except OSError:
+                pass
+            time.sleep(0.3)
+        self.stop()
+        raise RuntimeError(f"앱 서버가 {timeout}초 안에 응답하지 않았습니다.")
+
+    async def _probe(self):
+        client = HttpClient(self.url)
+        try:
+            return await client.get("/")
+        finally:
+            client.close()
+
+    def stop(self):
+        if self.process and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+        self.process = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def run_benchmark(args):
+    mix = parse_mix(args.mix)
+    ops = build_ops(mix, args.users, args.max_page)
+    setup = make_login_setup(args.users) if args.users else None
+    if setup is None:
+        # 사용자가 없으면 로그인이 필요한 경로는 제외
+        ops = [op for op in ops if op[0] in ('lotto', 'statistics')]
+
+    report = {
+        'meta': {
+            **_git_info(),
+            'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+        },
+        'config': {
+            'server': args.url or args.server,
+            'workers': args.workers,
+            'concurrency': args.concurrency,
+            'requests': args.requests,
+            'warmup': args.warmup,
+            'mix': {name: weight for name, weight, _ in ops},
+            'temp_db': args.temp_db,
+            'scale': args.scale,
+            'users': args.users,
+            'picks': args.picks,
+            'seed': args.seed,
+        },
+    }
+
+    if args.temp_db or args.seed_data:
+        print("🌱 벤치마크 데이터 준비 중...")
+        report['seed'] = seed(args.scale, args.users, args.picks, args.seed, reset=not args.temp_db,
+                              bcrypt_rounds=args.bcrypt_rounds)
+        print(f"   {report['seed']['seconds']}")
+
+    def load(url):
+        if args.warmup:
+            asyncio.run(run_load(url, ops, min(args.concurrency, 10), args.warmup, setup, seed=args.seed + 1))
+        return asyncio.run(run_load(url, ops, args.concurrency, args.requests, setup, seed=args.seed,
+                                    timeout=args.timeout))
+
+    if args.url:
+        report['results'] = load(args.url)
+    else:
+        with AppServer(args.server, args.workers) as server:
+            print(f"🚀 {args.server} 서버 실행: {server.url}")
+            report['results'] = load(server.url)
+    return report
+
+
+def print_report(report):
+    results = report['results']
+    print(f"{'route':<12}{'ok':>8}{'rps':>10}{'p50(ms)':>10}{'p95(ms)':>10}{'p99(ms)':>10}{'max(ms)':>10}  errors")
+    for name, r in [*results['routes'].items(), ('TOTAL', results['total'])]:
+        lat = r['latency_ms']
+        print(f"{name:<12}{r['ok']:>8}{r['rps']:>10}{lat['p50']!s:>10}{lat['p95']!s:>10}{lat['p99']!s:>10}"
+              f"{lat['max']!s:>10}  {r['errors'] or '-'}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="앱 주요 경로의 지연 시간/처리량을 측정합니다.")
+    parser.add_argument('--temp-db', action='store_true', help="임시 PostgreSQL 클러스터를 만들어 데이터를 준비하고 사용")
+    parser.add_argument('--seed-data', action='store_true', help="현재 DB_* 데이터베이스를 비우고 데이터를 준비 (주의: TRUNCATE)")
+    add_seed_arguments(parser)
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument('--server', choices=('wsgi', 'asgi'), default='wsgi', help="실행할 앱 서버 종류")
+    target.add_argument('--url', help="이미 실행 중인 서버 주소 (서버를 띄우지 않음)")
+    parser.add_argument('--workers', type=int, default=1, help="asgi 모드의 uvicorn 워커 수")
+    parser.add_argument('-c', '--concurrency', type=int, default=50, help="동시 가상 사용자 수")
+    parser.add_argument('-n', '--requests', type=int, default=5000, help="총 동작 수 (check_pick 은 POST+GET 이 한 동작)")
+    parser.add_argument('--warmup', type=int, default=100, help="측정 전 워밍업 동작 수")
+    parser.add_argument('--mix', help="경로 혼합 (예: lotto=40,statistics=20,recommend=15,check_pick=15,login=5)")
+    parser.add_argument('--max-page', type=int, default=50, help="/lotto 요청의 최대 페이지 번호")
+    parser.add_argument('--timeout', type=int, default=600, help="부하 단계 최대 시간(초)")
+    parser.add_argument('-o', '--output', help="결과 JSON 파일 경로")
+    args = parser.parse_args(argv)
+
+    if args.temp_db:
+        with TemporaryPostgres():
+            report = run_benchmark(args)
+    else:
+        report = run_benchmark(args)
+
+    print_report(report)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"💾 결과 저장: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,207 @@
+# benchmarks/seed.py
+"""
+벤치마크용 데이터 준비.
+
+  1. 스키마 부트스트랩 (db.migrations.bootstrap_schema)
+  2. 1600.csv / 6011200.csv 적재 (scripts/load_lotto_data.py 와 같은 COPY 경로)
+  3. 가상 회차로 전체 회차 수를 --scale 까지 확대 (마지막 회차 다음부터 1주 간격)
+  4. 벤치마크 사용자 --users 명과 번호 --picks 개를 COPY 로 적재
+  5. 통계 전체 재계산 + 추천 VIEW 갱신
+
+같은 --seed 로 실행하면 항상 같은 데이터가 만들어집니다.
+
+    python -m benchmarks.seed --reset --scale 100000 --users 1000 --picks 1000000
+"""
+import argparse
+import io
+import os
+import sys
+import time
+from datetime import timedelta
+
+import bcrypt
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from db.db_config import get_connection
+from db.migrations import bootstrap_schema
+from scripts.load_lotto_data import DEFAULT_CSV_FILES, DRAW_COLUMNS, copy_draws_to_db, load_files
+from services.recommend_service import RecommendService
+from services.stat_service import StatService
+
+BENCH_USER_PREFIX = "bench_user_"
+BENCH_PASSWORD = "bench-password"
+
+RESET_SQL = """
+    TRUNCATE user_pick, recommend_result, user_account, lotto_draw, lotto_stat, lotto_stat_meta
+    RESTART IDENTITY CASCADE;
+"""
+
+
+def bench_username(index):
+    return f"{BENCH_USER_PREFIX}{index}"
+
+
+def _random_combinations(rng, n, k):
+    """n 행 × k 개의 서로 다른 번호(1~45), 각 행은 오름차순"""
+    keys = rng.random((n, 45), dtype=np.float32)
+    return np.sort(np.argpartition(keys, k - 1, axis=1)[:, :k], axis=1) + 1
+
+
+def reset_database():
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(RESET_SQL)
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def _latest_draw():
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT draw_no, draw_date FROM lotto_draw ORDER BY draw_no DESC LIMIT 1;")
+            return cur.fetchone()
+    finally:
+        conn.close()
+
+
+def scale_up_draws(target_count, rng):
+    """최신 회차 다음부터 가상 회차를 추가하여 전체 회차 수를 target_count 로 맞춥니다. 추가한 회차 수를 반환합니다."""
+    latest = _latest_draw()
+    if latest is None:
+        raise RuntimeError("기준이 되는 회차가 없습니다. CSV 를 먼저 적재해야 합니다.")
+    latest_no, latest_date = latest
+    extra = target_count - latest_no
+    if extra <= 0:
+        return 0
+
+    # 보너스까지 7개를 한 번에 뽑아 앞의 6개를 당첨번호, 마지막 1개를 보너스로 사용
+    keys = rng.random((extra, 45), dtype=np.float32)
+    picked = np.argpartition(keys, 6, axis=1)[:, :7] + 1
+    mains = np.sort(picked[:, :6], axis=1)
+
+    draws = pd.DataFrame({
+        'draw_no': np.arange(latest_no + 1, latest_no + 1 + extra),
+        'draw_date': [(latest_date + timedelta(weeks=i)).isoformat() for i in range(1, extra + 1)],
+    })
+    for i in range(6):
+        draws[f'n{i + 1}'] = mains[:, i]
+    draws['bonus'] = picked[:, 6]
+    return copy_draws_to_db(draws[DRAW_COLUMNS])
+
+
+def seed_users_and_picks(user_count, pick_count, rng, rounds=4):
+    """
+    벤치마크 사용자와 번호를 COPY 로 적재합니다.
+    모든 사용자의 비밀번호는 BENCH_PASSWORD 이며, 해시는 한 번만 계산합니다.
+    (rounds 는 로그인 경로의 bcrypt 비용. 운영 설정과 같게 측정하려면 BCRYPT_ROUNDS 와 맞추세요)
+    """
+    password_hash = bcrypt.hashpw(BENCH_PASSWORD.encode(), bcrypt.gensalt(rounds)).decode()
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            users = io.StringIO()
+            for i in range(user_count):
+                users.write(f"{bench_username(i)}\t{password_hash}\tactive\n")
+            users.seek(0)
+            cur.copy_expert("COPY user_account (username, password, status) FROM STDIN", users)
+
+            cur.execute("SELECT user_id FROM user_account WHERE username LIKE %s ORDER BY user_id;",
+                        (BENCH_USER_PREFIX + '%',))
+            user_ids = np.array([row[0] for row in cur.fetchall()], dtype=np.int64)
+
+            # 번호는 10만 개씩 나누어 COPY (메모리 사용량 제한)
+            written = 0
+            for start in range(0, pick_count, 100_000):
+                size = min(100_000, pick_count - start)
+                numbers = _random_combinations(rng, size, 6)
+                owners = user_ids[rng.integers(0, len(user_ids), size=size)]
+                frame = pd.DataFrame(numbers, columns=['p1', 'p2', 'p3', 'p4', 'p5', 'p6'])
+                frame.insert(0, 'user_id', owners)
+                buffer = io.StringIO()
+                frame.to_csv(buffer, index=False, header=False)
+                buffer.seek(0)
+                cur.copy_expert(
+                    "COPY user_pick (user_id, p1, p2, p3, p4, p5, p6) FROM STDIN WITH (FORMAT csv)", buffer
+                )
+                written += size
+        conn.commit()
+        return len(user_ids), written
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def seed(scale=None, users=100, picks=10_000, seed=42, reset=False, bcrypt_rounds=4):
+    """
+    벤치마크 데이터를 준비하고 단계별 소요 시간을 반환합니다.
+    scale: 전체 회차 수 목표 (None 이면 CSV 회차만 사용)
+    """
+    rng = np.random.default_rng(seed)
+    timings = {}
+
+    started = time.perf_counter()
+    if not bootstrap_schema():
+        raise RuntimeError("스키마 부트스트랩에 실패했습니다.")
+    if reset:
+        reset_database()
+    timings['schema'] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    load_files([os.path.join(PROJECT_ROOT, name) for name in DEFAULT_CSV_FILES])
+    timings['csv'] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    added = scale_up_draws(scale, rng) if scale else 0
+    timings['synthetic_draws'] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    user_count, pick_count = seed_users_and_picks(users, picks, rng, rounds=bcrypt_rounds) if users else (0, 0)
+    timings['users_and_picks'] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    StatService.update_statistics('full')
+    RecommendService.refresh_recommend_view()
+    timings['statistics'] = time.perf_counter() - started
+
+    return {
+        'synthetic_draws': added,
+        'users': user_count,
+        'picks': pick_count,
+        'seed': seed,
+        'seconds': {k: round(v, 3) for k, v in timings.items()},
+    }
+
+
+def add_seed_arguments(parser):
+    parser.add_argument('--scale', type=int, help="전체 회차 수 목표 (예: 10000, 100000)")
+    parser.add_argument('--users', type=int, default=100, help="벤치마크 사용자 수")
+    parser.add_argument('--picks', type=int, default=10_000, help="사용자 번호 수 (예: 1000000)")
+    parser.add_argument('--seed', type=int, default=42, help="데이터 생성 난수 시드")
+    parser.add_argument('--bcrypt-rounds', type=int, default=int(os.getenv("BCRYPT_ROUNDS", "12")),
+                        help="벤치마크 사용자 비밀번호의 bcrypt cost (기본: BCRYPT_ROUNDS)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="벤치마크용 데이터를 현재 DB_* 데이터베이스에 준비합니다.")
+    add_seed_arguments(parser)
+    parser.add_argument('--reset', action='store_true', help="기존 데이터를 모두 지우고 시작 (TRUNCATE)")
+    args = parser.parse_args(argv)
+
+    result = seed(args.scale, args.users, args.picks, args.seed, args.reset, args.bcrypt_rounds)
+    print(f"✅ 가상 회차 {result['synthetic_draws']}개, 사용자 {result['users']}명, 번호 {result['picks']}개 준비 완료")
+    print(f"⏱️ {result['seconds']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
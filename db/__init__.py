@@ -1,16 +1,4 @@
-import psycopg2
-import os
-from dotenv import load_dotenv
+from db.db_config import get_connection, get_pool, close_pool, pooled_connection, PoolTimeoutError
 
-# .env 불러오기
-load_dotenv()
-
-def get_db_connection():
-    conn = psycopg2.connect(
-        dbname=os.getenv("DB_NAME"),
-        user=os.getenv("DB_USER"),
-        password=os.getenv("DB_PASSWORD"),
-        host=os.getenv("DB_HOST"),
-        port=os.getenv("DB_PORT")
-    )
-    return conn
+# 예전 코드와의 호환용 이름 (연결 생성은 db/db_config.py 한 곳에서만 관리합니다)
+get_db_connection = get_connection
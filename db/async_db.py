@@ -0,0 +1,108 @@
+# db/async_db.py
+"""
+ASGI 모드(asgi.py)용 비동기 DB 접근 (asyncpg).
+
+psycopg2 호출은 DB 왕복 동안 워커 스레드를 붙잡지만, asyncpg 는 이벤트 루프에 제어를 돌려주므로
+한 프로세스가 수백 개의 동시 요청을 처리할 수 있습니다.
+조회 결과의 형태는 동기 DB 클래스(LottoDrawDB, LottoStatDB)와 같습니다.
+
+풀 크기는 .env 의 ASYNC_DB_POOL_MIN, ASYNC_DB_POOL_MAX 로 설정합니다.
+"""
+import asyncio
+import os
+import sys
+
+import asyncpg
+
+from db.db_config import _connect_kwargs
+
+_pool = None
+_pool_loop = None
+_pool_lock = None
+
+
+async def get_async_pool():
+    """
+    현재 이벤트 루프의 asyncpg 풀을 반환합니다. (최초 사용 시 생성)
+    풀은 생성한 이벤트 루프에서만 사용할 수 있으므로, 루프가 바뀌면 새로 만듭니다.
+    """
+    global _pool, _pool_loop, _pool_lock
+    loop = asyncio.get_running_loop()
+    if _pool is not None and _pool_loop is loop:
+        return _pool
+    if _pool_lock is None or _pool_loop is not loop:
+        _pool_lock = asyncio.Lock()
+        _pool_loop = loop
+        _pool = None
+    async with _pool_lock:
+        if _pool is None:
+            kwargs = _connect_kwargs()
+            _pool = await asyncpg.create_pool(
+                host=kwargs['host'],
+                port=int(kwargs['port']) if kwargs['port'] else None,
+                database=kwargs['database'],
+                user=kwargs['user'],
+                password=kwargs['password'],
+                min_size=int(os.getenv("ASYNC_DB_POOL_MIN", "1")),
+                max_size=int(os.getenv("ASYNC_DB_POOL_MAX", "20")),
+            )
+    return _pool
+
+
+async def close_async_pool():
+    """ASGI lifespan 종료 시 호출합니다."""
+    global _pool
+    if _pool is not None:
+        pool, _pool = _pool, None
+        await pool.close()
+
+
+class AsyncLottoDrawDB:
+    @staticmethod
+    async def get_draws_before(before_draw_no, limit):
+        """LottoDrawDB.get_draws_before 의 비동기 버전 (키셋 페이징)"""
+        if before_draw_no is None:
+            query = """
+                SELECT draw_no, draw_date, n1, n2, n3, n4, n5, n6, bonus
+                FROM LOTTO_DRAW
+                ORDER BY draw_no DESC
+                LIMIT $1;
+            """
+            params = (limit,)
+        else:
+            query = """
+                SELECT draw_no, draw_date, n1, n2, n3, n4, n5, n6, bonus
+                FROM LOTTO_DRAW
+                WHERE draw_no < $1
+                ORDER BY draw_no DESC
+                LIMIT $2;
+            """
+            params = (before_draw_no, limit)
+        try:
+            pool = await get_async_pool()
+            rows = await pool.fetch(query, *params)
+            return [tuple(row) for row in rows]
+        except Exception as e:
+            print("Async DB Error (get_draws_before):", e, file=sys.stderr)
+            return []
+
+
+class AsyncLottoStatDB:
+    @staticmethod
+    async def get_all_stats():
+        """LottoStatDB.get_all_stats 의 비동기 버전 (DB 오류 시 None)"""
+        query = """
+            SELECT number, frequency, last_draw_gap
+            FROM lotto_stat
+            ORDER BY number ASC;
+        """
+        try:
+            pool = await get_async_pool()
+            rows = await pool.fetch(query)
+            return [
+                {'number': row[0], 'frequency': row[1], 'last_draw_gap': row[2]}
+                for row in rows
+            ]
+        except Exception as e:
+            print("Async DB Error (get_all_stats):", e, file=sys.stderr)
+            return None
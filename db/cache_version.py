@@ -0,0 +1,41 @@
+# db/cache_version.py
+from db.db_config import pooled_connection
+import sys
+
+# 캐시 무효화용 데이터 버전 키
+# 당첨 데이터 적재, 통계 갱신 시 1씩 증가시키며,
+# 웹 서버 프로세스들은 이 값을 주기적으로 확인하여 캐시를 버립니다.
+BUMP_VERSION_SQL = """
+    INSERT INTO app_cache_version (name, version, updated_at)
+    VALUES ('data', 1, NOW())
+    ON CONFLICT (name) DO UPDATE
+    SET version = app_cache_version.version + 1,
+        updated_at = NOW();
+"""
+
+
+class CacheVersionDB:
+    @staticmethod
+    def get_version():
+        """현재 데이터 버전을 조회합니다. 오류 시 None."""
+        query = "SELECT version FROM app_cache_version WHERE name = 'data';"
+        with pooled_connection() as conn:
+            cur = conn.cursor()
+            try:
+                cur.execute(query)
+                row = cur.fetchone()
+                return row[0] if row else 0
+            except Exception as e:
+                conn.rollback()
+                print("DB Error (get_version):", e, file=sys.stderr)
+                return None
+            finally:
+                cur.close()
+
+    @staticmethod
+    def bump_version(cur):
+        """
+        호출한 쪽의 트랜잭션 안에서 데이터 버전을 올립니다.
+        (데이터 변경과 같은 트랜잭션으로 커밋되어야 하므로 커서를 받아서 실행합니다)
+        """
+        cur.execute(BUMP_VERSION_SQL)
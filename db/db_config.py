@@ -1,15 +1,426 @@
 import psycopg2
 import os
+import threading
+import time
+from contextlib import contextmanager
+from psycopg2 import extensions
 from dotenv import load_dotenv
 
+from metrics import ENABLED as METRICS_ENABLED, registry as metrics
+
 # .env 읽기
 load_dotenv()
 
-def get_connection():
-    return psycopg2.connect(
+
+def _connect_kwargs():
+    return dict(
         host=os.getenv("DB_HOST"),
         port=os.getenv("DB_PORT"),
         database=os.getenv("DB_NAME"),
         user=os.getenv("DB_USER"),
         password=os.getenv("DB_PASSWORD"),
     )
+
+
+# =========================================================================
+# 쿼리 계측 (METRICS_ENABLED=1 일 때 모든 커서의 실행 시간/행 수를 metrics 레지스트리에 기록)
+# =========================================================================
+class _TimedCursorMixin:
+    """execute / executemany / callproc / copy_expert 의 소요 시간과 행 수를 기록합니다."""
+
+    def _timed(self, method, query, *args):
+        started = time.perf_counter()
+        try:
+            result = method(query, *args)
+        except Exception:
+            metrics.observe_query(_query_text(query, self), time.perf_counter() - started, error=True)
+            raise
+        metrics.observe_query(_query_text(query, self), time.perf_counter() - started, self.rowcount)
+        return result
+
+    def execute(self, query, vars=None):
+        return self._timed(super().execute, query, vars)
+
+    def executemany(self, query, vars_list):
+        return self._timed(super().executemany, query, vars_list)
+
+    def callproc(self, procname, parameters=None):
+        return self._timed(super().callproc, procname, parameters)
+
+    def copy_expert(self, sql, file, size=8192):
+        return self._timed(super().copy_expert, sql, file, size)
+
+
+def _query_text(query, cursor):
+    # psycopg2.sql.Composed 등은 문자열로 변환
+    if hasattr(query, 'as_string'):
+        try:
+            return query.as_string(cursor)
+        except Exception:
+            return repr(query)
+    return query
+
+
+_timed_cursor_classes = {}
+
+
+def _timed_cursor_class(factory):
+    cls = _timed_cursor_classes.get(factory)
+    if cls is None:
+        cls = _timed_cursor_classes[factory] = type(f"Timed{factory.__name__}", (_TimedCursorMixin, factory), {})
+    return cls
+
+
+class InstrumentedConnection(extensions.connection):
+    """cursor() 가 계측 커서를 반환하는 연결 (cursor_factory 를 지정해도 같은 계측이 적용됨)"""
+
+    def cursor(self, *args, **kwargs):
+        factory = kwargs.get('cursor_factory') or self.cursor_factory or extensions.cursor
+        kwargs['cursor_factory'] = _timed_cursor_class(factory)
+        return super().cursor(*args, **kwargs)
+
+
+def _factory_kwargs():
+    return {'connection_factory': InstrumentedConnection} if METRICS_ENABLED else {}
+
+
+def get_connection():
+    """
+    풀을 거치지 않는 단독 연결을 생성합니다.
+    (CSV 적재 스크립트처럼 한 번 실행되고 끝나는 작업용. 웹 요청 경로에서는 pooled_connection()을 사용합니다.)
+    """
+    conn = psycopg2.connect(**_connect_kwargs(), **_factory_kwargs())
+    metrics.inc('db_connections_opened_total', kind='direct')
+    return conn
+
+
+class PoolTimeoutError(Exception):
+    """풀의 모든 연결이 사용 중이고, 대기 시간 안에 반납되지 않은 경우 발생합니다."""
+
+
+class ConnectionPool:
+    """
+    스레드 안전한 PostgreSQL 연결 풀.
+
+    - minconn/maxconn: 유휴 정리 후에도 남겨 두는 연결 수 / 동시에 열 수 있는 최대 연결 수
+      (연결은 처음 대여할 때 엽니다. 생성 시 미리 열어 두면 fork 하는 서버의 자식들이 같은 소켓을 물려받음)
+    - 대여(checkout) 시 상태 점검: 끊어진 연결은 폐기하고, ping_interval 이상 놀고 있던 연결은 SELECT 1 로 확인
+    - 락은 유휴 연결을 꺼내거나 새 연결 자리를 예약할 때만 잡고, 연결 생성/ping 은 락 밖에서 수행
+    - idle_timeout 이상 사용되지 않은 연결은 minconn 개를 남기고 정리(reaping)
+    - 모든 연결이 사용 중이면 wait_timeout 초까지 반납을 기다린 뒤 PoolTimeoutError
+    """
+
+    def __init__(self, minconn=1, maxconn=10, idle_timeout=300, ping_interval=30,
+                 wait_timeout=10, **connect_kwargs):
+        if minconn < 0 or maxconn < 1 or minconn > maxconn:
+            raise ValueError("풀 크기 설정이 잘못되었습니다. (0 <= minconn <= maxconn, maxconn >= 1)")
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.idle_timeout = idle_timeout
+        self.ping_interval = ping_interval
+        self.wait_timeout = wait_timeout
+        self._connect_kwargs = connect_kwargs
+
+        self._cond = threading.Condition()
+        self._idle = []        # [(conn, 반납 시각)] - 마지막 요소가 가장 최근에 반납된 연결
+        self._in_use = set()   # 대여 중인 연결의 id()
+        self._opening = 0      # 락 밖에서 생성 중인 연결 수 (maxconn 계산에 포함)
+        self._closed = False
+        self.stats = {"opened": 0, "closed": 0, "checkouts": 0, "discarded": 0, "waits": 0}
+
+    # ---------------------------------------------------------
+    # 내부 유틸리티
+    # ---------------------------------------------------------
+    def _open(self):
+        """새 연결을 만듭니다. (락 밖에서 호출, 통계는 호출한 쪽이 락 안에서 반영)"""
+        conn = psycopg2.connect(**self._connect_kwargs)
+        metrics.inc('db_connections_opened_total', kind='pool')
+        return conn
+
+    @staticmethod
+    def _disconnect(conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _close(self, conn):
+        """연결을 닫습니다. (락 보유 상태에서 호출)"""
+        self._disconnect(conn)
+        self.stats["closed"] += 1
+
+    def _size(self):
+        return len(self._idle) + len(self._in_use) + self._opening
+
+    def _is_healthy(self, conn, idle_for):
+        """대여 직전 연결 상태를 점검합니다."""
+        if conn.closed:
+            return False
+        if conn.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+            return False
+        if idle_for < self.ping_interval:
+            return True
+        try:
+            cur = conn.cursor()
+            try:
+                cur.execute("SELECT 1;")
+                cur.fetchone()
+            finally:
+                cur.close()
+            conn.rollback()
+            return True
+        except Exception:
+            return False
+
+    def _reap_locked(self, now):
+        """idle_timeout을 넘긴 유휴 연결을 minconn 개만 남기고 정리합니다. (락 보유 상태에서 호출)"""
+        if not self.idle_timeout:
+            return
+        size = self._size()
+        kept = []
+        # 오래된 연결(앞쪽)부터 검사
+        for conn, returned_at in self._idle:
+            if now - returned_at > self.idle_timeout and size > self.minconn:
+                self._close(conn)
+                size -= 1
+                continue
+            kept.append((conn, returned_at))
+        self._idle = kept
+
+    # ---------------------------------------------------------
+    # 공개 API
+    # ---------------------------------------------------------
+    def getconn(self):
+        """풀에서 연결을 하나 대여합니다. (대기 포함 소요 시간은 db_pool_checkout_seconds 로 기록)"""
+        started = time.perf_counter()
+        conn = self._getconn()
+        metrics.observe('db_pool_checkout_seconds', time.perf_counter() - started)
+        return conn
+
+    def _getconn(self):
+        deadline = time.monotonic() + self.wait_timeout
+        while True:
+            conn, idle_for = self._reserve(deadline)
+
+            # 1. 유휴 연결: 락 밖에서 상태 점검 (ping 이 다른 스레드의 대여를 막지 않도록)
+            if conn is not None:
+                if self._is_healthy(conn, idle_for):
+                    with self._cond:
+                        self.stats["checkouts"] += 1
+                    return conn
+                self._disconnect(conn)
+                with self._cond:
+                    self._in_use.discard(id(conn))
+                    self.stats["discarded"] += 1
+                    self.stats["closed"] += 1
+                    self._cond.notify()
+                continue
+
+            # 2. 예약한 자리에 새 연결 생성 (락 밖에서 connect)
+            try:
+                conn = self._open()
+            except Exception:
+                with self._cond:
+                    self._opening -= 1
+                    self._cond.notify()
+                raise
+            with self._cond:
+                self._opening -= 1
+                self.stats["opened"] += 1
+                if self._closed:
+                    self._close(conn)
+                    self._cond.notify()
+                    raise PoolTimeoutError("연결 풀이 이미 종료되었습니다.")
+                self._in_use.add(id(conn))
+                self.stats["checkouts"] += 1
+                return conn
+
+    def _reserve(self, deadline):
+        """
+        락을 잡고 유휴 연결 하나를 꺼내거나(→ (conn, 유휴 시간)), 새 연결 자리를 예약합니다(→ (None, None)).
+        꺼낸 연결과 예약한 자리는 곧바로 풀 크기에 포함되므로 maxconn 을 넘지 않습니다.
+        """
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise PoolTimeoutError("연결 풀이 이미 종료되었습니다.")
+
+                now = time.monotonic()
+                self._reap_locked(now)
+
+                # 가장 최근에 반납된 연결 우선 → 캐시가 따뜻한 연결
+                if self._idle:
+                    conn, returned_at = self._idle.pop()
+                    self._in_use.add(id(conn))
+                    return conn, now - returned_at
+
+                if self._size() < self.maxconn:
+                    self._opening += 1
+                    return None, None
+
+                # 반납 대기
+                remaining = deadline - now
+                if remaining <= 0:
+                    raise PoolTimeoutError(
+                        f"연결 풀 대기 시간 초과 ({self.wait_timeout}초, 최대 {self.maxconn}개 사용 중)"
+                    )
+                self.stats["waits"] += 1
+                self._cond.wait(remaining)
+
+    def putconn(self, conn, close=False):
+        """대여한 연결을 풀에 반납합니다. 진행 중인 트랜잭션은 롤백됩니다."""
+        with self._cond:
+            self._in_use.discard(id(conn))
+            if not close and not conn.closed and not self._closed:
+                try:
+                    if conn.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+                        conn.rollback()
+                    if conn.autocommit:
+                        conn.autocommit = False
+                    self._idle.append((conn, time.monotonic()))
+                except Exception:
+                    self.stats["discarded"] += 1
+                    self._close(conn)
+            else:
+                self._close(conn)
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self):
+        """
+        with pool.connection() as conn: 형태로 사용합니다.
+        블록에서 예외가 발생하면 롤백 후 반납되고, 연결 자체가 깨진 경우 폐기됩니다.
+        """
+        conn = self.getconn()
+        try:
+            yield conn
+        except Exception:
+            broken = conn.closed
+            if not broken:
+                try:
+                    conn.rollback()
+                except Exception:
+                    broken = True
+            self.putconn(conn, close=broken)
+            raise
+        else:
+            self.putconn(conn)
+
+    def reap(self):
+        """유휴 연결 정리를 즉시 수행합니다."""
+        with self._cond:
+            self._reap_locked(time.monotonic())
+
+    def closeall(self):
+        """풀을 종료하고 모든 유휴 연결을 닫습니다. (대여 중인 연결은 반납 시 닫힘)"""
+        with self._cond:
+            self._closed = True
+            for conn, _ in self._idle:
+                self._close(conn)
+            self._idle = []
+            self._cond.notify_all()
+
+    def detach(self):
+        """
+        fork 된 자식 프로세스에서 부모에게 물려받은 풀을 닫지 않고 버립니다.
+        물려받은 연결은 부모와 같은 소켓을 쓰므로 close()(PQfinish) 하면 부모의 세션이 끊어집니다.
+        자식의 소켓 번호를 /dev/null 로 바꿔 두어, 연결 객체가 해제되어도 부모의 소켓에는 아무것도 보내지 않습니다.
+        (fork 시점에 다른 스레드가 락을 잡고 있었을 수 있으므로 락을 사용하지 않음)
+        """
+        self._closed = True
+        devnull = os.open(os.devnull, os.O_RDWR)
+        try:
+            for conn, _ in self._idle:
+                try:
+                    os.dup2(devnull, conn.fileno())
+                except Exception:
+                    pass
+        finally:
+            os.close(devnull)
+
+    def status(self):
+        with self._cond:
+            return dict(self.stats, idle=len(self._idle), in_use=len(self._in_use), opening=self._opening,
+                        minconn=self.minconn, maxconn=self.maxconn)
+
+
+# =========================================================================
+# 프로세스 전역 풀 (최초 사용 시 생성)
+# =========================================================================
+_pool = None
+_pool_lock = threading.Lock()
+_pool_pid = None
+# fork 된 자식 프로세스가 부모에게 물려받은 풀 (연결을 닫지 않도록 참조만 유지)
+_inherited_pools = []
+
+
+def _detach_inherited_pool():
+    """fork 직후 자식 프로세스에서 부모의 풀을 떼어 내고, 첫 사용 시 새 풀을 만들도록 합니다."""
+    global _pool, _pool_lock, _pool_pid
+    if _pool is not None:
+        _pool.detach()
+        _inherited_pools.append(_pool)
+    _pool = None
+    _pool_pid = None
+    # fork 시점에 부모의 다른 스레드가 잡고 있던 락은 자식에서 풀리지 않으므로 새로 만듦
+    _pool_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_detach_inherited_pool)
+
+
+def get_pool():
+    """
+    프로세스 전역 연결 풀을 반환합니다.
+    풀 크기 등은 .env 의 DB_POOL_MIN, DB_POOL_MAX, DB_POOL_IDLE_TIMEOUT,
+    DB_POOL_PING_INTERVAL, DB_POOL_WAIT_TIMEOUT 으로 설정합니다.
+    fork 된 자식 프로세스에서는 부모의 풀을 닫지 않고 떼어 낸 뒤(_detach_inherited_pool) 새 풀을 만듭니다.
+    """
+    global _pool, _pool_pid
+    pid = os.getpid()
+    if _pool is not None and _pool_pid == pid:
+        return _pool
+    if _pool is not None:
+        # os.register_at_fork 를 거치지 않은 fork (C 확장에서 직접 fork 한 경우 등)
+        _detach_inherited_pool()
+    with _pool_lock:
+        if _pool is None or _pool_pid != pid:
+            _pool = ConnectionPool(
+                minconn=int(os.getenv("DB_POOL_MIN", "1")),
+                maxconn=int(os.getenv("DB_POOL_MAX", "10")),
+                idle_timeout=float(os.getenv("DB_POOL_IDLE_TIMEOUT", "300")),
+                ping_interval=float(os.getenv("DB_POOL_PING_INTERVAL", "30")),
+                wait_timeout=float(os.getenv("DB_POOL_WAIT_TIMEOUT", "10")),
+                **_connect_kwargs(),
+                **_factory_kwargs(),
+            )
+            _pool_pid = pid
+    return _pool
+
+
+def close_pool():
+    """
+    이 프로세스의 풀을 닫습니다. 다음 사용 시 새 풀을 만듭니다.
+    fork 하는 서버(gunicorn 등)의 부모 프로세스에서 시작 작업(스키마 부트스트랩 등) 후 호출하여,
+    자식들이 부모의 연결을 물려받지 않도록 합니다.
+    """
+    global _pool, _pool_pid
+    with _pool_lock:
+        if _pool is not None and _pool_pid == os.getpid():
+            _pool.closeall()
+        _pool = None
+        _pool_pid = None
+
+
+@contextmanager
+def pooled_connection():
+    """
+    DB 클래스들이 공통으로 사용하는 연결 대여 API.
+
+        with pooled_connection() as conn:
+            cur = conn.cursor()
+            ...
+    """
+    with get_pool().connection() as conn:
+        yield conn
@@ -1,51 +1,50 @@
 # db/lotto_draw.py
-from db.db_config import get_connection
+from db.db_config import pooled_connection
+
+# 당첨 번호 페이지 조회 (db/migrations.py 의 EXPLAIN 점검에서도 같은 문장을 사용)
+DRAWS_FIRST_PAGE_SQL = """
+    SELECT draw_no, draw_date, n1, n2, n3, n4, n5, n6, bonus
+    FROM LOTTO_DRAW
+    ORDER BY draw_no DESC
+    LIMIT %s;
+"""
+
+DRAWS_BEFORE_SQL = """
+    SELECT draw_no, draw_date, n1, n2, n3, n4, n5, n6, bonus
+    FROM LOTTO_DRAW
+    WHERE draw_no < %s
+    ORDER BY draw_no DESC
+    LIMIT %s;
+"""
 
 class LottoDrawDB:
     @staticmethod
-    def get_draw_data(offset, limit):
-        """과거 당첨 번호를 페이징하여 조회합니다."""
-        
-        query = """
-            SELECT draw_no, draw_date, n1, n2, n3, n4, n5, n6, bonus
-            FROM LOTTO_DRAW
-            ORDER BY draw_no DESC
-            OFFSET %s LIMIT %s;
+    def get_draws_before(before_draw_no, limit):
         """
-        conn = get_connection()
-        cur = conn.cursor()
-
-        try:
-            cur.execute(query, (offset, limit))
-            rows = cur.fetchall()
-            return rows
-        except Exception as e:
-            print(f"DB Error (get_draw_data): {e}")
-            return []
-        finally:
-            cur.close()
-            conn.close()
-        pass
+        과거 당첨 번호를 키셋(커서) 방식으로 페이징하여 조회합니다.
+        before_draw_no 보다 작은 회차를 최신순으로 limit 개 가져옵니다. (None 이면 첫 페이지)
+        OFFSET 을 사용하지 않으므로 몇 번째 페이지든 PK 인덱스 범위 스캔 한 번으로 끝납니다.
+        """
+        if before_draw_no is None:
+            query = DRAWS_FIRST_PAGE_SQL
+            params = (limit,)
+        else:
+            query = DRAWS_BEFORE_SQL
+            params = (before_draw_no, limit)
 
-    @staticmethod
-    def get_total_count():
-        """전체 데이터 개수를 조회하여 페이징에 사용합니다."""
-        query = "SELECT COUNT(*) FROM LOTTO_DRAW;"
-        conn = get_connection()
-        cur = conn.cursor()
+        with pooled_connection() as conn:
+            cur = conn.cursor()
+            try:
+                cur.execute(query, params)
+                rows = cur.fetchall()
+                return rows
+            except Exception as e:
+                conn.rollback()
+                print(f"DB Error (get_draws_before): {e}")
+                return []
+            finally:
+                cur.close()
 
-        try:
-            cur.execute(query)
-            count = cur.fetchone()[0]
-            return count
-        except Exception as e:
-            print(f"DB Error (get_total_count): {e}")
-            return 0
-        finally:
-            cur.close()
-            conn.close()
-        pass
-    
     @staticmethod
     def get_all_draws():
         """모든 과거 당첨 번호를 조회합니다. (비교 분석용)"""
@@ -54,17 +53,36 @@ class LottoDrawDB:
             FROM LOTTO_DRAW
             ORDER BY draw_no DESC; -- 최신 회차부터 정렬
         """
-        conn = get_connection() # db/db_config.py에 정의된 함수를 사용한다고 가정
-        cur = conn.cursor()
+        with pooled_connection() as conn:
+            cur = conn.cursor()
+            try:
+                cur.execute(query)
+                # (draw_no, n1, n2, n3, n4, n5, n6, bonus) 형태의 튜플 리스트 반환
+                rows = cur.fetchall()
+                return rows
+            except Exception as e:
+                conn.rollback()
+                print(f"DB Error (get_all_draws): {e}")
+                return []
+            finally:
+                cur.close()
 
-        try:
-            cur.execute(query)
-            # (draw_no, n1, n2, n3, n4, n5, n6, bonus) 형태의 튜플 리스트 반환
-            rows = cur.fetchall()
-            return rows
-        except Exception as e:
-            print(f"DB Error (get_all_draws): {e}")
-            return []
-        finally:
-            cur.close()
-            conn.close()
\ No newline at end of file
+    @staticmethod
+    def get_draw_signature():
+        """
+        당첨 데이터의 변경 여부를 판단하기 위한 (전체 회차 수, 최신 회차) 를 조회합니다.
+        (메모리 상주 데이터 갱신 판단용. PK 인덱스만 사용하는 가벼운 쿼리)
+        """
+        query = "SELECT COUNT(*), COALESCE(MAX(draw_no), 0) FROM LOTTO_DRAW;"
+        with pooled_connection() as conn:
+            cur = conn.cursor()
+            try:
+                cur.execute(query)
+                count, max_draw_no = cur.fetchone()
+                return count, max_draw_no
+            except Exception as e:
+                conn.rollback()
+                print(f"DB Error (get_draw_signature): {e}")
+                return None
+            finally:
+                cur.close()
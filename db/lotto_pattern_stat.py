@@ -0,0 +1,157 @@
+# db/lotto_pattern_stat.py
+"""
+당첨 번호 패턴 통계 (통계 갱신 트랜잭션 안에서 lotto_stat 과 함께 갱신).
+
+  - lotto_pattern_stat (kind, value, cnt) : 회차별 패턴 값의 분포
+      · sum          : 당첨번호 6개의 합 (21~255)
+      · odd          : 홀수 개수 (0~6)
+      · low          : 저번호(1~22) 개수 (0~6)
+      · consecutive  : 연속 번호 쌍의 개수 (0~5)
+  - lotto_pair_stat   (a, b, cnt)    : 두 번호가 같은 회차에 함께 나온 횟수 (a < b, 최대 990행)
+  - lotto_triple_stat (a, b, c, cnt) : 세 번호가 함께 나온 횟수 (a < b < c, 최대 14190행)
+
+모든 값은 회차별 합산이므로 증분 갱신(새 회차만 더하기)과 전체 재계산 결과가 같습니다.
+"""
+import sys
+from itertools import combinations
+
+from db.db_config import pooled_connection
+
+_NUMBER_COLUMNS = ('n1', 'n2', 'n3', 'n4', 'n5', 'n6')
+
+# 회차별 패턴 값 (n1 < n2 < ... < n6 이 CHECK 제약으로 보장됨)
+_SUM_EXPR = " + ".join(_NUMBER_COLUMNS)
+_ODD_EXPR = " + ".join(f"mod({c}, 2)" for c in _NUMBER_COLUMNS)
+_LOW_EXPR = " + ".join(f"({c} <= 22)::int" for c in _NUMBER_COLUMNS)
+_CONSECUTIVE_EXPR = " + ".join(f"({b} = {a} + 1)::int" for a, b in zip(_NUMBER_COLUMNS, _NUMBER_COLUMNS[1:]))
+
+# watermark < draw_no <= upper 인 회차의 분포 (watermark = 0 이면 upper 까지 전체)
+PATTERN_SELECT = f"""
+    SELECT p.kind, p.value, COUNT(*)::INT AS cnt
+    FROM lotto_draw d
+    CROSS JOIN LATERAL (VALUES
+        ('sum', {_SUM_EXPR}),
+        ('odd', {_ODD_EXPR}),
+        ('low', {_LOW_EXPR}),
+        ('consecutive', {_CONSECUTIVE_EXPR})
+    ) AS p(kind, value)
+    WHERE d.draw_no > %(watermark)s AND d.draw_no <= %(upper)s
+    GROUP BY p.kind, p.value
+"""
+
+PAIR_SELECT = f"""
+    SELECT p.a, p.b, COUNT(*)::INT AS cnt
+    FROM lotto_draw d
+    CROSS JOIN LATERAL (VALUES
+        {", ".join(f"({a}, {b})" for a, b in combinations(_NUMBER_COLUMNS, 2))}
+    ) AS p(a, b)
+    WHERE d.draw_no > %(watermark)s AND d.draw_no <= %(upper)s
+    GROUP BY p.a, p.b
+"""
+
+TRIPLE_SELECT = f"""
+    SELECT p.a, p.b, p.c, COUNT(*)::INT AS cnt
+    FROM lotto_draw d
+    CROSS JOIN LATERAL (VALUES
+        {", ".join(f"({a}, {b}, {c})" for a, b, c in combinations(_NUMBER_COLUMNS, 3))}
+    ) AS p(a, b, c)
+    WHERE d.draw_no > %(watermark)s AND d.draw_no <= %(upper)s
+    GROUP BY p.a, p.b, p.c
+"""
+
+# (테이블, 키 컬럼, 계산 SELECT)
+_TABLES = (
+    ('lotto_pattern_stat', ('kind', 'value'), PATTERN_SELECT),
+    ('lotto_pair_stat', ('a', 'b'), PAIR_SELECT),
+    ('lotto_triple_stat', ('a', 'b', 'c'), TRIPLE_SELECT),
+)
+
+
+class LottoPatternStatDB:
+
+    # =========================================================================
+    # 1. 갱신 (LottoStatDB.update_statistics_transaction 의 커서/트랜잭션 안에서 호출)
+    # =========================================================================
+    @staticmethod
+    def is_consistent(cur, watermark):
+        """
+        패턴 통계가 watermark 회차까지 반영되어 있는지 확인합니다.
+        (sum 분포의 합계 = watermark 이하 회차 수. 테이블이 새로 생긴 경우 등은 False → 전체 재계산)
+        """
+        cur.execute("""
+            SELECT
+                (SELECT COALESCE(SUM(cnt), 0) FROM lotto_pattern_stat WHERE kind = 'sum'),
+                (SELECT COUNT(*) FROM lotto_draw WHERE draw_no <= %s);
+        """, (watermark,))
+        stored, expected = cur.fetchone()
+        return stored == expected
+
+    @staticmethod
+    def apply(cur, upper, watermark=0):
+        """
+        watermark < draw_no <= upper 인 회차의 패턴 값을 기존 통계에 더합니다.
+        watermark = 0 이면 기존 통계를 지우고 upper 까지의 전체 이력으로 다시 계산합니다.
+        upper 는 호출한 쪽이 한 번 읽어 둔 최신 회차 (갱신 도중 적재된 회차는 다음 갱신에서 반영)
+        (같은 트랜잭션 안이므로 조회 중인 사용자는 커밋 전까지 이전 통계를 봅니다)
+        """
+        for table, keys, select in _TABLES:
+            if not watermark:
+                cur.execute(f"DELETE FROM {table};")
+            key_list = ", ".join(keys)
+            cur.execute(f"""
+                INSERT INTO {table} ({key_list}, cnt)
+                {select}
+                ON CONFLICT ({key_list}) DO UPDATE
+                SET cnt = {table}.cnt + EXCLUDED.cnt;
+            """, {'watermark': watermark, 'upper': upper})
+
+    @staticmethod
+    def count_mismatches(cur, upper):
+        """저장된 패턴 통계와 upper 회차까지의 전체 재계산 결과가 다른 행 수 (verify 모드)"""
+        total = 0
+        for table, keys, select in _TABLES:
+            columns = ", ".join((*keys, 'cnt'))
+            cur.execute(f"""
+                SELECT COUNT(*) FROM (
+                    (SELECT {columns} FROM ({select}) f EXCEPT SELECT {columns} FROM {table})
+                    UNION ALL
+                    (SELECT {columns} FROM {table} EXCEPT SELECT {columns} FROM ({select}) f)
+                ) diff;
+            """, {'watermark': 0, 'upper': upper})
+            total += cur.fetchone()[0]
+        return total
+
+    # =========================================================================
+    # 2. 조회
+    # =========================================================================
+    @staticmethod
+    def _fetch_all(query, name):
+        """조회 결과 행 목록. DB 오류 시 None (테이블이 비어 있는 경우의 [] 와 구분)"""
+        with pooled_connection() as conn:
+            cur = conn.cursor()
+            try:
+                cur.execute(query)
+                return cur.fetchall()
+            except Exception as e:
+                conn.rollback()
+                print(f"DB Error ({name}):", e, file=sys.stderr)
+                return None
+            finally:
+                cur.close()
+
+    @staticmethod
+    def get_distributions():
+        """[(kind, value, cnt), ...]"""
+        return LottoPatternStatDB._fetch_all(
+            "SELECT kind, value, cnt FROM lotto_pattern_stat ORDER BY kind, value;", "get_distributions"
+        )
+
+    @staticmethod
+    def get_pair_counts():
+        """[(a, b, cnt), ...] (a < b)"""
+        return LottoPatternStatDB._fetch_all("SELECT a, b, cnt FROM lotto_pair_stat;", "get_pair_counts")
+
+    @staticmethod
+    def get_triple_counts():
+        """[(a, b, c, cnt), ...] (a < b < c)"""
+        return LottoPatternStatDB._fetch_all("SELECT a, b, c, cnt FROM lotto_triple_stat;", "get_triple_counts")
@@ -1,42 +1,147 @@
 # db/lotto_recommend.py
-from db.db_config import get_connection
+import os
+from db.db_config import pooled_connection
+
+# 추천 점수 VIEW 의 형태
+#   - 'view'        : 일반 VIEW (조회 시마다 LOTTO_STAT 으로부터 계산, 별도 갱신 불필요)
+#   - 'materialized': MATERIALIZED VIEW (결과를 저장, 통계 갱신 후 REFRESH ... CONCURRENTLY)
+RECOMMEND_VIEW_MODE = os.getenv("RECOMMEND_VIEW_MODE", "view").strip().lower()
+
+RECOMMEND_VIEW_NAME = "v_lotto_recommend_score"
+
+# LOTTO_STAT 테이블의 frequency와 last_draw_gap을 활용
+RECOMMEND_VIEW_SELECT = """
+    SELECT
+        number,
+        frequency,
+        last_draw_gap,
+        -- 빈도 순위 (높은 빈도일수록 1등. DESC)
+        RANK() OVER (ORDER BY frequency DESC) AS frequency_rank,
+        -- 미출현 간격 순위 (긴 간격일수록 1등. DESC)
+        RANK() OVER (ORDER BY last_draw_gap DESC) AS gap_rank,
+        -- ⭐ 최종 추천 점수 (순위 합산, 낮을수록 좋음) ⭐
+        (RANK() OVER (ORDER BY frequency DESC) + RANK() OVER (ORDER BY last_draw_gap DESC)) AS total_score
+    FROM LOTTO_STAT
+"""
+
+# 개인화 추천 번호 조회 (db/migrations.py 의 EXPLAIN 점검에서도 같은 문장을 사용)
+# 사용자 번호 추출은 user_pick (user_id, reg_date DESC) INCLUDE (p1..p6) 인덱스만으로 처리됩니다.
+RECOMMENDED_NUMBERS_SQL = """
+    WITH
+    -- 1. 사용자가 과거에 선택한 모든 번호를 추출 (JOIN 및 UNNEST 사용)
+    user_cold_picks AS (
+        SELECT DISTINCT unnest(ARRAY[p1, p2, p3, p4, p5, p6]) AS cold_number
+        FROM USER_PICK up
+        WHERE up.user_id = %s -- WHERE 절로 특정 사용자의 데이터만 필터링
+    )
+    -- 2. 추천 점수 VIEW에서 데이터를 가져와, 사용자의 cold_picks를 제외 (LEFT JOIN / WHERE NOT NULL)
+    SELECT
+        vrs.number,
+        vrs.total_score,
+        vrs.frequency,
+        vrs.last_draw_gap
+    FROM v_lotto_recommend_score vrs
+    LEFT JOIN user_cold_picks ucp ON vrs.number = ucp.cold_number
+    WHERE ucp.cold_number IS NULL -- 과거 선택한 번호(cold_number)가 없는 행만 선택
+    ORDER BY vrs.total_score ASC, vrs.frequency DESC
+    LIMIT %s;
+"""
+
+# 전체 45개 번호의 추천 순위 (사용자별 제외는 애플리케이션에서 비트마스크로 적용)
+RECOMMEND_RANKING_SQL = """
+    SELECT number, total_score, frequency, last_draw_gap
+    FROM v_lotto_recommend_score
+    ORDER BY total_score ASC, frequency DESC, number ASC;
+"""
+
 
 class LottoRecommendDB:
+    @staticmethod
+    def _current_view_kind(cur):
+        """v_lotto_recommend_score 의 현재 형태를 반환합니다. ('v': VIEW, 'm': MATERIALIZED VIEW, None: 없음)"""
+        cur.execute(
+            "SELECT relkind FROM pg_class WHERE relname = %s AND relkind IN ('v', 'm');",
+            (RECOMMEND_VIEW_NAME,)
+        )
+        row = cur.fetchone()
+        return row[0] if row else None
+
     @staticmethod
     def create_recommend_view():
         """
-        추천 점수 계산을 위한 VIEW를 생성합니다.
+        추천 점수 계산을 위한 VIEW를 생성합니다. (스키마 부트스트랩 전용 - 요청 경로에서 호출하지 않습니다)
         필수 SQL 기능: VIEW, RANK() OVER (Window Function)
+
+        RECOMMEND_VIEW_MODE 가 바뀐 경우(VIEW ↔ MATERIALIZED VIEW) 기존 객체를 삭제하고 다시 만듭니다.
         """
-        # LOTTO_STAT 테이블의 frequency와 last_draw_gap을 활용
-        query = """
-        CREATE OR REPLACE VIEW v_lotto_recommend_score AS
-        SELECT
-            number,
-            frequency,
-            last_draw_gap,
-            -- 빈도 순위 (높은 빈도일수록 1등. DESC)
-            RANK() OVER (ORDER BY frequency DESC) AS frequency_rank,
-            -- 미출현 간격 순위 (긴 간격일수록 1등. DESC)
-            RANK() OVER (ORDER BY last_draw_gap DESC) AS gap_rank,
-            -- ⭐ 최종 추천 점수 (순위 합산, 낮을수록 좋음) ⭐
-            (RANK() OVER (ORDER BY frequency DESC) + RANK() OVER (ORDER BY last_draw_gap DESC)) AS total_score
-        FROM LOTTO_STAT;
+        wanted = 'm' if RECOMMEND_VIEW_MODE == 'materialized' else 'v'
+        with pooled_connection() as conn:
+            cur = conn.cursor()
+            try:
+                current = LottoRecommendDB._current_view_kind(cur)
+                if current == 'v' and wanted == 'm':
+                    cur.execute(f"DROP VIEW {RECOMMEND_VIEW_NAME};")
+                elif current == 'm' and wanted == 'v':
+                    cur.execute(f"DROP MATERIALIZED VIEW {RECOMMEND_VIEW_NAME};")
+
+                if wanted == 'v':
+                    cur.execute(f"CREATE OR REPLACE VIEW {RECOMMEND_VIEW_NAME} AS {RECOMMEND_VIEW_SELECT};")
+                elif current != 'm':
+                    cur.execute(f"CREATE MATERIALIZED VIEW {RECOMMEND_VIEW_NAME} AS {RECOMMEND_VIEW_SELECT} WITH DATA;")
+                    # REFRESH ... CONCURRENTLY 에 필요한 UNIQUE 인덱스
+                    cur.execute(
+                        f"CREATE UNIQUE INDEX IF NOT EXISTS ux_{RECOMMEND_VIEW_NAME}_number "
+                        f"ON {RECOMMEND_VIEW_NAME} (number);"
+                    )
+                conn.commit()
+                print(f"✅ VIEW '{RECOMMEND_VIEW_NAME}' 준비 완료. (mode={RECOMMEND_VIEW_MODE})")
+                return True
+            except Exception as e:
+                conn.rollback()
+                print(f"DB Error (create_recommend_view): {e}")
+                return False
+            finally:
+                cur.close()
+
+    @staticmethod
+    def refresh_recommend_view():
         """
-        conn = get_connection()
-        cur = conn.cursor()
-        try:
-            cur.execute(query)
-            conn.commit()
-            print("✅ VIEW 'v_lotto_recommend_score' 생성/갱신 완료.")
+        통계 갱신 후 추천 점수를 최신화합니다. (관리자 통계 갱신 경로에서만 호출)
+        - 일반 VIEW: 조회 시마다 계산되므로 할 일이 없습니다.
+        - MATERIALIZED VIEW: REFRESH MATERIALIZED VIEW CONCURRENTLY 로 갱신하여
+          갱신 중에도 조회가 막히지 않습니다. (트랜잭션 블록 밖에서 실행해야 하므로 autocommit 사용)
+        """
+        if RECOMMEND_VIEW_MODE != 'materialized':
             return True
-        except Exception as e:
-            conn.rollback()
-            print(f"DB Error (create_recommend_view): {e}")
-            return False
-        finally:
-            cur.close()
-            conn.close()
+
+        with pooled_connection() as conn:
+            conn.autocommit = True
+            cur = conn.cursor()
+            try:
+                cur.execute(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {RECOMMEND_VIEW_NAME};")
+                print(f"✅ MATERIALIZED VIEW '{RECOMMEND_VIEW_NAME}' 갱신 완료.")
+                return True
+            except Exception as e:
+                print(f"DB Error (refresh_recommend_view): {e}")
+                return False
+            finally:
+                cur.close()
+                conn.autocommit = False
+
+    @staticmethod
+    def get_ranking():
+        """추천 점수 순으로 정렬된 번호 45개 [(number, total_score, frequency, last_draw_gap), ...]"""
+        with pooled_connection() as conn:
+            cur = conn.cursor()
+            try:
+                cur.execute(RECOMMEND_RANKING_SQL)
+                return cur.fetchall()
+            except Exception as e:
+                conn.rollback()
+                print(f"DB Error (get_ranking): {e}")
+                return []
+            finally:
+                cur.close()
 
     @staticmethod
     def get_recommended_numbers(user_id, limit=6):
@@ -44,35 +149,16 @@ class LottoRecommendDB:
         VIEW와 JOIN/WHERE를 활용하여 개인화된 추천 번호 6개를 조회합니다.
         (사용자가 과거에 선택한 번호(USER_PICK)는 제외합니다.)
         """
-        query = f"""
-        WITH 
-        -- 1. 사용자가 과거에 선택한 모든 번호를 추출 (JOIN 및 UNNEST 사용)
-        user_cold_picks AS (
-            SELECT DISTINCT unnest(ARRAY[p1, p2, p3, p4, p5, p6]) AS cold_number
-            FROM USER_PICK up
-            WHERE up.user_id = %s -- WHERE 절로 특정 사용자의 데이터만 필터링
-        )
-        -- 2. 추천 점수 VIEW에서 데이터를 가져와, 사용자의 cold_picks를 제외 (LEFT JOIN / WHERE NOT NULL)
-        SELECT
-            vrs.number,
-            vrs.total_score,
-            vrs.frequency,
-            vrs.last_draw_gap
-        FROM v_lotto_recommend_score vrs
-        LEFT JOIN user_cold_picks ucp ON vrs.number = ucp.cold_number
-        WHERE ucp.cold_number IS NULL -- 과거 선택한 번호(cold_number)가 없는 행만 선택
-        ORDER BY vrs.total_score ASC, vrs.frequency DESC 
-        LIMIT {limit};
-        """
-        conn = get_connection()
-        cur = conn.cursor()
-        try:
-            cur.execute(query, (user_id,))
-            results = cur.fetchall()
-            return results
-        except Exception as e:
-            print(f"DB Error (get_recommended_numbers with join/where): {e}")
-            return []
-        finally:
-            cur.close()
-            conn.close()
\ No newline at end of file
+        query = RECOMMENDED_NUMBERS_SQL
+        with pooled_connection() as conn:
+            cur = conn.cursor()
+            try:
+                cur.execute(query, (user_id, limit))
+                results = cur.fetchall()
+                return results
+            except Exception as e:
+                conn.rollback()
+                print(f"DB Error (get_recommended_numbers with join/where): {e}")
+                return []
+            finally:
+                cur.close()
@@ -1,76 +1,213 @@
-from db.db_config import get_connection
+from db.db_config import pooled_connection
+from db.cache_version import CacheVersionDB
+from db.lotto_pattern_stat import LottoPatternStatDB
 import sys
 
+# %(upper)s 회차까지의 이력으로부터 번호별 (number, frequency, last_draw_gap) 을 계산하는 SELECT
+# (upper 는 갱신 시작 시 한 번 읽은 최신 회차. 갱신 도중 적재된 회차는 다음 갱신에서 반영)
+FULL_STAT_SELECT = """
+    WITH NumberCounts AS (
+        -- 모든 당첨 번호(n1~n6)를 행으로 변환하여, 마지막 출현 회차를 찾습니다.
+        SELECT 
+            unnest(ARRAY[n1, n2, n3, n4, n5, n6]) AS number_val,
+            draw_no
+        FROM lotto_draw
+        WHERE draw_no <= %(upper)s
+    ),
+    AggregatedStats AS (
+        SELECT
+            g.number,
+            COALESCE(count(c.number_val), 0) AS frequency, -- ★ 수정: DDL에 맞게 frequency 사용
+            MAX(c.draw_no) AS last_draw_no,
+            COUNT(c.number_val) AS num_occurrences
+        FROM (
+            SELECT generate_series(1, 45) AS number 
+        ) AS g
+        LEFT JOIN NumberCounts AS c ON g.number = c.number_val
+        GROUP BY g.number
+    )
+    SELECT
+        number,
+        frequency,
+        -- last_draw_gap 계산: 최신 회차(upper) - 마지막 출현 회차
+        CASE 
+            WHEN num_occurrences > 0 THEN %(upper)s - last_draw_no
+            ELSE NULL -- 한 번도 나오지 않은 번호는 NULL (last_draw_gap DDL에 맞춤)
+        END AS last_draw_gap
+    FROM AggregatedStats
+"""
+
+# 새로 추가된 회차(워터마크 < draw_no <= new_max)만 읽어서, 출현한 번호는 빈도/간격을 갱신하고
+# 나머지 번호는 간격만 (새 최신 회차 - 이전 최신 회차) 만큼 늘리는 단일 UPDATE
+INCREMENTAL_STAT_UPDATE = """
+    WITH NewNumbers AS (
+        SELECT
+            unnest(ARRAY[n1, n2, n3, n4, n5, n6]) AS number_val,
+            draw_no
+        FROM lotto_draw
+        WHERE draw_no > %(watermark)s AND draw_no <= %(new_max)s -- PK 인덱스 범위 스캔
+    ),
+    NewCounts AS (
+        SELECT number_val, COUNT(*) AS cnt, MAX(draw_no) AS last_draw_no
+        FROM NewNumbers
+        GROUP BY number_val
+    )
+    UPDATE lotto_stat s
+    SET
+        frequency = s.frequency + COALESCE(nc.cnt, 0),
+        last_draw_gap = CASE
+            WHEN nc.number_val IS NOT NULL THEN %(new_max)s - nc.last_draw_no
+            WHEN s.last_draw_gap IS NULL THEN NULL
+            ELSE s.last_draw_gap + (%(new_max)s - %(watermark)s)
+        END
+    FROM lotto_stat base
+    LEFT JOIN NewCounts nc ON nc.number_val = base.number
+    WHERE base.number = s.number;
+"""
+
+
 # StatService에서 사용할 DB 접근 클래스
 class LottoStatDB:
 
     # =========================================================================
     # 1. 통계 데이터 갱신 (트랜잭션 적용)
     # DDL: number, frequency, last_draw_gap 만 사용
+    #
+    # mode
+    #   - 'incremental': 마지막 갱신 이후 추가된 회차만 반영 (비용 ∝ 신규 회차 수)
+    #   - 'full'       : 전체 이력으로 재계산 (UPSERT 이므로 갱신 중에도 테이블이 비지 않음)
+    #   - 'verify'     : 전체 재계산 결과와 현재 통계를 비교하고, 다르면 전체 재계산으로 교정
+    # 워터마크(마지막으로 반영한 회차)는 lotto_stat_meta 에 저장합니다.
+    # 워터마크 아래 회차가 적재/수정되면 적재 스크립트가 reset_watermark 로 지워 다음 갱신을 전체 재계산으로 돌립니다.
+    # 패턴 통계(합계/홀짝/저고/연속 분포, 번호 쌍/삼중 동시 출현)도 같은 트랜잭션에서 갱신합니다.
     # =========================================================================
     @staticmethod
-    def update_statistics_transaction():
-        conn = None
-        cur = None
-        try:
-            conn = get_connection()
+    def _apply_full_rebuild(cur, upper):
+        """upper 회차까지의 전체 재계산 결과를 UPSERT 합니다. (TRUNCATE 를 사용하지 않아 조회 중인 사용자가 빈 테이블을 보지 않음)"""
+        cur.execute(f"""
+            INSERT INTO lotto_stat (number, frequency, last_draw_gap)
+            {FULL_STAT_SELECT}
+            ON CONFLICT (number) DO UPDATE
+            SET frequency = EXCLUDED.frequency,
+                last_draw_gap = EXCLUDED.last_draw_gap;
+        """, {'upper': upper})
+
+    @staticmethod
+    def _save_watermark(cur, draw_no):
+        """실제로 반영한 마지막 회차를 저장합니다. (MAX(draw_no) 를 다시 읽으면 그 사이 적재된 회차를 건너뜀)"""
+        cur.execute("""
+            INSERT INTO lotto_stat_meta (id, last_draw_no, updated_at)
+            VALUES (1, %s, NOW())
+            ON CONFLICT (id) DO UPDATE
+            SET last_draw_no = EXCLUDED.last_draw_no,
+                updated_at = EXCLUDED.updated_at;
+        """, (draw_no,))
+
+    @staticmethod
+    def reset_watermark(cur, min_draw_no):
+        """
+        min_draw_no 이하로 워터마크가 이미 지나간 회차가 추가/수정된 경우 워터마크를 지웁니다. (호출한 쪽의 트랜잭션 안에서 실행)
+        증분 갱신은 워터마크 이후 회차만 더하므로, 워터마크 아래 회차의 추가(누락분 적재)나 번호 수정(--update)은
+        반영할 수 없습니다. 워터마크가 없으면 다음 갱신이 전체 재계산(패턴 통계 포함)으로 진행됩니다.
+        반환: 워터마크를 지웠으면 True
+        """
+        cur.execute(
+            "DELETE FROM lotto_stat_meta WHERE id = 1 AND last_draw_no >= %s;",
+            (min_draw_no,)
+        )
+        return cur.rowcount > 0
+
+    @staticmethod
+    def update_statistics_transaction(mode='incremental'):
+        if mode not in ('incremental', 'full', 'verify'):
+            return False, f"❌ 알 수 없는 통계 갱신 모드입니다: {mode}"
+
+        with pooled_connection() as conn:
             cur = conn.cursor()
+            try:
+                # 0. 동시에 두 번 갱신되지 않도록 워터마크 행을 잠급니다.
+                cur.execute("SELECT last_draw_no FROM lotto_stat_meta WHERE id = 1 FOR UPDATE;")
+                row = cur.fetchone()
+                watermark = row[0] if row else None
 
-            # 1. LOTTO_STAT 테이블 초기화
-            cur.execute("TRUNCATE TABLE lotto_stat RESTART IDENTITY;")
-
-            # 2. 통계 계산 및 삽입 (frequency, last_draw_gap 계산)
-            stat_query = """
-                WITH NumberCounts AS (
-                    -- 모든 당첨 번호(n1~n6)를 행으로 변환하여, 마지막 출현 회차를 찾습니다.
-                    SELECT 
-                        unnest(ARRAY[n1, n2, n3, n4, n5, n6]) AS number_val,
-                        draw_no
-                    FROM lotto_draw
-                ),
-                AggregatedStats AS (
-                    SELECT
-                        g.number,
-                        COALESCE(count(c.number_val), 0) AS frequency, -- ★ 수정: DDL에 맞게 frequency 사용
-                        MAX(c.draw_no) AS last_draw_no,
-                        COUNT(c.number_val) AS num_occurrences
-                    FROM (
-                        SELECT generate_series(1, 45) AS number 
-                    ) AS g
-                    LEFT JOIN NumberCounts AS c ON g.number = c.number_val
-                    GROUP BY g.number
-                    ORDER BY g.number
-                )
-                -- LOTTO_STAT 테이블에 최종 통계 데이터 삽입 (number, frequency, last_draw_gap)
-                INSERT INTO lotto_stat (number, frequency, last_draw_gap)
-                SELECT
-                    number,
-                    frequency,
-                    -- last_draw_gap 계산: 현재 최대 회차 - 마지막 출현 회차
-                    CASE 
-                        WHEN num_occurrences > 0 AND (SELECT MAX(draw_no) FROM lotto_draw) IS NOT NULL
-                            THEN (SELECT MAX(draw_no) FROM lotto_draw) - last_draw_no
-                        ELSE NULL -- 한 번도 나오지 않은 번호는 NULL (last_draw_gap DDL에 맞춤)
-                    END AS last_draw_gap
-                FROM AggregatedStats;
-            """
-            cur.execute(stat_query)
-
-            # 성공 시 커밋 (트랜잭션 완료)
-            conn.commit()
-            return True, "✅ 로또 통계가 성공적으로 갱신되었습니다. (Transaction Complete)"
-
-        except Exception as e:
-            if conn:
+                cur.execute("SELECT COUNT(*) FROM lotto_stat;")
+                stat_rows = cur.fetchone()[0]
+
+                # 워터마크가 없거나 통계 행이 불완전하면 증분 계산을 할 수 없으므로 전체 재계산
+                if mode == 'incremental' and (watermark is None or stat_rows != 45):
+                    mode = 'full'
+
+                # 이번 갱신이 반영할 마지막 회차를 한 번만 읽고, 이후 모든 문장을 이 값으로 제한합니다.
+                # (READ COMMITTED 에서는 문장마다 스냅샷이 달라 그 사이 적재된 회차가 섞이거나 건너뛰어질 수 있음)
+                cur.execute("SELECT COALESCE(MAX(draw_no), 0) FROM lotto_draw;")
+                new_max = cur.fetchone()[0]
+
+                if mode == 'incremental':
+                    cur.execute(
+                        "SELECT COUNT(*) FROM lotto_draw WHERE draw_no > %s AND draw_no <= %s;",
+                        (watermark, new_max)
+                    )
+                    new_draws = cur.fetchone()[0]
+                    # 패턴 통계가 워터마크까지 반영되어 있지 않으면(테이블 신규 생성 등) 패턴만 전체 재계산
+                    patterns_consistent = LottoPatternStatDB.is_consistent(cur, watermark)
+                    if new_draws == 0:
+                        if not patterns_consistent:
+                            LottoPatternStatDB.apply(cur, watermark)
+                            CacheVersionDB.bump_version(cur)
+                            conn.commit()
+                            return True, f"✅ 새로 추가된 회차가 없어 패턴 통계만 다시 계산했습니다. (마지막 반영 회차: {watermark})"
+                        conn.commit()
+                        return True, f"✅ 새로 추가된 회차가 없습니다. (마지막 반영 회차: {watermark})"
+
+                    cur.execute(INCREMENTAL_STAT_UPDATE, {'watermark': watermark, 'new_max': new_max})
+                    LottoPatternStatDB.apply(cur, new_max, watermark if patterns_consistent else 0)
+                    LottoStatDB._save_watermark(cur, new_max)
+                    CacheVersionDB.bump_version(cur)
+                    conn.commit()
+                    return True, (f"✅ 로또 통계가 증분 갱신되었습니다. "
+                                  f"({watermark}회 이후 {new_draws}개 회차 반영, 최신 {new_max}회)")
+
+                if mode == 'verify':
+                    cur.execute(f"""
+                        SELECT COUNT(*)
+                        FROM ({FULL_STAT_SELECT}) f
+                        FULL OUTER JOIN lotto_stat s ON s.number = f.number
+                        WHERE f.number IS NULL OR s.number IS NULL
+                           OR s.frequency IS DISTINCT FROM f.frequency
+                           OR s.last_draw_gap IS DISTINCT FROM f.last_draw_gap;
+                    """, {'upper': new_max})
+                    mismatches = cur.fetchone()[0]
+                    pattern_mismatches = LottoPatternStatDB.count_mismatches(cur, new_max)
+                    if mismatches == 0 and pattern_mismatches == 0:
+                        LottoStatDB._save_watermark(cur, new_max)
+                        conn.commit()
+                        return True, "✅ 검증 완료: 현재 통계가 전체 재계산 결과와 일치합니다."
+
+                    LottoStatDB._apply_full_rebuild(cur, new_max)
+                    LottoPatternStatDB.apply(cur, new_max)
+                    LottoStatDB._save_watermark(cur, new_max)
+                    CacheVersionDB.bump_version(cur)
+                    conn.commit()
+                    return True, (f"⚠️ 검증 결과 {mismatches}개 번호의 통계와 {pattern_mismatches}개 패턴 통계 행이 달라 "
+                                  f"전체 재계산으로 교정했습니다.")
+
+                # mode == 'full'
+                LottoStatDB._apply_full_rebuild(cur, new_max)
+                LottoPatternStatDB.apply(cur, new_max)
+                LottoStatDB._save_watermark(cur, new_max)
+                CacheVersionDB.bump_version(cur)
+
+                # 성공 시 커밋 (트랜잭션 완료)
+                conn.commit()
+                return True, "✅ 로또 통계가 성공적으로 갱신되었습니다. (Transaction Complete)"
+
+            except Exception as e:
                 # 오류 발생 시 롤백 (트랜잭션 취소)
                 conn.rollback()
-            print("DB Error (update_statistics_transaction):", e, file=sys.stderr)
-            return False, f"❌ 로또 통계 갱신 실패 (DB 오류, 롤백됨): {e}"
-        finally:
-            if cur:
+                print("DB Error (update_statistics_transaction):", e, file=sys.stderr)
+                return False, f"❌ 로또 통계 갱신 실패 (DB 오류, 롤백됨): {e}"
+            finally:
                 cur.close()
-            if conn:
-                conn.close()
 
 
     # =========================================================================
@@ -79,6 +216,7 @@ class LottoStatDB:
     # =========================================================================
     @staticmethod
     def get_all_stats():
+        """번호별 통계 목록. DB 오류 시 None (통계가 아직 없는 경우의 [] 와 구분)"""
         query = """
             SELECT 
                 number,
@@ -87,30 +225,26 @@ class LottoStatDB:
             FROM lotto_stat
             ORDER BY number ASC;
         """
-        conn = None
-        cur = None 
         stats = []
-        try:
-            conn = get_connection()
+        with pooled_connection() as conn:
             cur = conn.cursor()
-            cur.execute(query)
-            
-            # 조회 결과를 딕셔너리 리스트로 변환
-            rows = cur.fetchall()
-            
-            for row in rows:
-                stats.append({
-                    'number': row[0],
-                    'frequency': row[1], 
-                    'last_draw_gap': row[2]
-                })
+            try:
+                cur.execute(query)
                 
-            return stats
-        except Exception as e:
-            print("DB Error (get_all_stats):", e, file=sys.stderr)
-            return []
-        finally:
-            if cur:
-                cur.close()
-            if conn:
-                conn.close()
\ No newline at end of file
+                # 조회 결과를 딕셔너리 리스트로 변환
+                rows = cur.fetchall()
+                
+                for row in rows:
+                    stats.append({
+                        'number': row[0],
+                        'frequency': row[1], 
+                        'last_draw_gap': row[2]
+                    })
+                    
+                return stats
+            except Exception as e:
+                conn.rollback()
+                print("DB Error (get_all_stats):", e, file=sys.stderr)
+                return None
+            finally:
+                cur.close()
\ No newline at end of file
@@ -0,0 +1,371 @@
+# db/migrations.py
+"""
+스키마 마이그레이션 (버전 관리) 및 부트스트랩.
+
+테이블/인덱스 DDL 은 MIGRATIONS 에 버전 순서대로 추가하고, 적용한 버전은 schema_migrations 테이블에 기록합니다.
+서버 시작 시(DB_BOOTSTRAP_ON_STARTUP=1) 또는 아래 CLI 로 아직 적용되지 않은 버전만 실행하며,
+요청 처리 경로에서는 DDL 을 실행하지 않습니다.
+
+  - 각 버전은 자신의 트랜잭션 안에서 실행되고, 같은 트랜잭션에서 schema_migrations 에 기록됩니다.
+  - 여러 워커가 동시에 시작해도 advisory lock 으로 한 프로세스만 마이그레이션을 실행합니다.
+  - 모든 DDL 은 IF NOT EXISTS 이므로, schema_migrations 가 없던 기존 DB 에도 그대로 적용할 수 있습니다.
+  - 추천 VIEW 는 RECOMMEND_VIEW_MODE 설정에 따라 형태가 바뀌므로 마이그레이션 뒤에 매번 준비합니다.
+
+    python -m db.migrations                  # 미적용 마이그레이션 실행 + 추천 VIEW 준비
+    python -m db.migrations status           # 버전별 적용 여부
+    python -m db.migrations migrate --target 2
+    python -m db.migrations explain          # 주요 조회의 실행 계획에서 순차 스캔 점검 (있으면 종료 코드 1)
+"""
+import argparse
+import json
+import sys
+
+from db.db_config import pooled_connection
+from db.lotto_draw import DRAWS_BEFORE_SQL, DRAWS_FIRST_PAGE_SQL
+from db.lotto_recommend import LottoRecommendDB, RECOMMENDED_NUMBERS_SQL
+from db.pick_reconcile import RECONCILE_BATCH_SQL
+from db.user_pick import GET_USER_PICKS_SQL, PICK_NUMBER_SETS_SQL, PICK_RECONCILED_SQL
+from db.user_pick_mask import BACKFILL_SQL as PICK_MASK_BACKFILL_SQL, PICK_MASK_TRIGGER_SQL, TRIGGER_MIGRATION_VERSION
+
+# 동시에 시작한 워커들이 같은 마이그레이션을 실행하지 않도록 잡는 advisory lock 키
+MIGRATION_LOCK_KEY = 72_450_001
+
+MIGRATIONS_TABLE_DDL = """
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    version INT PRIMARY KEY,
+    name VARCHAR(100) NOT NULL,
+    applied_at TIMESTAMP NOT NULL DEFAULT NOW()
+);
+"""
+
+# README 의 DDL 과 동일 (이미 있으면 건너뜀)
+# user_pick.draw_no 는 저장 시점에 추첨 회차가 정해지지 않으므로 NULL 을 허용합니다.
+BASELINE_DDL = """
+CREATE TABLE IF NOT EXISTS user_account (
+    user_id SERIAL PRIMARY KEY,
+    username VARCHAR(50) UNIQUE NOT NULL,
+    password VARCHAR(200) NOT NULL,
+    join_date TIMESTAMP DEFAULT NOW(),
+    status VARCHAR(10)
+        CHECK (status IN ('active', 'inactive', 'admin'))
+        DEFAULT 'active'
+);
+
+CREATE TABLE IF NOT EXISTS lotto_draw (
+    draw_no INT PRIMARY KEY,
+    draw_date DATE NOT NULL,
+
+    n1 INT CHECK (n1 BETWEEN 1 AND 45),
+    n2 INT CHECK (n2 BETWEEN 1 AND 45),
+    n3 INT CHECK (n3 BETWEEN 1 AND 45),
+    n4 INT CHECK (n4 BETWEEN 1 AND 45),
+    n5 INT CHECK (n5 BETWEEN 1 AND 45),
+    n6 INT CHECK (n6 BETWEEN 1 AND 45),
+    bonus INT CHECK (bonus BETWEEN 1 AND 45),
+
+    CONSTRAINT draw_sorted_and_distinct CHECK (
+        n1 < n2 AND n2 < n3 AND n3 < n4 AND n4 < n5 AND n5 < n6
+        AND bonus NOT IN (n1, n2, n3, n4, n5, n6)
+    )
+);
+
+CREATE TABLE IF NOT EXISTS user_pick (
+    pick_id SERIAL PRIMARY KEY,
+    user_id INT NOT NULL REFERENCES user_account(user_id),
+    draw_no INT REFERENCES lotto_draw(draw_no),
+    reg_date TIMESTAMP DEFAULT NOW(),
+
+    p1 INT CHECK (p1 BETWEEN 1 AND 45),
+    p2 INT CHECK (p2 BETWEEN 1 AND 45),
+    p3 INT CHECK (p3 BETWEEN 1 AND 45),
+    p4 INT CHECK (p4 BETWEEN 1 AND 45),
+    p5 INT CHECK (p5 BETWEEN 1 AND 45),
+    p6 INT CHECK (p6 BETWEEN 1 AND 45),
+
+    CONSTRAINT pick_sorted_and_distinct CHECK (
+        p1 < p2 AND p2 < p3 AND p3 < p4 AND p4 < p5 AND p5 < p6
+    ),
+
+    match_count INT DEFAULT 0,
+    is_bonus_match BOOLEAN DEFAULT FALSE,
+    ranking INT DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS recommend_result (
+    rec_id SERIAL PRIMARY KEY,
+    user_id INT NOT NULL REFERENCES user_account(user_id),
+    draw_target INT NOT NULL,
+
+    r1 INT CHECK (r1 BETWEEN 1 AND 45),
+    r2 INT CHECK (r2 BETWEEN 1 AND 45),
+    r3 INT CHECK (r3 BETWEEN 1 AND 45),
+    r4 INT CHECK (r4 BETWEEN 1 AND 45),
+    r5 INT CHECK (r5 BETWEEN 1 AND 45),
+    r6 INT CHECK (r6 BETWEEN 1 AND 45),
+
+    model_version VARCHAR(50),
+    used_pick_id INT UNIQUE REFERENCES user_pick(pick_id),
+
+    created_at TIMESTAMP DEFAULT NOW(),
+
+    CONSTRAINT rec_sorted_and_distinct CHECK (
+        r1 < r2 AND r2 < r3 AND r3 < r4 AND r4 < r5 AND r5 < r6
+    )
+);
+
+CREATE TABLE IF NOT EXISTS lotto_stat (
+    number INT PRIMARY KEY
+        CHECK (number BETWEEN 1 AND 45),
+
+    frequency INT DEFAULT 0,
+    last_draw_gap INT DEFAULT NULL
+);
+
+-- 통계 증분 갱신용 워터마크 (lotto_stat 에 마지막으로 반영된 회차)
+CREATE TABLE IF NOT EXISTS lotto_stat_meta (
+    id INT PRIMARY KEY CHECK (id = 1),
+    last_draw_no INT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT NOW()
+);
+
+-- 패턴 통계 (db/lotto_pattern_stat.py, 통계 갱신 시 lotto_stat 과 함께 갱신)
+CREATE TABLE IF NOT EXISTS lotto_pattern_stat (
+    kind VARCHAR(20) NOT NULL, -- sum / odd / low / consecutive
+    value INT NOT NULL,
+    cnt INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (kind, value)
+);
+
+CREATE TABLE IF NOT EXISTS lotto_pair_stat (
+    a INT NOT NULL CHECK (a BETWEEN 1 AND 45),
+    b INT NOT NULL CHECK (b BETWEEN 1 AND 45),
+    cnt INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (a, b),
+    CHECK (a < b)
+);
+
+CREATE TABLE IF NOT EXISTS lotto_triple_stat (
+    a INT NOT NULL CHECK (a BETWEEN 1 AND 45),
+    b INT NOT NULL CHECK (b BETWEEN 1 AND 45),
+    c INT NOT NULL CHECK (c BETWEEN 1 AND 45),
+    cnt INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (a, b, c),
+    CHECK (a < b AND b < c)
+);
+
+-- 캐시 무효화용 데이터 버전 (당첨 데이터 적재 / 통계 갱신 시 증가)
+CREATE TABLE IF NOT EXISTS app_cache_version (
+    name VARCHAR(30) PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT NOW()
+);
+"""
+
+# 저장 번호 당첨 결과 정산 (db/pick_reconcile.py)
+PICK_RECONCILE_DDL = """
+ALTER TABLE user_pick ADD COLUMN IF NOT EXISTS reconciled_at TIMESTAMP;
+CREATE INDEX IF NOT EXISTS idx_user_pick_unreconciled ON user_pick (pick_id) WHERE reconciled_at IS NULL;
+CREATE INDEX IF NOT EXISTS idx_lotto_draw_date ON lotto_draw (draw_date, draw_no);
+"""
+
+# 주요 조회용 인덱스
+#   - get_user_picks / get_pick_number_sets / 추천 번호의 사용자별 unnest:
+#       (user_id, reg_date DESC) 로 사용자 범위 + 정렬을 한 번에, INCLUDE (p1..p6) 로 번호만 읽는 조회는 index-only scan
+#   - get_draws_before (당첨 번호 페이지): 페이지에 필요한 컬럼을 모두 INCLUDE 하여 index-only scan
+HOT_QUERY_INDEX_DDL = """
+CREATE INDEX IF NOT EXISTS idx_user_pick_user_reg
+    ON user_pick (user_id, reg_date DESC) INCLUDE (p1, p2, p3, p4, p5, p6);
+CREATE INDEX IF NOT EXISTS idx_lotto_draw_page
+    ON lotto_draw (draw_no DESC) INCLUDE (draw_date, n1, n2, n3, n4, n5, n6, bonus);
+ANALYZE user_pick;
+ANALYZE lotto_draw;
+"""
+
+# 사용자별 "이미 고른 번호" 비트마스크 (db/user_pick_mask.py) + 기존 번호로 초기 채우기
+PICK_MASK_DDL = f"""
+CREATE TABLE IF NOT EXISTS user_pick_mask (
+    user_id INT PRIMARY KEY REFERENCES user_account(user_id),
+    mask BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT NOW()
+);
+{PICK_MASK_BACKFILL_SQL}
+"""
+
+# 번호 저장/삭제와 같은 트랜잭션에서 마스크를 갱신하는 트리거 + 그 전에 어긋난 마스크 교정
+# (트리거 생성이 user_pick 쓰기를 잠그므로, 같은 트랜잭션의 교정과 트리거 사이에 빠지는 번호가 없음)
+PICK_MASK_TRIGGER_DDL = f"""
+{PICK_MASK_TRIGGER_SQL}
+{PICK_MASK_BACKFILL_SQL}
+"""
+
+# (버전, 이름, DDL) - 한 번 배포한 항목은 수정하지 말고 새 버전을 추가합니다.
+MIGRATIONS = (
+    (1, 'baseline tables', BASELINE_DDL),
+    (2, 'user_pick reconciliation', PICK_RECONCILE_DDL),
+    (3, 'hot query indexes', HOT_QUERY_INDEX_DDL),
+    (4, 'user_pick_mask', PICK_MASK_DDL),
+    (TRIGGER_MIGRATION_VERSION, 'user_pick_mask triggers', PICK_MASK_TRIGGER_DDL),
+)
+
+# EXPLAIN 점검 대상: (이름, SQL, 예시 파라미터)
+HOT_QUERIES = (
+    ('get_user_picks', GET_USER_PICKS_SQL, (1,)),
+    ('get_user_picks (reconciled_at)', PICK_RECONCILED_SQL, (1,)),
+    ('get_pick_number_sets', PICK_NUMBER_SETS_SQL, (1,)),
+    ('get_recommended_numbers', RECOMMENDED_NUMBERS_SQL, (1, 6)),
+    ('get_draws_before (first page)', DRAWS_FIRST_PAGE_SQL, (20,)),
+    ('get_draws_before', DRAWS_BEFORE_SQL, (1000, 20)),
+    ('reconcile batch', RECONCILE_BATCH_SQL, {'after': 0, 'limit': 10000}),
+)
+
+# 전체를 읽는 것이 정상인 작은 테이블 (lotto_stat: 45행, 추천 VIEW 의 순위 계산)
+SEQ_SCAN_ALLOWED = {'lotto_stat'}
+
+
+def _applied_versions(cur):
+    cur.execute("SELECT version FROM schema_migrations;")
+    return {row[0] for row in cur.fetchall()}
+
+
+def migrate(target=None):
+    """
+    아직 적용되지 않은 마이그레이션을 버전 순서대로 실행합니다. (target 이 있으면 그 버전까지만)
+    반환: (성공 여부, 이번에 적용한 버전 목록 또는 오류 메시지)
+    """
+    applied_now = []
+    with pooled_connection() as conn:
+        cur = conn.cursor()
+        try:
+            cur.execute(MIGRATIONS_TABLE_DDL)
+            conn.commit()
+            cur.execute("SELECT pg_advisory_lock(%s);", (MIGRATION_LOCK_KEY,))
+            try:
+                # 잠금을 기다리는 동안 다른 워커가 적용했을 수 있으므로 잠금 후에 조회합니다.
+                applied = _applied_versions(cur)
+                conn.commit()
+                for version, name, ddl in MIGRATIONS:
+                    if version in applied or (target is not None and version > target):
+                        continue
+                    cur.execute(ddl)
+                    cur.execute(
+                        "INSERT INTO schema_migrations (version, name) VALUES (%s, %s);", (version, name)
+                    )
+                    conn.commit()
+                    applied_now.append(version)
+                    print(f"✅ 마이그레이션 {version} ({name}) 적용 완료.")
+            finally:
+                conn.rollback()
+                cur.execute("SELECT pg_advisory_unlock(%s);", (MIGRATION_LOCK_KEY,))
+                conn.commit()
+            return True, applied_now
+        except Exception as e:
+            conn.rollback()
+            print("DB Error (migrate):", e, file=sys.stderr)
+            return False, str(e)
+        finally:
+            cur.close()
+
+
+def status():
+    """[(버전, 이름, 적용 시각 또는 None), ...]"""
+    with pooled_connection() as conn:
+        cur = conn.cursor()
+        try:
+            cur.execute(MIGRATIONS_TABLE_DDL)
+            cur.execute("SELECT version, applied_at FROM schema_migrations;")
+            applied = dict(cur.fetchall())
+            conn.commit()
+            return [(version, name, applied.get(version)) for version, name, _ in MIGRATIONS]
+        except Exception as e:
+            conn.rollback()
+            print("DB Error (migration status):", e, file=sys.stderr)
+            return []
+        finally:
+            cur.close()
+
+
+def bootstrap_schema():
+    """
+    마이그레이션을 적용하고 추천 VIEW 를 준비합니다. 여러 번 실행해도 안전합니다.
+    성공 시 True, 실패 시 False 를 반환합니다.
+    """
+    success, _ = migrate()
+    if not success:
+        return False
+    return LottoRecommendDB.create_recommend_view()
+
+
+def _seq_scans(plan):
+    """EXPLAIN (FORMAT JSON) 계획 트리에서 순차 스캔하는 테이블 이름 목록"""
+    found = []
+    if plan.get('Node Type') == 'Seq Scan':
+        found.append(plan.get('Relation Name'))
+    for child in plan.get('Plans', ()):
+        found.extend(_seq_scans(child))
+    return found
+
+
+def explain_hot_queries():
+    """
+    주요 조회의 실행 계획을 확인합니다.
+    enable_seqscan = off 로 계획을 세우므로, 데이터가 적은 개발 DB 에서도 "쓸 수 있는 인덱스가 없는" 조회만
+    순차 스캔으로 남습니다. (EXPLAIN 만 실행하며 문장을 실제로 실행하지 않습니다)
+    반환: [{'name', 'seq_scans', 'node', 'cost'}, ...] (DB 오류 시 None)
+    """
+    results = []
+    with pooled_connection() as conn:
+        cur = conn.cursor()
+        try:
+            cur.execute("SET LOCAL enable_seqscan = off;")
+            for name, sql, params in HOT_QUERIES:
+                cur.execute("EXPLAIN (FORMAT JSON) " + sql.strip().rstrip(';'), params)
+                plan = cur.fetchone()[0]
+                if isinstance(plan, str):
+                    plan = json.loads(plan)
+                root = plan[0]['Plan']
+                results.append({
+                    'name': name,
+                    'seq_scans': [t for t in _seq_scans(root) if t not in SEQ_SCAN_ALLOWED],
+                    'node': root.get('Node Type'),
+                    'cost': root.get('Total Cost'),
+                })
+            return results
+        except Exception as e:
+            print("DB Error (explain_hot_queries):", e, file=sys.stderr)
+            return None
+        finally:
+            # EXPLAIN 은 데이터를 바꾸지 않지만, SET LOCAL 설정을 되돌리기 위해 항상 롤백합니다.
+            conn.rollback()
+            cur.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="스키마 마이그레이션 / 실행 계획 점검")
+    parser.add_argument('command', nargs='?', default='migrate', choices=('migrate', 'status', 'explain'))
+    parser.add_argument('--target', type=int, default=None, help="이 버전까지만 적용 (migrate)")
+    args = parser.parse_args(argv)
+
+    if args.command == 'status':
+        rows = status()
+        for version, name, applied_at in rows:
+            state = applied_at.strftime('%Y-%m-%d %H:%M:%S') if applied_at else '미적용'
+            print(f"{version:>4}  {name:<30} {state}")
+        return 0 if rows else 1
+
+    if args.command == 'explain':
+        results = explain_hot_queries()
+        if results is None:
+            return 1
+        for r in results:
+            mark = '⚠️ 순차 스캔: ' + ', '.join(r['seq_scans']) if r['seq_scans'] else '✅'
+            print(f"{r['name']:<32} {r['node']:<20} cost={r['cost']:<10} {mark}")
+        return 1 if any(r['seq_scans'] for r in results) else 0
+
+    if args.target is None:
+        return 0 if bootstrap_schema() else 1
+    success, _ = migrate(args.target)
+    return 0 if success else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
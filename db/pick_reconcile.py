@@ -0,0 +1,126 @@
+# db/pick_reconcile.py
+"""
+저장 번호 당첨 결과 정산 (user_pick.draw_no / match_count / is_bonus_match / ranking / reconciled_at).
+
+번호는 추첨 회차 없이(draw_no = NULL) 저장되므로, 새 회차가 적재되면 아직 정산되지 않은 번호
+(reconciled_at IS NULL)를 pick_id 순서로 BATCH 개씩 잘라 한 문장의 UPDATE 로 정산합니다.
+
+  - 대상 회차 : draw_no 가 있으면 그 회차, 없으면 저장 시각 이후 판매 마감(추첨일 SALES_CUTOFF)이 지나지 않은 첫 회차
+  - 일치 개수 : (p1 IN (n1..n6))::int + ... (행 단위 산술, 회차 1개와만 비교)
+  - 대상 회차가 아직 적재되지 않은 번호는 reconciled_at 이 NULL 로 남아 다음 실행에서 다시 시도됩니다.
+  - 배치마다 커밋하므로 중간에 멈춰도 다음 실행은 남은 번호부터 이어서 처리합니다. (reconciled_at IS NULL 부분 인덱스)
+  - 이미 정산된 번호는 다시 건드리지 않으므로 여러 번 실행해도 결과가 같습니다.
+    당첨 번호가 수정된 회차는 reset_draws 로 정산을 취소한 뒤 다시 정산합니다.
+"""
+import sys
+
+from db.db_config import pooled_connection
+
+SALES_CUTOFF_HOURS = 20     # 추첨일 20시 이후 저장한 번호는 다음 회차 대상
+
+_PICK_COLUMNS = ('p1', 'p2', 'p3', 'p4', 'p5', 'p6')
+_DRAW_NUMBERS = "d.n1, d.n2, d.n3, d.n4, d.n5, d.n6"
+_MATCH_EXPR = " + ".join(f"(t.{p} IN ({_DRAW_NUMBERS}))::int" for p in _PICK_COLUMNS)
+_BONUS_EXPR = f"d.bonus IN ({', '.join('t.' + p for p in _PICK_COLUMNS)})"
+
+# pick_id > %(after)s 인 미정산 번호 %(limit)s 개를 정산하고 (마지막 pick_id, 확인한 수, 정산한 수) 를 반환
+RECONCILE_BATCH_SQL = f"""
+    WITH batch AS (
+        SELECT pick_id
+        FROM user_pick
+        WHERE reconciled_at IS NULL AND pick_id > %(after)s
+        ORDER BY pick_id
+        LIMIT %(limit)s
+    ),
+    target AS (
+        SELECT p.pick_id, p.p1, p.p2, p.p3, p.p4, p.p5, p.p6,
+               COALESCE(p.draw_no, nxt.draw_no) AS draw_no
+        FROM user_pick p
+        JOIN batch USING (pick_id)
+        LEFT JOIN LATERAL (
+            SELECT d.draw_no
+            FROM lotto_draw d
+            WHERE d.draw_date > (p.reg_date - INTERVAL '{SALES_CUTOFF_HOURS} hours')::date
+            ORDER BY d.draw_date, d.draw_no
+            LIMIT 1
+        ) nxt ON p.draw_no IS NULL
+    ),
+    result AS (
+        SELECT t.pick_id, t.draw_no,
+               {_MATCH_EXPR} AS match_count,
+               {_BONUS_EXPR} AS is_bonus_match
+        FROM target t
+        JOIN lotto_draw d ON d.draw_no = t.draw_no
+    ),
+    updated AS (
+        UPDATE user_pick u
+        SET draw_no = r.draw_no,
+            match_count = r.match_count,
+            is_bonus_match = r.is_bonus_match,
+            ranking = CASE
+                WHEN r.match_count = 6 THEN 1
+                WHEN r.match_count = 5 AND r.is_bonus_match THEN 2
+                WHEN r.match_count = 5 THEN 3
+                WHEN r.match_count = 4 THEN 4
+                WHEN r.match_count = 3 THEN 5
+                ELSE 0
+            END,
+            reconciled_at = NOW()
+        FROM result r
+        WHERE u.pick_id = r.pick_id
+        RETURNING u.pick_id
+    )
+    SELECT (SELECT MAX(pick_id) FROM batch),
+           (SELECT COUNT(*) FROM batch),
+           (SELECT COUNT(*) FROM updated);
+"""
+
+
+class PickReconcileDB:
+
+    @staticmethod
+    def reconcile(batch_size=10000, max_batches=None):
+        """
+        미정산 번호를 배치 단위로 정산합니다. (배치마다 커밋)
+        반환: (성공 여부, {'batches', 'scanned', 'reconciled', 'pending'} 또는 오류 메시지)
+        """
+        summary = {'batches': 0, 'scanned': 0, 'reconciled': 0}
+        after = 0
+        with pooled_connection() as conn:
+            cur = conn.cursor()
+            try:
+                while max_batches is None or summary['batches'] < max_batches:
+                    cur.execute(RECONCILE_BATCH_SQL, {'after': after, 'limit': batch_size})
+                    last_pick_id, scanned, reconciled = cur.fetchone()
+                    conn.commit()
+                    if not scanned:
+                        break
+                    after = last_pick_id
+                    summary['batches'] += 1
+                    summary['scanned'] += scanned
+                    summary['reconciled'] += reconciled
+
+                # 대상 회차가 아직 적재되지 않은 번호 수
+                cur.execute("SELECT COUNT(*) FROM user_pick WHERE reconciled_at IS NULL;")
+                summary['pending'] = cur.fetchone()[0]
+                conn.commit()
+                return True, summary
+            except Exception as e:
+                conn.rollback()
+                print("DB Error (reconcile):", e, file=sys.stderr)
+                return False, str(e)
+            finally:
+                cur.close()
+
+    @staticmethod
+    def reset_draws(cur, draw_source):
+        """
+        당첨 번호가 바뀐 회차를 대상으로 한 번호의 정산을 취소합니다. (호출한 쪽의 트랜잭션 안에서 실행)
+        draw_source: 회차 번호를 돌려주는 SELECT 문 (예: "SELECT draw_no FROM lotto_draw_stage")
+        """
+        cur.execute(f"""
+            UPDATE user_pick
+            SET reconciled_at = NULL
+            WHERE reconciled_at IS NOT NULL AND draw_no IN ({draw_source});
+        """)
+        return cur.rowcount
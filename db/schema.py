@@ -0,0 +1,17 @@
+# db/schema.py
+"""
+스키마 부트스트랩 (호환용).
+
+테이블/인덱스 DDL 과 버전 관리는 db/migrations.py 로 옮겨졌습니다.
+
+    python -m db.schema        # python -m db.migrations 와 동일
+"""
+import sys
+
+from db.migrations import bootstrap_schema
+
+__all__ = ['bootstrap_schema']
+
+
+if __name__ == "__main__":
+    sys.exit(0 if bootstrap_schema() else 1)
@@ -1,4 +1,4 @@
-from db.db_config import get_connection
+from db.db_config import pooled_connection
 from datetime import datetime
 
 class UserAccountDB:
@@ -8,20 +8,18 @@ class UserAccountDB:
             INSERT INTO user_account (username, password, join_date, status)
             VALUES (%s, %s, %s, %s)
         """
-        conn = get_connection()
-        cur = conn.cursor()
-
-        try:
-            cur.execute(query, (username, password_hash, datetime.now(), 'active'))
-            conn.commit()
-            return True
-        except Exception as e:
-            conn.rollback()
-            print("DB Error (create_user):", e)
-            return False
-        finally:
-            cur.close()
-            conn.close()
+        with pooled_connection() as conn:
+            cur = conn.cursor()
+            try:
+                cur.execute(query, (username, password_hash, datetime.now(), 'active'))
+                conn.commit()
+                return True
+            except Exception as e:
+                conn.rollback()
+                print("DB Error (create_user):", e)
+                return False
+            finally:
+                cur.close()
 
     @staticmethod
     def get_user_by_username(username):
@@ -30,13 +28,33 @@ class UserAccountDB:
             FROM user_account
             WHERE username = %s
         """
-        conn = get_connection()
-        cur = conn.cursor()
-
-        cur.execute(query, (username,))
-        row = cur.fetchone()
-
-        cur.close()
-        conn.close()
+        with pooled_connection() as conn:
+            cur = conn.cursor()
+            try:
+                cur.execute(query, (username,))
+                row = cur.fetchone()
+            finally:
+                cur.close()
 
         return row
+
+    @staticmethod
+    def update_password_hash(user_id, password_hash):
+        """비밀번호 해시를 갱신합니다. (bcrypt cost factor 변경 시 로그인 성공 후 재해싱)"""
+        query = """
+            UPDATE user_account
+            SET password = %s
+            WHERE user_id = %s
+        """
+        with pooled_connection() as conn:
+            cur = conn.cursor()
+            try:
+                cur.execute(query, (password_hash, user_id))
+                conn.commit()
+                return True
+            except Exception as e:
+                conn.rollback()
+                print("DB Error (update_password_hash):", e)
+                return False
+            finally:
+                cur.close()
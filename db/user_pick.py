@@ -1,5 +1,32 @@
-from db.db_config import get_connection
+from db.db_config import pooled_connection
 from datetime import datetime
+from psycopg2.extras import execute_values
+
+# 자주 실행되는 조회 (db/migrations.py 의 EXPLAIN 점검에서도 같은 문장을 사용)
+# user_pick (user_id, reg_date DESC) 인덱스로 사용자별 조회 + 정렬을 한 번의 인덱스 스캔으로 처리
+# (기본 스키마의 컬럼만 조회하므로 마이그레이션 적용 여부와 관계없이 동작)
+GET_USER_PICKS_SQL = """
+    SELECT 
+        pick_id, user_id, draw_no, reg_date, 
+        p1, p2, p3, p4, p5, p6,
+        match_count, is_bonus_match, ranking
+    FROM user_pick
+    WHERE user_id = %s
+    ORDER BY reg_date DESC;
+"""
+
+# 정산 시각 (reconciled_at 은 마이그레이션 2 에서 추가된 컬럼이므로 따로 조회)
+PICK_RECONCILED_SQL = """
+    SELECT pick_id, reconciled_at
+    FROM user_pick
+    WHERE user_id = %s AND reconciled_at IS NOT NULL;
+"""
+
+PICK_NUMBER_SETS_SQL = """
+    SELECT p1, p2, p3, p4, p5, p6
+    FROM user_pick
+    WHERE user_id = %s;
+"""
 
 class UserPickDB:
     @staticmethod
@@ -12,61 +39,124 @@ class UserPickDB:
             VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
             RETURNING pick_id;
         """
-        conn = get_connection()
-        cur = conn.cursor()
+        with pooled_connection() as conn:
+            cur = conn.cursor()
         
-        try:
-            # draw_no에 None을 전달 (NULL로 저장)
-            params = (user_id, None, n1, n2, n3, n4, n5, n6, datetime.now()) 
-            cur.execute(query, params)
-            pick_id = cur.fetchone()[0]
-            conn.commit()
-            return True, pick_id
-        except Exception as e:
-            conn.rollback()
-            print(f"DB Error (save_user_pick): {e}")
-            return False, str(e)
-        finally:
-            cur.close()
-            conn.close()
+            try:
+                # draw_no에 None을 전달 (NULL로 저장)
+                params = (user_id, None, n1, n2, n3, n4, n5, n6, datetime.now()) 
+                cur.execute(query, params)
+                pick_id = cur.fetchone()[0]
+                # 사용자별 "이미 고른 번호" 마스크는 user_pick 트리거가 같은 트랜잭션에서 갱신
+                conn.commit()
+                return True, pick_id
+            except Exception as e:
+                conn.rollback()
+                print(f"DB Error (save_user_pick): {e}")
+                return False, str(e)
+            finally:
+                cur.close()
 
     @staticmethod
-    def get_user_picks(user_id):
+    def save_user_picks_bulk(user_id, tickets):
         """
-        [조회 함수] DB 컬럼 이름 'reg_date'를 사용하며, 인덱스 4번부터 번호를 조회합니다.
+        [일괄 저장 함수] 번호 조합 여러 개를 다중 행 INSERT 한 번, 커밋 한 번으로 저장합니다.
+        tickets: [[n1, ..., n6], ...] (검증/정렬은 서비스 계층에서 완료)
+        반환: (True, [pick_id, ...] (입력 순서)) 또는 (False, 오류 메시지)
         """
         query = """
-            SELECT 
-                pick_id, user_id, draw_no, reg_date, 
-                p1, p2, p3, p4, p5, p6
-            FROM user_pick
-            WHERE user_id = %s
-            ORDER BY reg_date DESC;
+            INSERT INTO user_pick (user_id, draw_no, p1, p2, p3, p4, p5, p6, reg_date)
+            VALUES %s
+            RETURNING pick_id;
         """
-        conn = get_connection()
-        cur = conn.cursor()
-        picks = []
+        now = datetime.now()
+        rows = [(user_id, None, *numbers, now) for numbers in tickets]
+        with pooled_connection() as conn:
+            cur = conn.cursor()
 
-        try:
-            cur.execute(query, (user_id,))
-            rows = cur.fetchall()
-            
-            for row in rows:
-                picks.append({
-                    'pick_id': row[0],
-                    # p1은 인덱스 4번부터 시작합니다. (p1~p6: row[4] ~ row[9])
-                    'numbers': [row[4], row[5], row[6], row[7], row[8], row[9]], 
-                    'pick_date': row[3]
-                })
+            try:
+                # page_size 를 행 수로 맞춰 한 문장으로 전송 (RETURNING 결과도 한 번에 수신)
+                result = execute_values(cur, query, rows, page_size=max(len(rows), 1), fetch=True)
+                conn.commit()
+                return True, [row[0] for row in result]
+            except Exception as e:
+                conn.rollback()
+                print(f"DB Error (save_user_picks_bulk): {e}")
+                return False, str(e)
+            finally:
+                cur.close()
+
+    @staticmethod
+    def get_user_picks(user_id):
+        """
+        [조회 함수] DB 컬럼 이름 'reg_date'를 사용하며, 인덱스 4번부터 번호를 조회합니다.
+        """
+        query = GET_USER_PICKS_SQL
+        with pooled_connection() as conn:
+            cur = conn.cursor()
+            picks = []
+
+            try:
+                cur.execute(query, (user_id,))
+                rows = cur.fetchall()
             
-            return picks
+                for row in rows:
+                    picks.append({
+                        'pick_id': row[0],
+                        # p1은 인덱스 4번부터 시작합니다. (p1~p6: row[4] ~ row[9])
+                        'numbers': [row[4], row[5], row[6], row[7], row[8], row[9]], 
+                        'pick_date': row[3],
+                        # 당첨 결과 정산(db/pick_reconcile.py) 전이면 reconciled_at 이 None
+                        'draw_no': row[2],
+                        'match_count': row[10],
+                        'is_bonus_match': row[11],
+                        'ranking': row[12],
+                        'reconciled_at': None
+                    })
+                if picks:
+                    UserPickDB._attach_reconciled_at(conn, cur, user_id, picks)
+                return picks
+            except Exception as e:
+                conn.rollback()
+                print(f"❌ DB Error (get_user_picks - Final Column Name Fix): {e}") 
+                return []
+            finally:
+                cur.close()
+
+    @staticmethod
+    def _attach_reconciled_at(conn, cur, user_id, picks):
+        """
+        정산 시각을 붙입니다. 읽지 못하면(마이그레이션 2 미적용) 번호 목록은 그대로 두고 모두 미정산으로 표시합니다.
+        """
+        try:
+            cur.execute(PICK_RECONCILED_SQL, (user_id,))
+            reconciled = dict(cur.fetchall())
         except Exception as e:
-            print(f"❌ DB Error (get_user_picks - Final Column Name Fix): {e}") 
-            return []
-        finally:
-            cur.close()
-            conn.close()
+            conn.rollback()
+            print(f"DB Error (get_user_picks - reconciled_at, python -m db.migrations 실행 필요): {e}")
+            return
+        for pick in picks:
+            pick['reconciled_at'] = reconciled.get(pick['pick_id'])
             
+    @staticmethod
+    def get_pick_number_sets(user_id):
+        """
+        사용자가 저장한 번호 조합만 조회합니다. [(p1, ..., p6), ...]
+        (추천 티켓 생성 시 이미 저장한 조합/번호를 피하는 용도)
+        """
+        query = PICK_NUMBER_SETS_SQL
+        with pooled_connection() as conn:
+            cur = conn.cursor()
+            try:
+                cur.execute(query, (user_id,))
+                return [tuple(row) for row in cur.fetchall()]
+            except Exception as e:
+                conn.rollback()
+                print(f"DB Error (get_pick_number_sets): {e}")
+                return []
+            finally:
+                cur.close()
+
     @staticmethod
     def delete_pick(pick_id, user_id):
         """
@@ -78,23 +168,22 @@ class UserPickDB:
             DELETE FROM user_pick
             WHERE pick_id = %s AND user_id = %s;
         """
-        conn = get_connection()
-        cur = conn.cursor()
+        with pooled_connection() as conn:
+            cur = conn.cursor()
 
-        try:
-            cur.execute(query, (pick_id, user_id))
-            row_count = cur.rowcount # 실제로 삭제된 행의 수
-            conn.commit()
+            try:
+                cur.execute(query, (pick_id, user_id))
+                row_count = cur.rowcount # 실제로 삭제된 행의 수
+                conn.commit()
             
-            if row_count > 0:
-                return True, "✅ 번호가 성공적으로 삭제되었습니다."
-            else:
-                return False, "❌ 삭제할 번호가 없거나, 해당 번호에 대한 삭제 권한이 없습니다."
+                if row_count > 0:
+                    return True, "✅ 번호가 성공적으로 삭제되었습니다."
+                else:
+                    return False, "❌ 삭제할 번호가 없거나, 해당 번호에 대한 삭제 권한이 없습니다."
                 
-        except Exception as e:
-            conn.rollback()
-            print(f"DB Error (delete_pick): {e}")
-            return False, f"❌ 번호 삭제 실패 (DB 오류): {e}"
-        finally:
-            cur.close()
-            conn.close()
\ No newline at end of file
+            except Exception as e:
+                conn.rollback()
+                print(f"DB Error (delete_pick): {e}")
+                return False, f"❌ 번호 삭제 실패 (DB 오류): {e}"
+            finally:
+                cur.close()
\ No newline at end of file
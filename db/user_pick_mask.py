@@ -0,0 +1,118 @@
+# db/user_pick_mask.py
+"""
+사용자별 "이미 고른 번호" 비트마스크 (user_pick_mask).
+
+    mask 의 (n - 1) 번째 비트 = 사용자가 저장한 번호 중 n 이 한 번이라도 있으면 1   (n = 1..45, BIGINT)
+
+user_pick 의 트리거(PICK_MASK_TRIGGER_SQL, 마이그레이션 5)가 번호를 저장/삭제하는 문장과 같은 트랜잭션에서 갱신하므로,
+애플리케이션 코드뿐 아니라 COPY 등 다른 경로로 들어온 번호도 항상 반영됩니다. (문장 단위 트리거, 대량 적재도 문장당 1회)
+  - 저장: 새 행의 번호 비트를 사용자별로 모아 기존 마스크에 OR (UPSERT)
+  - 삭제: 같은 번호가 다른 조합에 남아 있을 수 있으므로 남은 번호로 다시 계산
+          마스크 행을 먼저 잠근 뒤 계산하므로, 동시에 커밋된 저장의 비트를 덮어쓰지 않습니다.
+마스크 행이 없는 사용자(마이그레이션 전에 번호를 저장하는 등)는 get_mask 가 None 을 반환하여
+호출한 쪽이 user_pick 을 직접 비교하는 SQL 로 대신합니다.
+개인화 추천은 사용자의 번호를 모두 펼치는 대신 이 값 하나만 읽습니다.
+"""
+import sys
+
+from db.db_config import pooled_connection
+
+# 번호 6개 → 비트마스크 (SQL)
+PICK_MASK_EXPR = " | ".join(f"(1::BIGINT << ({p} - 1))" for p in ('p1', 'p2', 'p3', 'p4', 'p5', 'p6'))
+
+# 사용자별 마스크 전체 재계산 (마이그레이션의 초기 채우기 / 트리거 적용 전에 어긋난 값 교정)
+_RECOMPUTE_SELECT = f"""
+    SELECT user_id, COALESCE(BIT_OR({PICK_MASK_EXPR}), 0) AS mask
+    FROM user_pick
+"""
+
+BACKFILL_SQL = f"""
+    INSERT INTO user_pick_mask (user_id, mask)
+    {_RECOMPUTE_SELECT}
+    GROUP BY user_id
+    ON CONFLICT (user_id) DO UPDATE SET mask = EXCLUDED.mask, updated_at = NOW();
+
+    UPDATE user_pick_mask m
+    SET mask = 0, updated_at = NOW()
+    WHERE m.mask <> 0 AND NOT EXISTS (SELECT 1 FROM user_pick p WHERE p.user_id = m.user_id);
+"""
+
+# 트리거를 만드는 마이그레이션 버전 (db/migrations.py 의 MIGRATIONS)
+TRIGGER_MIGRATION_VERSION = 5
+
+# user_pick 변경과 같은 트랜잭션에서 마스크를 갱신하는 트리거 (PostgreSQL 10+ 의 transition table 사용)
+# plpgsql 함수의 각 문장은 새 스냅샷으로 실행되므로(READ COMMITTED), 잠금 후 다시 계산한 값에는
+# 잠금을 기다리는 동안 커밋된 다른 트랜잭션의 번호도 포함됩니다.
+PICK_MASK_TRIGGER_SQL = f"""
+CREATE OR REPLACE FUNCTION user_pick_mask_after_insert() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    INSERT INTO user_pick_mask (user_id, mask)
+    SELECT user_id, BIT_OR({PICK_MASK_EXPR})
+    FROM inserted_picks
+    GROUP BY user_id
+    ORDER BY user_id
+    ON CONFLICT (user_id) DO UPDATE
+    SET mask = user_pick_mask.mask | EXCLUDED.mask, updated_at = NOW();
+    RETURN NULL;
+END $$;
+
+CREATE OR REPLACE FUNCTION user_pick_mask_after_delete() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    INSERT INTO user_pick_mask (user_id, mask)
+    SELECT DISTINCT user_id, 0 FROM deleted_picks ORDER BY user_id
+    ON CONFLICT (user_id) DO NOTHING;
+
+    PERFORM 1 FROM user_pick_mask
+    WHERE user_id IN (SELECT user_id FROM deleted_picks)
+    ORDER BY user_id
+    FOR UPDATE;
+
+    UPDATE user_pick_mask m
+    SET mask = COALESCE((SELECT BIT_OR({PICK_MASK_EXPR}) FROM user_pick WHERE user_id = m.user_id), 0),
+        updated_at = NOW()
+    WHERE m.user_id IN (SELECT user_id FROM deleted_picks);
+    RETURN NULL;
+END $$;
+
+DROP TRIGGER IF EXISTS trg_user_pick_mask_insert ON user_pick;
+CREATE TRIGGER trg_user_pick_mask_insert
+    AFTER INSERT ON user_pick
+    REFERENCING NEW TABLE AS inserted_picks
+    FOR EACH STATEMENT EXECUTE FUNCTION user_pick_mask_after_insert();
+
+DROP TRIGGER IF EXISTS trg_user_pick_mask_delete ON user_pick;
+CREATE TRIGGER trg_user_pick_mask_delete
+    AFTER DELETE ON user_pick
+    REFERENCING OLD TABLE AS deleted_picks
+    FOR EACH STATEMENT EXECUTE FUNCTION user_pick_mask_after_delete();
+"""
+
+
+class UserPickMaskDB:
+
+    # =========================================================================
+    # 조회
+    # =========================================================================
+    @staticmethod
+    def get_mask(user_id):
+        """
+        사용자의 마스크. 트리거(마이그레이션 5)가 아직 없거나, 마스크 행이 없거나, DB 오류 시 None.
+        (트리거 없이 채워진 마스크는 이후 저장/삭제를 반영하지 못하므로 사용하지 않음)
+        """
+        with pooled_connection() as conn:
+            cur = conn.cursor()
+            try:
+                cur.execute("""
+                    SELECT m.mask
+                    FROM user_pick_mask m
+                    WHERE m.user_id = %s
+                      AND EXISTS (SELECT 1 FROM schema_migrations WHERE version = %s);
+                """, (user_id, TRIGGER_MIGRATION_VERSION))
+                row = cur.fetchone()
+                return int(row[0]) if row else None
+            except Exception as e:
+                conn.rollback()
+                print("DB Error (get_mask):", e, file=sys.stderr)
+                return None
+            finally:
+                cur.close()
@@ -0,0 +1,441 @@
+# metrics.py
+"""
+계측(instrumentation) 레지스트리.
+
+  - 요청 타이머    : 라우트(url_rule) × 메서드별 지연 시간 히스토그램과 상태 코드 집계
+  - DB 쿼리 계측   : db/db_config.py 의 커서가 실행한 SQL 을 지문(fingerprint)으로 묶어
+                      지연 시간 히스토그램, 반환/변경 행 수, 오류 수를 집계
+  - 카운터/게이지  : 연결 생성 수 등 카운터 + register_collector() 로 등록한 현재 상태(풀, 캐시, 해싱)
+  - 느린 요청 프로파일러 : 켜져 있으면 요청 처리 중인 스레드의 스택을 주기적으로 샘플링하고,
+                      METRICS_PROFILE_SLOW_MS 이상 걸린 요청의 스택 집계만 최근 N 개 보관
+
+/admin/metrics (JSON) 와 /admin/metrics?format=prometheus (Prometheus 텍스트) 로 노출합니다.
+이 모듈은 표준 라이브러리만 사용합니다. (db/ 와 앱 양쪽에서 import)
+"""
+import contextvars
+import hashlib
+import os
+import re
+import sys
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter, deque
+from functools import lru_cache
+
+ENABLED = os.getenv("METRICS_ENABLED", "1") == "1"
+
+# 지연 시간 히스토그램 구간 상한(초)
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    """고정 구간 히스토그램 (Prometheus histogram 과 같은 구간 정의, 분위수는 구간 내 선형 보간 추정)"""
+
+    __slots__ = ('buckets', 'counts', 'count', 'sum', 'max')
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)   # 마지막 칸은 +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q):
+        if not self.count:
+            return None
+        target = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= target:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                upper = self.buckets[i] if i < len(self.buckets) else self.max
+                return min(self.max, lower + (upper - lower) * (target - seen) / n)
+            seen += n
+        return self.max
+
+    def to_dict(self):
+        def ms(value):
+            return round(value * 1000, 2) if value is not None else None
+        return {
+            'count': self.count,
+            'mean_ms': ms(self.sum / self.count) if self.count else None,
+            'p50_ms': ms(self.quantile(0.50)),
+            'p95_ms': ms(self.quantile(0.95)),
+            'p99_ms': ms(self.quantile(0.99)),
+            'max_ms': ms(self.max) if self.count else None,
+        }
+
+
+# =========================================================================
+# SQL 지문
+# =========================================================================
+_COMMENT_RE = re.compile(r"--[^\n]*|/\*.*?\*/", re.S)
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_PARAM_RE = re.compile(r"%\([^)]*\)s|%s|\$\d+")
+_NUMBER_RE = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?(?![\w.])")
+_SPACE_RE = re.compile(r"\s+")
+_LIST_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_REPEAT_RE = re.compile(r"(\(\?(?:, \.\.\.)?\))(?:\s*,\s*\1)+")
+
+
+@lru_cache(maxsize=4096)
+def fingerprint(sql):
+    """
+    값만 다른 쿼리를 하나로 묶기 위한 정규화.
+    주석 제거, 문자열/숫자 리터럴과 %s 자리표시자를 ? 로, 값 목록 (?, ?, ...) 과 VALUES 행 반복을 축약합니다.
+    """
+    text = _COMMENT_RE.sub(' ', sql)
+    text = _STRING_RE.sub('?', text)
+    text = _PARAM_RE.sub('?', text)
+    text = _NUMBER_RE.sub('?', text)
+    text = _SPACE_RE.sub(' ', text).strip().rstrip(';').strip()
+    text = _LIST_RE.sub('(?, ...)', text)
+    text = _REPEAT_RE.sub(r'\1, ...', text)
+    return text
+
+
+def _fingerprint_id(text):
+    return hashlib.sha1(text.encode()).hexdigest()[:12]
+
+
+# 현재 요청에서 실행한 쿼리 수/시간 (Server-Timing 헤더용)
+_request_db = contextvars.ContextVar('request_db', default=None)
+
+
+# =========================================================================
+# 레지스트리
+# =========================================================================
+class MetricsRegistry:
+    def __init__(self, max_queries=500):
+        self.max_queries = max_queries
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+        self.requests = {}      # (route, method) -> {'histogram', 'status': Counter}
+        self.queries = {}       # 지문 -> {'id', 'histogram', 'rows', 'errors'}
+        self.histograms = {}    # (이름, 라벨) -> Histogram
+        self.counters = Counter()   # (이름, 라벨) -> 값
+        self._collectors = {}
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted(labels.items()))
+
+    # ---------------------------------------------------------
+    # 기록
+    # ---------------------------------------------------------
+    def inc(self, name, value=1, **labels):
+        with self._lock:
+            self.counters[self._key(name, labels)] += value
+
+    def observe(self, name, seconds, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+            histogram.observe(seconds)
+
+    def observe_request(self, route, method, status, seconds):
+        with self._lock:
+            entry = self.requests.get((route, method))
+            if entry is None:
+                entry = self.requests[(route, method)] = {'histogram': Histogram(), 'status': Counter()}
+            entry['histogram'].observe(seconds)
+            entry['status'][status] += 1
+
+    def observe_query(self, sql, seconds, rows=None, error=False):
+        if isinstance(sql, bytes):
+            sql = sql.decode('utf-8', 'replace')
+        text = fingerprint(sql)
+        with self._lock:
+            entry = self.queries.get(text)
+            if entry is None:
+                if len(self.queries) >= self.max_queries:
+                    # 지문 종류가 너무 많으면 나머지는 하나로 묶음 (메모리 상한)
+                    text = '<other>'
+                    entry = self.queries.get(text)
+                if entry is None:
+                    entry = self.queries[text] = {
+                        'id': _fingerprint_id(text), 'histogram': Histogram(), 'rows': 0, 'errors': 0,
+                    }
+            entry['histogram'].observe(seconds)
+            if rows is not None and rows > 0:
+                entry['rows'] += rows
+            if error:
+                entry['errors'] += 1
+        current = _request_db.get()
+        if current is not None:
+            current[0] += 1
+            current[1] += seconds
+
+    def register_collector(self, name, fn):
+        """fn() -> {키: 숫자 또는 dict} 형태의 현재 상태. /admin/metrics 조회 시점에 호출됩니다."""
+        self._collectors[name] = fn
+
+    def reset(self):
+        with self._lock:
+            self.started_at = time.time()
+            self.requests.clear()
+            self.queries.clear()
+            self.histograms.clear()
+            self.counters.clear()
+
+    # ---------------------------------------------------------
+    # 조회
+    # ---------------------------------------------------------
+    def _collect(self):
+        gauges = {}
+        for name, fn in self._collectors.items():
+            try:
+                gauges[name] = fn()
+            except Exception as e:
+                gauges[name] = {'error': str(e)}
+        return gauges
+
+    def snapshot(self, top_queries=50):
+        """JSON 응답용 요약. 쿼리는 총 소요 시간이 큰 순서로 top_queries 개까지"""
+        with self._lock:
+            routes = [
+                {'route': route, 'method': method, **entry['histogram'].to_dict(),
+                 'status': {str(k): v for k, v in sorted(entry['status'].items())}}
+                for (route, method), entry in self.requests.items()
+            ]
+            queries = [
+                {'id': entry['id'], 'query': text, **entry['histogram'].to_dict(),
+                 'total_ms': round(entry['histogram'].sum * 1000, 2), 'rows': entry['rows'], 'errors': entry['errors']}
+                for text, entry in self.queries.items()
+            ]
+            counters = [{'name': name, 'labels': dict(labels), 'value': value}
+                        for (name, labels), value in sorted(self.counters.items())]
+            histograms = [{'name': name, 'labels': dict(labels), **histogram.to_dict()}
+                          for (name, labels), histogram in sorted(self.histograms.items())]
+        routes.sort(key=lambda r: -(r['mean_ms'] or 0) * r['count'])
+        queries.sort(key=lambda q: -q['total_ms'])
+        return {
+            'uptime_seconds': round(time.time() - self.started_at, 1),
+            'routes': routes,
+            'queries': queries[:top_queries],
+            'query_fingerprints': len(queries),
+            'counters': counters,
+            'histograms': histograms,
+            'gauges': self._collect(),
+            'profiler': profiler.status(),
+        }
+
+    def prometheus_text(self, prefix="lotto"):
+        """Prometheus text exposition format (0.0.4)"""
+        lines = []
+
+        def write_histogram(name, histogram, labels):
+            cumulative = 0
+            for upper, n in zip((*histogram.buckets, '+Inf'), histogram.counts):
+                cumulative += n
+                le = upper if upper == '+Inf' else repr(upper)
+                lines.append(f"{name}_bucket{_labels({**labels, 'le': le})} {cumulative}")
+            lines.append(f"{name}_sum{_labels(labels)} {histogram.sum!r}")
+            lines.append(f"{name}_count{_labels(labels)} {histogram.count}")
+
+        with self._lock:
+            name = f"{prefix}_http_request_duration_seconds"
+            lines += [f"# HELP {name} 라우트별 요청 처리 시간", f"# TYPE {name} histogram"]
+            for (route, method), entry in sorted(self.requests.items()):
+                write_histogram(name, entry['histogram'], {'route': route, 'method': method})
+
+            name = f"{prefix}_http_responses_total"
+            lines += [f"# HELP {name} 라우트/상태 코드별 응답 수", f"# TYPE {name} counter"]
+            for (route, method), entry in sorted(self.requests.items()):
+                for status, count in sorted(entry['status'].items()):
+                    lines.append(f"{name}{_labels({'route': route, 'method': method, 'status': status})} {count}")
+
+            name = f"{prefix}_db_query_duration_seconds"
+            lines += [f"# HELP {name} 쿼리 지문별 실행 시간", f"# TYPE {name} histogram"]
+            for text, entry in sorted(self.queries.items(), key=lambda item: item[1]['id']):
+                write_histogram(name, entry['histogram'], {'fingerprint': entry['id'], 'query': text[:120]})
+
+            for metric, field in (('db_query_rows_total', 'rows'), ('db_query_errors_total', 'errors')):
+                name = f"{prefix}_{metric}"
+                lines.append(f"# TYPE {name} counter")
+                for entry in sorted(self.queries.values(), key=lambda e: e['id']):
+                    lines.append(f"{name}{_labels({'fingerprint': entry['id']})} {entry[field]}")
+
+            for (metric, labels), histogram in sorted(self.histograms.items()):
+                name = f"{prefix}_{metric}"
+                lines.append(f"# TYPE {name} histogram")
+                write_histogram(name, histogram, dict(labels))
+
+            written = set()
+            for (metric, labels), value in sorted(self.counters.items()):
+                name = f"{prefix}_{metric}"
+                if name not in written:
+                    lines.append(f"# TYPE {name} counter")
+                    written.add(name)
+                lines.append(f"{name}{_labels(dict(labels))} {value}")
+
+        # 게이지: 수집기 결과 중 숫자 값만 평탄화하여 노출
+        for collector, values in sorted(self._collect().items()):
+            for key, value in _flatten(values):
+                if isinstance(value, bool) or not isinstance(value, (int, float)):
+                    continue
+                name = _metric_name(f"{prefix}_{collector}_{key}")
+                lines.append(f"# TYPE {name} gauge")
+                lines.append(f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + '}'
+
+
+def _metric_name(name):
+    return re.sub(r'[^a-zA-Z0-9_]', '_', name)
+
+
+def _flatten(values, prefix=''):
+    if not isinstance(values, dict):
+        return
+    for key, value in values.items():
+        if isinstance(value, dict):
+            yield from _flatten(value, f"{prefix}{key}_")
+        else:
+            yield f"{prefix}{key}", value
+
+
+# =========================================================================
+# 느린 요청 샘플링 프로파일러
+# =========================================================================
+class SlowRequestProfiler:
+    """
+    켜져 있는 동안 백그라운드 스레드 하나가 interval 마다 요청 처리 중인 스레드의 스택을 읽어
+    "파일:함수:줄;..." 형태(collapsed stack)로 집계합니다.
+    요청이 threshold 이상 걸렸을 때만 결과를 보관하므로, 빠른 요청은 샘플링 비용만 들고 저장되지 않습니다.
+    """
+
+    def __init__(self, threshold_ms=500, interval_ms=5, keep=20, max_depth=40):
+        self.enabled = False
+        self.threshold_ms = threshold_ms
+        self.interval_ms = interval_ms
+        self.max_depth = max_depth
+        self.recent = deque(maxlen=keep)
+        self._active = {}       # 스레드 id -> Counter(collapsed stack -> 샘플 수)
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def configure(self, enabled, threshold_ms=None, interval_ms=None):
+        with self._lock:
+            if threshold_ms is not None:
+                self.threshold_ms = max(0, int(threshold_ms))
+            if interval_ms is not None:
+                self.interval_ms = max(1, int(interval_ms))
+            self.enabled = bool(enabled)
+            if not self.enabled:
+                self._active.clear()
+            elif self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="slow-request-profiler", daemon=True)
+                self._thread.start()
+
+    def begin(self):
+        if self.enabled:
+            self._active[threading.get_ident()] = Counter()
+
+    def end(self, route, method, seconds):
+        samples = self._active.pop(threading.get_ident(), None)
+        if samples is None or seconds * 1000 < self.threshold_ms:
+            return
+        self.recent.append({
+            'route': route,
+            'method': method,
+            'duration_ms': round(seconds * 1000, 1),
+            'at': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'samples': sum(samples.values()),
+            'stacks': [{'stack': stack, 'samples': n} for stack, n in samples.most_common(20)],
+        })
+
+    def _collapse(self, frame):
+        parts = []
+        while frame is not None and len(parts) < self.max_depth:
+            code = frame.f_code
+            parts.append(f"{os.path.basename(code.co_filename)}:{code.co_name}:{frame.f_lineno}")
+            frame = frame.f_back
+        return ';'.join(reversed(parts))
+
+    def _run(self):
+        while self.enabled:
+            time.sleep(self.interval_ms / 1000)
+            if not self._active:
+                continue
+            frames = sys._current_frames()
+            for ident, samples in list(self._active.items()):
+                frame = frames.get(ident)
+                if frame is not None:
+                    samples[self._collapse(frame)] += 1
+
+    def status(self):
+        return {
+            'enabled': self.enabled,
+            'threshold_ms': self.threshold_ms,
+            'interval_ms': self.interval_ms,
+            'recent': list(self.recent),
+        }
+
+
+registry = MetricsRegistry(max_queries=int(os.getenv("METRICS_MAX_QUERIES", "500")))
+profiler = SlowRequestProfiler(
+    threshold_ms=int(os.getenv("METRICS_PROFILE_SLOW_MS", "0") or 0) or 500,
+    interval_ms=int(os.getenv("METRICS_PROFILE_INTERVAL_MS", "5")),
+)
+if int(os.getenv("METRICS_PROFILE_SLOW_MS", "0") or 0) > 0:
+    profiler.configure(True)
+
+
+# =========================================================================
+# Flask 연동
+# =========================================================================
+def init_app(app):
+    """요청 타이머(before/after_request)와 Server-Timing 헤더를 등록합니다."""
+    if not ENABLED:
+        return
+    from flask import g, request
+
+    @app.before_request
+    def _start_request_timer():
+        g._metrics_started = time.perf_counter()
+        g._metrics_db_token = _request_db.set([0, 0.0])
+        profiler.begin()
+
+    @app.after_request
+    def _record_request(response):
+        started = g.pop('_metrics_started', None)
+        if started is None:
+            return response
+        elapsed = time.perf_counter() - started
+        route = request.url_rule.rule if request.url_rule is not None else '<unmatched>'
+        registry.observe_request(route, request.method, response.status_code, elapsed)
+        profiler.end(route, request.method, elapsed)
+
+        token = g.pop('_metrics_db_token', None)
+        db_queries, db_seconds = _request_db.get() or (0, 0.0)
+        if token is not None:
+            try:
+                _request_db.reset(token)
+            except ValueError:
+                # 다른 컨텍스트에서 만든 토큰 (비동기 실행 등) → 값만 비움
+                _request_db.set(None)
+        response.headers.add(
+            'Server-Timing',
+            f'db;desc="{db_queries} queries";dur={db_seconds * 1000:.1f}, app;dur={elapsed * 1000:.1f}',
+        )
+        return response
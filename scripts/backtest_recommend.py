@@ -0,0 +1,58 @@
+"""
+추천 모델 워크포워드 백테스트.
+
+    python scripts/backtest_recommend.py                     # 전체 회차
+    python scripts/backtest_recommend.py --min-history 100   # 100회차가 쌓인 뒤부터 평가
+    python scripts/backtest_recommend.py --user-id 3         # 사용자의 과거 선택 번호를 제외한 추천으로 평가
+    python scripts/backtest_recommend.py --details --json    # 회차별 추천 번호와 결과까지 JSON 으로 출력
+"""
+import argparse
+import json
+import os
+import sys
+
+# "python scripts/backtest_recommend.py" 로 실행해도 프로젝트 루트의 패키지를 찾을 수 있도록 합니다.
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from services.draw_store import DrawStore, RANKS
+from services.backtest import backtest_recommendation
+from services.simulation import BASELINE_PROBABILITY
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="추천 모델을 회차 순서대로 재현하여 적중률을 계산합니다.")
+    parser.add_argument('--min-history', type=int, default=1, help="이 개수만큼 회차가 쌓인 뒤부터 평가")
+    parser.add_argument('--user-id', type=int, help="이 사용자의 과거 선택 번호를 추천에서 제외")
+    parser.add_argument('--details', action='store_true', help="회차별 추천 번호와 결과 포함 (--json 과 함께 사용)")
+    parser.add_argument('--json', action='store_true', help="결과를 JSON 으로 출력")
+    args = parser.parse_args(argv)
+
+    try:
+        exclude = ()
+        if args.user_id is not None:
+            from db.user_pick import UserPickDB
+            exclude = {n for p in UserPickDB.get_user_picks(args.user_id) for n in p['numbers'] if n is not None}
+        draw_nos, masks, bonus_masks = DrawStore.snapshot()
+        result = backtest_recommendation(draw_nos, masks, bonus_masks, min_history=args.min_history,
+                                         exclude=exclude, details=args.details)
+    except Exception as e:
+        print(f"❌ 백테스트 실패: {e}", file=sys.stderr)
+        return 1
+
+    if args.json:
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+        return 0
+
+    print(f"✅ {result['from_draw']}~{result['to_draw']}회 ({result['draws']}회차) 평가, {result['seconds'] * 1000:.1f}ms")
+    for rank in RANKS:
+        label = f"{rank}등" if rank else "낙첨"
+        print(f"  {label:<4} {result['counts'][rank]:>6}회  {result['rates'][rank]:.3e}  "
+              f"(이론 {BASELINE_PROBABILITY[rank]:.3e}, lift {result['lift'][rank]:.2f})")
+    print(f"  평균 일치 개수 {result['mean_matches']:.3f} (무작위 기대값 {result['expected_random_matches']:.3f})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,85 @@
+"""
+WSGI / ASGI 서빙 모드 비교 벤치마크.
+
+같은 부하(동시 연결 수, 요청 수, 경로)를 두 서버에 차례로 보내고 처리량과 지연 시간을 비교합니다.
+
+    # 터미널 1: WSGI 모드 (스레드 8개)
+    flask run --port 5000 --with-threads
+    # 터미널 2: ASGI 모드 (프로세스 1개)
+    uvicorn asgi:application --port 8000
+
+    python scripts/benchmark_serving.py --wsgi http://127.0.0.1:5000 --asgi http://127.0.0.1:8000 -c 200 -n 5000
+
+부하 발생기는 benchmarks/http_load.py 를 사용합니다. (외부 패키지 없음)
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from benchmarks.http_load import run_load as run_scenario
+
+DEFAULT_PATHS = ['/lotto', '/lotto?page=5', '/statistics', '/statistics?sort=last_draw_gap']
+
+
+def _get(path):
+    async def op(client, rng):
+        return await client.get(path)
+    return op
+
+
+async def run_load(url, paths, concurrency, requests, timeout=300):
+    """url 서버에 concurrency 개의 연결로 requests 개의 요청을 보내고 결과 요약을 반환합니다."""
+    result = await run_scenario(url, [(path, 1, _get(path)) for path in paths], concurrency, requests,
+                                timeout=timeout)
+    return {
+        'url': url,
+        'concurrency': concurrency,
+        'requests': requests,
+        'seconds': result['seconds'],
+        **result['total'],
+        'routes': result['routes'],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="WSGI / ASGI 서빙 모드를 같은 부하로 비교합니다.")
+    parser.add_argument('--wsgi', help="WSGI 서버 주소 (예: http://127.0.0.1:5000)")
+    parser.add_argument('--asgi', help="ASGI 서버 주소 (예: http://127.0.0.1:8000)")
+    parser.add_argument('-c', '--concurrency', type=int, default=100, help="동시 연결 수")
+    parser.add_argument('-n', '--requests', type=int, default=2000, help="서버별 총 요청 수")
+    parser.add_argument('-p', '--path', action='append', help="요청 경로 (여러 번 지정 가능, 기본: /lotto, /statistics 등)")
+    parser.add_argument('--warmup', type=int, default=50, help="측정 전 워밍업 요청 수")
+    parser.add_argument('--json', action='store_true', help="결과를 JSON 으로 출력")
+    args = parser.parse_args(argv)
+
+    targets = [(name, url) for name, url in (('wsgi', args.wsgi), ('asgi', args.asgi)) if url]
+    if not targets:
+        parser.error("--wsgi 또는 --asgi 중 하나 이상을 지정해야 합니다.")
+    paths = args.path or DEFAULT_PATHS
+
+    results = {}
+    for name, url in targets:
+        if args.warmup:
+            asyncio.run(run_load(url, paths, min(args.concurrency, 10), args.warmup))
+        results[name] = asyncio.run(run_load(url, paths, args.concurrency, args.requests))
+
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+        return 0
+
+    print(f"{'mode':<6}{'rps':>10}{'p50(ms)':>10}{'p95(ms)':>10}{'p99(ms)':>10}{'max(ms)':>10}  errors")
+    for name, r in results.items():
+        lat = r['latency_ms']
+        print(f"{name:<6}{r['rps']:>10}{lat['p50']!s:>10}{lat['p95']!s:>10}{lat['p99']!s:>10}{lat['max']!s:>10}  "
+              f"{r['errors'] or '-'}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
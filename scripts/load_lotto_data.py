@@ -1,58 +1,263 @@
+"""
+로또 당첨 데이터 CSV 적재 스크립트.
+
+    python scripts/load_lotto_data.py                      # 기본: 1600.csv, 6011200.csv
+    python scripts/load_lotto_data.py data/ extra.csv      # 파일/디렉터리(안의 *.csv) 여러 개
+    python scripts/load_lotto_data.py --dry-run new.csv    # 검증만 수행
+    python scripts/load_lotto_data.py --update new.csv     # 이미 있는 회차도 CSV 값으로 덮어쓰기
+    python scripts/load_lotto_data.py --no-reconcile new.csv  # 저장 번호 당첨 결과 정산 건너뛰기
+
+처리 순서
+  1. 모든 CSV 를 읽어 하나의 DataFrame 으로 합침
+  2. 행 단위 검증을 벡터 연산으로 한 번에 수행 (번호 범위 1~45, 중복 없음, 보너스가 당첨번호에 없음)
+  3. 임시 스테이징 테이블에 COPY 로 한 번에 적재
+  4. INSERT ... SELECT ... ON CONFLICT 한 문장으로 lotto_draw 에 반영
+  5. 통계에 이미 반영된 회차(워터마크 이하)가 추가/수정되었으면 같은 트랜잭션에서 통계 워터마크를 지움
+     (다음 통계 갱신은 전체 재계산, db/lotto_stat.py)
+  6. 새 회차가 들어오면 사용자가 저장한 번호의 당첨 결과를 정산 (db/pick_reconcile.py)
+"""
+import argparse
+import io
+import os
+import sys
+import time
+
+import numpy as np
 import pandas as pd
+
+# "python scripts/load_lotto_data.py" 로 실행해도 프로젝트 루트의 db 패키지를 찾을 수 있도록 합니다.
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
 from db.db_config import get_connection
+from db.cache_version import CacheVersionDB
+from db.pick_reconcile import PickReconcileDB
+from db.lotto_stat import LottoStatDB
+from services.reconcile_service import ReconcileService
+from services.draw_store import DrawStore
+from services.cache import DataVersion
+
+DEFAULT_CSV_FILES = ["1600.csv", "6011200.csv"]
+
+# 컬럼 이름 통일 (회차, 추첨일, 1~6, 보너스)
+COLUMN_MAP = {
+    '회차': 'draw_no',
+    '추첨일': 'draw_date',
+    '1': 'n1',
+    '2': 'n2',
+    '3': 'n3',
+    '4': 'n4',
+    '5': 'n5',
+    '6': 'n6',
+    '보너스': 'bonus'
+}
+NUMBER_COLUMNS = ['n1', 'n2', 'n3', 'n4', 'n5', 'n6']
+DRAW_COLUMNS = ['draw_no', 'draw_date'] + NUMBER_COLUMNS + ['bonus']
+
+
+def collect_csv_paths(paths):
+    """파일과 디렉터리가 섞인 경로 목록을 CSV 파일 목록으로 펼칩니다."""
+    csv_paths = []
+    for path in paths:
+        if os.path.isdir(path):
+            csv_paths.extend(sorted(
+                os.path.join(path, name) for name in os.listdir(path) if name.lower().endswith('.csv')
+            ))
+        else:
+            csv_paths.append(path)
+    return csv_paths
+
+
+def read_csv_files(csv_paths):
+    """CSV 파일들을 읽어 컬럼 이름을 통일한 하나의 DataFrame 으로 합칩니다."""
+    frames = []
+    for csv_path in csv_paths:
+        df = pd.read_csv(csv_path, encoding='utf-8-sig', dtype=str)
+        df = df.rename(columns=lambda c: COLUMN_MAP.get(str(c).strip(), str(c).strip()))
+        missing = [c for c in DRAW_COLUMNS if c not in df.columns]
+        if missing:
+            raise ValueError(f"{csv_path}: 필수 컬럼이 없습니다 {missing}")
+        df = df[DRAW_COLUMNS].copy()
+        df['source'] = csv_path
+        frames.append(df)
+    if not frames:
+        return pd.DataFrame(columns=DRAW_COLUMNS + ['source'])
+    return pd.concat(frames, ignore_index=True)
+
+
+def validate_draws(df):
+    """
+    모든 행을 한 번에 검사합니다.
+    반환: (유효한 행 DataFrame, [(source, draw_no, 사유), ...])
+    """
+    errors = []
+
+    numeric = df[['draw_no'] + NUMBER_COLUMNS + ['bonus']].apply(pd.to_numeric, errors='coerce')
+    dates = pd.to_datetime(df['draw_date'], errors='coerce')
+
+    bad = numeric.isna().any(axis=1) | dates.isna()
+    reasons = pd.Series('', index=df.index)
+    reasons[bad] = '숫자/날짜 형식 오류'
+
+    values = numeric.fillna(0).to_numpy(dtype=np.int64)
+    mains = np.sort(values[:, 1:7], axis=1)
+    bonus = values[:, 7]
 
-def load_csv_to_db(csv_path):
-    df = pd.read_csv(csv_path)
-
-    # 컬럼 이름 통일 (추첨일, 1~6, 보너스)
-    df = df.rename(columns={
-        '회차': 'draw_no',
-        '추첨일': 'draw_date',
-        '1': 'n1',
-        '2': 'n2',
-        '3': 'n3',
-        '4': 'n4',
-        '5': 'n5',
-        '6': 'n6',
-        '보너스': 'bonus'
+    out_of_range = ((values[:, 1:8] < 1) | (values[:, 1:8] > 45)).any(axis=1) & ~bad.to_numpy()
+    duplicated = (np.diff(mains, axis=1) == 0).any(axis=1) & ~bad.to_numpy() & ~out_of_range
+    bonus_in_main = (mains == bonus[:, None]).any(axis=1) & ~bad.to_numpy() & ~out_of_range
+
+    reasons[out_of_range] = '번호 범위(1~45) 오류'
+    reasons[duplicated] = '당첨번호 중복'
+    reasons[bonus_in_main] = '보너스 번호가 당첨번호에 포함됨'
+
+    invalid = reasons != ''
+    for idx in np.flatnonzero(invalid.to_numpy()):
+        errors.append((df['source'].iat[idx], df['draw_no'].iat[idx], reasons.iat[idx]))
+
+    valid = pd.DataFrame({
+        'draw_no': values[:, 0],
+        'draw_date': dates.dt.strftime('%Y-%m-%d'),
     })
+    for i, col in enumerate(NUMBER_COLUMNS):
+        valid[col] = mains[:, i]
+    valid['bonus'] = bonus
+    valid = valid[~invalid.to_numpy()]
+
+    # 같은 회차가 여러 파일에 있으면 나중에 읽은 값을 사용
+    duplicated_draws = valid['draw_no'].duplicated(keep='last')
+    if duplicated_draws.any():
+        print(f"ℹ️ 중복된 회차 {int(duplicated_draws.sum())}개는 마지막으로 읽은 값을 사용합니다.")
+        valid = valid[~duplicated_draws]
+
+    return valid, errors
 
-    # 날짜 형식 통일
-    df['draw_date'] = pd.to_datetime(df['draw_date'])
 
-    # DB 연결
+def copy_draws_to_db(valid, update_existing=False):
+    """
+    스테이징 테이블에 COPY 로 적재한 뒤, 한 문장의 UPSERT 로 lotto_draw 에 반영합니다.
+    반환: 새로 추가(또는 갱신)된 행 수
+    """
+    conflict_action = """
+        DO UPDATE SET
+            draw_date = EXCLUDED.draw_date,
+            n1 = EXCLUDED.n1, n2 = EXCLUDED.n2, n3 = EXCLUDED.n3,
+            n4 = EXCLUDED.n4, n5 = EXCLUDED.n5, n6 = EXCLUDED.n6,
+            bonus = EXCLUDED.bonus
+    """ if update_existing else "DO NOTHING"
+
+    buffer = io.StringIO()
+    valid[DRAW_COLUMNS].to_csv(buffer, index=False, header=False)
+    buffer.seek(0)
+
     conn = get_connection()
     cur = conn.cursor()
-
-    for _, row in df.iterrows():
-        try:
-            cur.execute("""
+    try:
+        cur.execute("""
+            CREATE TEMP TABLE lotto_draw_stage (
+                draw_no INT, draw_date DATE,
+                n1 INT, n2 INT, n3 INT, n4 INT, n5 INT, n6 INT, bonus INT
+            ) ON COMMIT DROP;
+        """)
+        cur.copy_expert(
+            "COPY lotto_draw_stage (draw_no, draw_date, n1, n2, n3, n4, n5, n6, bonus) FROM STDIN WITH (FORMAT csv)",
+            buffer
+        )
+        cur.execute(f"""
+            WITH written AS (
                 INSERT INTO lotto_draw (draw_no, draw_date, n1, n2, n3, n4, n5, n6, bonus)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-                ON CONFLICT (draw_no) DO NOTHING;
-            """, (
-                int(row['draw_no']),
-                row['draw_date'],
-                int(row['n1']),
-                int(row['n2']),
-                int(row['n3']),
-                int(row['n4']),
-                int(row['n5']),
-                int(row['n6']),
-                int(row['bonus'])
-            ))
-        except Exception as e:
-            print(f"Error inserting row {row['draw_no']}: {e}")
+                SELECT draw_no, draw_date, n1, n2, n3, n4, n5, n6, bonus
+                FROM lotto_draw_stage
+                ON CONFLICT (draw_no) {conflict_action}
+                RETURNING draw_no
+            )
+            SELECT COUNT(*), MIN(draw_no) FROM written;
+        """)
+        written, min_written = cur.fetchone()
+        if written and update_existing:
+            # 당첨 번호가 바뀌었을 수 있는 회차의 정산 결과는 취소하고 다시 정산합니다.
+            PickReconcileDB.reset_draws(cur, "SELECT draw_no FROM lotto_draw_stage")
+        if written:
+            # 통계 워터마크 이하 회차가 추가/수정되었으면 증분 갱신으로는 반영할 수 없으므로 워터마크를 지웁니다.
+            # (다음 통계 갱신은 전체 재계산)
+            if LottoStatDB.reset_watermark(cur, min_written):
+                print(f"ℹ️ 통계에 이미 반영된 회차({min_written}회 이후)가 바뀌어 다음 통계 갱신은 전체 재계산으로 진행됩니다.")
+            # 웹 서버 프로세스들의 캐시가 새 데이터를 보도록 데이터 버전을 올립니다.
+            CacheVersionDB.bump_version(cur)
+        conn.commit()
+        return written
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+        conn.close()
+
+
+def load_files(paths, update_existing=False, dry_run=False, reconcile=True):
+    """
+    CSV 파일/디렉터리 목록을 적재합니다.
+    반환: {'files': .., 'rows': .., 'valid': .., 'invalid': .., 'written': .., 'reconcile': .., 'seconds': ..}
+    """
+    started = time.perf_counter()
+    csv_paths = collect_csv_paths(paths)
+    df = read_csv_files(csv_paths)
+    valid, errors = validate_draws(df)
+
+    for source, draw_no, reason in errors:
+        print(f"⚠️ {source} {draw_no}회: {reason} → 건너뜀")
+
+    written = 0
+    reconcile_summary = None
+    if not dry_run and len(valid):
+        written = copy_draws_to_db(valid, update_existing=update_existing)
+        if written:
+            # 같은 프로세스에서 호출된 경우 메모리 캐시(회차 목록, 전체 개수, 페이지 등)를 즉시 무효화
+            DrawStore.invalidate()
+            DataVersion.bump()
+            if reconcile:
+                success, reconcile_summary = ReconcileService.reconcile_picks()
+                if not success:
+                    print(f"⚠️ 저장 번호 정산 실패 (scripts/reconcile_picks.py 로 다시 실행): {reconcile_summary}")
+                    reconcile_summary = None
+
+    elapsed = time.perf_counter() - started
+    return {
+        'files': len(csv_paths),
+        'rows': len(df),
+        'valid': len(valid),
+        'invalid': len(errors),
+        'written': written,
+        'reconcile': reconcile_summary,
+        'seconds': elapsed,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="로또 당첨 데이터 CSV 를 lotto_draw 테이블에 적재합니다.")
+    parser.add_argument('paths', nargs='*', help="CSV 파일 또는 CSV 가 들어 있는 디렉터리 (기본: 1600.csv 6011200.csv)")
+    parser.add_argument('--update', action='store_true', help="이미 있는 회차도 CSV 값으로 덮어씁니다.")
+    parser.add_argument('--dry-run', action='store_true', help="DB 에 쓰지 않고 검증만 수행합니다.")
+    parser.add_argument('--no-reconcile', action='store_true', help="적재 후 저장 번호 당첨 결과 정산을 건너뜁니다.")
+    args = parser.parse_args(argv)
+
+    paths = args.paths or [os.path.join(PROJECT_ROOT, name) for name in DEFAULT_CSV_FILES]
+    try:
+        result = load_files(paths, update_existing=args.update, dry_run=args.dry_run,
+                            reconcile=not args.no_reconcile)
+    except Exception as e:
+        print(f"❌ 데이터 적재 실패: {e}", file=sys.stderr)
+        return 1
 
-    conn.commit()
-    cur.close()
-    conn.close()
-    print(f"{csv_path} 데이터 로딩 완료!")
+    rate = result['valid'] / result['seconds'] if result['seconds'] > 0 else 0
+    print(f"✅ 파일 {result['files']}개, {result['rows']}행 읽음 "
+          f"(유효 {result['valid']}, 오류 {result['invalid']}) → DB 반영 {result['written']}행")
+    if result['reconcile']:
+        print(f"🎯 {ReconcileService.describe(result['reconcile'])}")
+    print(f"⏱️ {result['seconds']:.3f}초 ({rate:,.0f} rows/sec)")
+    return 0
 
-# ======================
-# 두 CSV 파일 순차 처리
-# ======================
-csv_files = ["1600.csv", "6011200.csv"]
 
-for file in csv_files:
-    load_csv_to_db(file)
+if __name__ == "__main__":
+    sys.exit(main())
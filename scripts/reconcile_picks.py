@@ -0,0 +1,41 @@
+"""
+저장 번호 당첨 결과 정산 스크립트.
+
+    python scripts/reconcile_picks.py                    # 미정산 번호 전체 정산
+    python scripts/reconcile_picks.py --batch-size 50000 --max-batches 10
+
+새 회차 적재(scripts/load_lotto_data.py) 후에는 자동으로 실행되므로, 적재 중 정산이 실패했거나
+--no-reconcile 로 적재한 경우에만 직접 실행하면 됩니다. 여러 번 실행해도 결과가 같습니다.
+"""
+import argparse
+import os
+import sys
+import time
+
+# "python scripts/reconcile_picks.py" 로 실행해도 프로젝트 루트의 패키지를 찾을 수 있도록 합니다.
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from services.reconcile_service import RECONCILE_BATCH_SIZE, ReconcileService
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="사용자가 저장한 번호의 당첨 결과를 정산합니다.")
+    parser.add_argument('--batch-size', type=int, default=RECONCILE_BATCH_SIZE, help="한 트랜잭션에서 처리할 번호 수")
+    parser.add_argument('--max-batches', type=int, default=None, help="이번 실행에서 처리할 최대 배치 수")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    success, result = ReconcileService.reconcile_picks(args.batch_size, max_batches=args.max_batches)
+    if not success:
+        print(f"❌ 정산 실패: {result}", file=sys.stderr)
+        return 1
+
+    print(f"✅ {ReconcileService.describe(result)}")
+    print(f"⏱️ {time.perf_counter() - started:.3f}초")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,131 @@
+"""
+번호 선택 전략 몬테카를로 시뮬레이션.
+
+    python scripts/simulate_strategies.py                                   # random/heuristic/recommend, 가상 추첨 100만 장씩
+    python scripts/simulate_strategies.py -n 10000000 --workers 8           # 1,000만 장, 프로세스 8개
+    python scripts/simulate_strategies.py --target history                  # 과거 회차에서 추첨을 뽑아 비교
+    python scripts/simulate_strategies.py -s user-history --user-id 3       # 사용자의 과거 선택 번호
+    python scripts/simulate_strategies.py -s recommend --replay             # 추천 번호를 과거 전체 회차와 정확히 비교
+    python scripts/simulate_strategies.py --json                            # 결과를 JSON 으로 출력
+
+전략
+  random        무작위 6개
+  heuristic     분석 코멘트의 이상적인 조합 기준을 만족하는 무작위 6개
+  recommend     추천 순위 상위 6개 (--user-id 를 주면 그 사용자에게 실제로 제공되는 추천 번호)
+  user-history  --user-id 사용자가 저장한 번호들
+"""
+import argparse
+import json
+import os
+import sys
+
+# "python scripts/simulate_strategies.py" 로 실행해도 프로젝트 루트의 패키지를 찾을 수 있도록 합니다.
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from services.draw_store import DrawStore, RANKS
+from services.simulation import BASELINE_PROBABILITY, recommend_ticket, replay_history, simulate
+
+CLI_STRATEGIES = ('random', 'heuristic', 'recommend', 'user-history')
+
+
+def load_strategy_tickets(name, user_id=None):
+    """recommend / user-history 전략의 고정 티켓 목록을 DB 에서 읽어옵니다."""
+    if name == 'recommend':
+        if user_id is not None:
+            from services.recommend_service import RecommendService
+            success, numbers, _ = RecommendService.generate_recommendation(user_id)
+            return [numbers] if success and len(numbers) == 6 else []
+        from services.stat_service import StatService
+        ticket = recommend_ticket(StatService.get_all_stats())
+        return [ticket] if ticket else []
+    if name == 'user-history':
+        if user_id is None:
+            raise ValueError("user-history 전략에는 --user-id 가 필요합니다.")
+        from db.user_pick import UserPickDB
+        return [p['numbers'] for p in UserPickDB.get_user_picks(user_id) if None not in p['numbers']]
+    return None
+
+
+def run(args):
+    history = None
+    if args.target == 'history' or args.replay:
+        _, masks, bonus_masks = DrawStore.snapshot()
+        history = (masks, bonus_masks)
+
+    results = []
+    for name in args.strategy:
+        try:
+            tickets = load_strategy_tickets(name, args.user_id)
+        except Exception as e:
+            print(f"⚠️ {name}: 번호를 불러오지 못해 건너뜁니다. ({e})", file=sys.stderr)
+            continue
+        if tickets is not None and not tickets:
+            print(f"⚠️ {name}: 사용할 번호가 없어 건너뜁니다.", file=sys.stderr)
+            continue
+
+        if args.replay and tickets is not None:
+            result = replay_history(tickets, *history)
+        else:
+            result = simulate(
+                'fixed' if tickets is not None else name,
+                args.tickets,
+                target=args.target,
+                tickets=tickets,
+                history=history,
+                seed=args.seed,
+                workers=args.workers,
+                shard_size=args.shard_size,
+            )
+        result['strategy'] = name
+        if tickets is not None:
+            result['strategy_tickets'] = tickets
+        results.append(result)
+    return results
+
+
+def print_table(results):
+    header = f"{'전략':<14}{'티켓 수':>14}" + "".join(f"{(str(r) + '등') if r else '낙첨':>12}" for r in RANKS)
+    print(header)
+    print(f"{'(이론 확률)':<14}{'':>14}" + "".join(f"{BASELINE_PROBABILITY[r]:>12.3e}" for r in RANKS))
+    for result in results:
+        print(f"{result['strategy']:<14}{result['tickets']:>14,}"
+              + "".join(f"{result['rates'][r]:>12.3e}" for r in RANKS))
+        print(f"{'  lift':<14}{'':>14}" + "".join(f"{result['lift'][r]:>12.2f}" for r in RANKS))
+        if 'seconds' in result:
+            print(f"  ⏱️ {result['seconds']:.1f}초 ({result['tickets_per_sec']:,.0f} tickets/sec, seed={result['seed']})")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="번호 선택 전략을 몬테카를로 시뮬레이션으로 비교합니다.")
+    parser.add_argument('-s', '--strategy', action='append', choices=CLI_STRATEGIES,
+                        help="비교할 전략 (여러 번 지정 가능, 기본: random heuristic recommend)")
+    parser.add_argument('-n', '--tickets', type=int, default=1_000_000, help="전략별 시뮬레이션 티켓 수")
+    parser.add_argument('--target', choices=('synthetic', 'history'), default='synthetic',
+                        help="synthetic: 가상 추첨, history: 과거 회차에서 추첨을 뽑음")
+    parser.add_argument('--replay', action='store_true',
+                        help="recommend/user-history 번호를 과거 모든 회차와 정확히 비교 (표본 추출 없음)")
+    parser.add_argument('--user-id', type=int, help="recommend/user-history 전략의 사용자")
+    parser.add_argument('--workers', type=int, help="프로세스 수 (기본: CPU 수)")
+    parser.add_argument('--shard-size', type=int, default=1_000_000, help="프로세스 하나가 한 번에 처리할 티켓 수")
+    parser.add_argument('--seed', type=int, help="난수 시드 (같은 시드면 워커 수와 관계없이 같은 결과)")
+    parser.add_argument('--json', action='store_true', help="결과를 JSON 으로 출력")
+    args = parser.parse_args(argv)
+    args.strategy = args.strategy or ['random', 'heuristic', 'recommend']
+
+    try:
+        results = run(args)
+    except Exception as e:
+        print(f"❌ 시뮬레이션 실패: {e}", file=sys.stderr)
+        return 1
+
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+    else:
+        print_table(results)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,60 @@
+# services/async_service.py
+"""
+ASGI 모드(asgi.py)용 비동기 서비스.
+
+LottoService.get_paginated_draws / StatService.get_all_stats 와 같은 결과를 반환하지만,
+DB 조회는 asyncpg(db/async_db.py)로 수행하여 이벤트 루프를 막지 않습니다.
+회차 목록(DrawStore)과 데이터 버전(DataVersion)의 주기적인 확인처럼 동기 DB 호출이 필요한 경우에만
+asyncio.to_thread 로 넘깁니다.
+"""
+import asyncio
+import math
+
+from db.async_db import AsyncLottoDrawDB, AsyncLottoStatDB
+from services.cache import async_cached
+from services.draw_store import DrawStore
+
+
+async def _ensure_draw_store():
+    if DrawStore.needs_check():
+        await asyncio.to_thread(DrawStore.ensure_loaded)
+
+
+class AsyncLottoService:
+    @staticmethod
+    @async_cached('async_draw_pages', should_cache=lambda result: bool(result['draws']))
+    async def get_paginated_draws(page=1, per_page=20, before=None):
+        """LottoService.get_paginated_draws 의 비동기 버전 (반환 형식 동일)"""
+        await _ensure_draw_store()
+
+        page = max(page, 1)
+        total_count = DrawStore.draw_count()
+        total_pages = math.ceil(total_count / per_page)
+
+        if before is not None:
+            page = DrawStore.page_of_cursor(before, per_page)
+        else:
+            before = DrawStore.page_cursor(page, per_page)
+
+        draws = await AsyncLottoDrawDB.get_draws_before(before, per_page)
+        next_cursor = draws[-1][0] if draws and page < total_pages else None
+
+        return {
+            "draws": draws,
+            "total_pages": total_pages,
+            "current_page": page,
+            "total_count": total_count,
+            "next_cursor": next_cursor
+        }
+
+
+class AsyncStatService:
+    @staticmethod
+    async def get_all_stats():
+        """StatService.get_all_stats 의 비동기 버전 (호출한 쪽에서 정렬할 수 있도록 복사본 반환)"""
+        return list(await AsyncStatService._load_all_stats() or [])
+
+    @staticmethod
+    @async_cached('async_stats')
+    async def _load_all_stats():
+        return await AsyncLottoStatDB.get_all_stats()
@@ -0,0 +1,100 @@
+# services/backtest.py
+"""
+추천 모델 워크포워드(walk-forward) 백테스트.
+
+v_lotto_recommend_score 는 전체 이력으로 계산한 빈도/간격 순위이므로, 그대로는
+"N 회차 시점에 N 회차 이전 데이터만 알았다면 얼마나 맞혔을까" 를 알 수 없습니다.
+여기서는 회차마다 그 이전 회차만으로 통계를 만들고, 같은 규칙으로 추천한 6개를 실제 N 회차와 비교합니다.
+
+통계는 회차 순서대로 누적합니다. (회차마다 SQL 을 다시 실행하지 않음)
+  - frequency      : 번호별 출현 여부의 누적합 (이전 회차까지)
+  - last_draw_gap  : (직전 회차 번호) - (번호가 마지막으로 나온 회차 번호), 한 번도 안 나왔으면 NULL
+  - 추천            : RANK(frequency DESC) + RANK(last_draw_gap DESC) 가 작은 순 → frequency 큰 순 → 번호 순
+모든 시점의 통계와 추천을 행렬 연산으로 한 번에 계산하므로 1,200 회차 백테스트가 수십 ms 안에 끝납니다.
+"""
+import time
+
+import numpy as np
+
+from services.draw_store import NUMBER_COUNT, RANKS, popcount64
+from services.simulation import BASELINE_PROBABILITY, _BITS, pairwise_ranks, recommend_order
+
+
+def _numbers_of(masks):
+    """비트마스크 배열 → 번호 행렬 (D×45 bool, 열 = 번호 1~45)"""
+    return (masks[:, None] & _BITS[None, :]) != 0
+
+
+def walk_forward_stats(draw_nos, masks):
+    """
+    오름차순 회차에 대해, 각 회차 직전 시점의 (frequency, last_draw_gap) 행렬을 계산합니다.
+    반환: (frequency S×45, last_draw_gap S×45 (NULL 은 NaN))  — S = 회차 수, i 행은 i 번째 회차 이전 통계
+    """
+    appeared = _numbers_of(masks)
+    # i 행 = 0 ~ i-1 회차 누적 (자기 자신은 포함하지 않음)
+    frequency = np.zeros(appeared.shape, dtype=np.int64)
+    np.cumsum(appeared[:-1], axis=0, out=frequency[1:])
+
+    seen_at = np.where(appeared, draw_nos[:, None], -1).astype(np.int64)
+    last_seen = np.full(appeared.shape, -1, dtype=np.int64)
+    np.maximum.accumulate(seen_at[:-1], axis=0, out=last_seen[1:])
+
+    previous_draw_no = np.concatenate([[0], draw_nos[:-1]])[:len(draw_nos)].astype(np.int64)
+    gaps = np.where(last_seen >= 0, previous_draw_no[:, None] - last_seen, np.nan)
+    return frequency, gaps
+
+
+def backtest_recommendation(draw_nos, masks, bonus_masks, min_history=1, top_k=6, exclude=(), details=False):
+    """
+    추천 모델을 회차 순서대로 재현하여 등수별 적중률을 계산합니다.
+
+    draw_nos / masks / bonus_masks : DrawStore.snapshot() 결과 (순서는 상관없음)
+    min_history : 이 개수만큼의 회차가 쌓인 뒤부터 평가 (첫 회차는 통계가 없으므로 기본 1)
+    exclude     : 추천에서 제외할 번호 (사용자의 과거 선택 번호 등)
+    details     : True 이면 회차별 추천 번호와 결과 목록을 함께 반환
+    """
+    started = time.perf_counter()
+    order = np.argsort(draw_nos, kind='stable')
+    draw_nos = np.asarray(draw_nos)[order]
+    masks = np.asarray(masks, dtype=np.uint64)[order]
+    bonus_masks = np.asarray(bonus_masks, dtype=np.uint64)[order]
+
+    frequency, gaps = walk_forward_stats(draw_nos, masks)
+    evaluate = slice(min(max(min_history, 0), len(draw_nos)), None)
+    frequency, gaps = frequency[evaluate], gaps[evaluate]
+    draw_nos, masks, bonus_masks = draw_nos[evaluate], masks[evaluate], bonus_masks[evaluate]
+
+    excluded = None
+    if exclude:
+        excluded = np.zeros(NUMBER_COUNT, dtype=bool)
+        excluded[np.asarray(sorted(set(exclude))) - 1] = True
+        excluded = np.broadcast_to(excluded, frequency.shape)
+
+    picks = np.sort(recommend_order(frequency, gaps, excluded)[:, :top_k], axis=1)
+    ticket_masks = _BITS[picks - 1].sum(axis=1, dtype=np.uint64)
+    matches = popcount64(ticket_masks & masks)
+    ranks = pairwise_ranks(ticket_masks, masks, bonus_masks) if top_k == 6 else np.zeros(len(masks), dtype=np.int8)
+
+    total = len(draw_nos)
+    rank_counts = np.bincount(ranks, minlength=6)
+    result = {
+        'draws': total,
+        'from_draw': int(draw_nos[0]) if total else None,
+        'to_draw': int(draw_nos[-1]) if total else None,
+        'top_k': top_k,
+        'counts': {rank: int(rank_counts[rank]) for rank in RANKS},
+        'rates': {rank: (float(rank_counts[rank] / total) if total else 0.0) for rank in RANKS},
+        'lift': {rank: (float(rank_counts[rank] / total / BASELINE_PROBABILITY[rank]) if total else 0.0)
+                 for rank in RANKS},
+        'match_distribution': {m: int(c) for m, c in enumerate(np.bincount(matches, minlength=top_k + 1))},
+        'mean_matches': float(matches.mean()) if total else 0.0,
+        # 무작위 선택 시 기대 일치 개수 = top_k × 6 / 45
+        'expected_random_matches': top_k * 6 / NUMBER_COUNT,
+    }
+    if details:
+        result['steps'] = [
+            {'draw_no': int(d), 'numbers': p.tolist(), 'matches': int(m), 'rank': int(r)}
+            for d, p, m, r in zip(draw_nos, picks, matches, ranks)
+        ]
+    result['seconds'] = time.perf_counter() - started
+    return result
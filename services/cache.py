@@ -0,0 +1,198 @@
+# services/cache.py
+"""
+서비스 계층 읽기 캐시 (read-through, TTL + LRU).
+
+당첨 데이터와 통계는 새 회차 적재 / 관리자 통계 갱신 때만 바뀌므로,
+조회 결과를 "데이터 버전" 과 함께 캐시 키로 저장합니다.
+
+  - 데이터 버전 = (DB 의 app_cache_version 값, 이 프로세스의 로컬 카운터)
+      · 적재 스크립트와 통계 갱신은 자신의 트랜잭션 안에서 DB 버전을 올립니다.
+      · 웹 서버는 CACHE_VERSION_CHECK_INTERVAL 초마다 한 번만 DB 버전을 확인합니다.
+      · 같은 프로세스에서 데이터를 바꾼 경우 DataVersion.bump() 로 즉시 무효화합니다.
+  - 버전이 바뀌면 이전 버전의 키는 더 이상 조회되지 않고 LRU 로 밀려납니다.
+  - 각 항목은 CACHE_TTL 초 후 만료되며, 최대 CACHE_MAX_ENTRIES 개까지 보관합니다.
+
+사용 예:
+
+    class StatService:
+        @staticmethod
+        @cached('stats')
+        def get_all_stats():
+            ...
+"""
+import asyncio
+import os
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from db.cache_version import CacheVersionDB
+
+
+class TTLCache:
+    """스레드 안전한 TTL + LRU 캐시 (적중/실패/제거 횟수 집계 포함)"""
+
+    def __init__(self, max_entries=1024, ttl=300):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data = OrderedDict()   # key -> (만료 시각, 값)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """(True, 값) 또는 (False, None) 을 반환합니다."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] < now:
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return False, None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return True, entry[1]
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete_where(self, predicate):
+        """조건에 맞는 키를 모두 삭제하고, 삭제한 개수를 반환합니다."""
+        with self._lock:
+            keys = [k for k in self._data if predicate(k)]
+            for k in keys:
+                del self._data[k]
+            return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'entries': len(self._data),
+                'max_entries': self.max_entries,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / total, 4) if total else 0.0,
+            }
+
+
+class DataVersion:
+    """캐시 키에 포함되는 데이터 버전 (프로세스 전역)"""
+
+    CHECK_INTERVAL = float(os.getenv("CACHE_VERSION_CHECK_INTERVAL", "5"))
+
+    _lock = threading.Lock()
+    _local = 0
+    _shared = None
+    _checked_at = float('-inf')
+
+    @classmethod
+    def current(cls):
+        now = time.monotonic()
+        if now - cls._checked_at >= cls.CHECK_INTERVAL:
+            with cls._lock:
+                if now - cls._checked_at >= cls.CHECK_INTERVAL:
+                    shared = CacheVersionDB.get_version()
+                    # DB 오류 시에는 이전 값을 유지 (다음 주기에 다시 확인)
+                    if shared is not None:
+                        cls._shared = shared
+                    cls._checked_at = now
+        return cls._shared, cls._local
+
+    @classmethod
+    def last_known(cls):
+        """DB 를 확인하지 않고 마지막으로 확인한 데이터 버전을 반환합니다."""
+        return cls._shared, cls._local
+
+    @classmethod
+    def needs_check(cls):
+        """다음 current() 호출이 DB 를 조회하는지 여부"""
+        return time.monotonic() - cls._checked_at >= cls.CHECK_INTERVAL
+
+    @classmethod
+    async def current_async(cls):
+        """current() 의 비동기 버전. DB 확인이 필요한 경우에만 스레드에서 실행하여 이벤트 루프를 막지 않습니다."""
+        if cls.needs_check():
+            return await asyncio.to_thread(cls.current)
+        return cls.last_known()
+
+    @classmethod
+    def bump(cls):
+        """이 프로세스에서 데이터를 변경한 경우 호출합니다. 다음 조회부터 새 캐시 키를 사용합니다."""
+        with cls._lock:
+            cls._local += 1
+            cls._checked_at = float('-inf')
+
+
+app_cache = TTLCache(
+    max_entries=int(os.getenv("CACHE_MAX_ENTRIES", "1024")),
+    ttl=float(os.getenv("CACHE_TTL", "300")),
+)
+
+
+def cached(namespace, ttl=None, should_cache=bool):
+    """
+    함수 결과를 (namespace, 데이터 버전, 인자) 키로 캐시합니다.
+    should_cache(결과) 가 거짓이면 캐시하지 않습니다. 기본값은 빈 결과(오류 시 반환되는 [] 등)를 제외하며,
+    오류여도 빈 값이 아닌 결과(예: {'draws': [], ...})를 돌려주는 함수는 판별 함수를 직접 지정합니다.
+    캐시된 값은 여러 요청이 공유하므로, 호출하는 쪽에서 값을 직접 수정하지 않아야 합니다.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            key = (namespace, DataVersion.current(), args, tuple(sorted(kwargs.items())))
+            found, value = app_cache.get(key)
+            if found:
+                return value
+            value = func(*args, **kwargs)
+            if should_cache(value):
+                app_cache.set(key, value, ttl)
+            return value
+        return wrapper
+    return decorator
+
+
+def async_cached(namespace, ttl=None, should_cache=bool):
+    """cached 의 코루틴 함수 버전 (ASGI 모드용). 같은 캐시 저장소와 데이터 버전을 사용합니다."""
+    def decorator(func):
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            key = (namespace, await DataVersion.current_async(), args, tuple(sorted(kwargs.items())))
+            found, value = app_cache.get(key)
+            if found:
+                return value
+            value = await func(*args, **kwargs)
+            if should_cache(value):
+                app_cache.set(key, value, ttl)
+            return value
+        return wrapper
+    return decorator
+
+
+def invalidate(namespace, *args):
+    """
+    namespace 의 캐시를 무효화합니다. args 를 주면 해당 인자로 호출된 항목만 삭제합니다.
+    (예: invalidate('draw_pages', 1, 20) → get_paginated_draws(1, 20) 결과만 삭제)
+    """
+    return app_cache.delete_where(
+        lambda key: key[0] == namespace and (not args or key[2] == args)
+    )
+
+
+def cache_stats():
+    return app_cache.stats()
@@ -0,0 +1,116 @@
+# services/combination_index.py
+"""
+조합 공간 색인.
+
+정렬된 번호 6개는 조합 번호(combinatorial number system)로 1 ~ 8,145,060 (= C(45, 6)) 사이의
+정수 하나에 대응됩니다. 모든 과거 회차를 이 번호로 색인해 두면
+  - "이 조합이 1등으로 나온 적이 있는가"      → 딕셔너리 조회 1번
+  - "5개가 일치한 회차(2등/3등)가 있는가"     → 티켓의 5개 부분집합 6개 × 딕셔너리 조회
+로 끝나므로, 전체 회차를 훑으며 일치 개수를 계산할 필요가 없습니다.
+
+색인은 DrawStore 가 당첨 데이터를 (다시) 읽어올 때 함께 만듭니다.
+"""
+from math import comb
+
+import numpy as np
+
+NUMBER_COUNT = 45
+PICK_COUNT = 6
+COMBINATION_COUNT = comb(NUMBER_COUNT, PICK_COUNT)   # 8,145,060
+
+# _BINOM[n, k] = C(n, k)  (벡터 연산용 표)
+_BINOM = np.array(
+    [[comb(n, k) for k in range(PICK_COUNT + 1)] for n in range(NUMBER_COUNT + 1)],
+    dtype=np.int64
+)
+
+
+def combination_rank(numbers):
+    """
+    번호 6개의 조합 번호(1 ~ 8,145,060)를 반환합니다. 입력 순서는 상관없습니다.
+    rank = 1 + Σ C(c_i - 1, i)  (c_1 < c_2 < ... < c_6, i = 1..6)
+    """
+    return 1 + sum(comb(c - 1, i) for i, c in enumerate(sorted(numbers), start=1))
+
+
+def combination_unrank(rank):
+    """combination_rank 의 역함수. 정렬된 번호 6개(list)를 반환합니다."""
+    remainder = rank - 1
+    numbers = []
+    for i in range(PICK_COUNT, 0, -1):
+        # C(c - 1, i) <= remainder 를 만족하는 가장 큰 c
+        c = i
+        while comb(c, i) <= remainder:
+            c += 1
+        numbers.append(c)
+        remainder -= comb(c - 1, i)
+    return numbers[::-1]
+
+
+def combination_ranks(matrix):
+    """N×6 번호 행렬(각 행은 정렬되지 않아도 됨)의 조합 번호 배열을 한 번에 계산합니다."""
+    sorted_matrix = np.sort(np.asarray(matrix, dtype=np.int64), axis=1)
+    if sorted_matrix.size == 0:
+        return np.zeros(0, dtype=np.int64)
+    columns = np.arange(1, sorted_matrix.shape[1] + 1)
+    return 1 + _BINOM[sorted_matrix - 1, columns].sum(axis=1)
+
+
+def _subset_key(numbers):
+    """정렬된 번호 5개의 키 (같은 방식의 조합 번호, C(45, 5) 공간)"""
+    return sum(comb(c - 1, i) for i, c in enumerate(numbers, start=1))
+
+
+class CombinationIndex:
+    """
+    과거 회차 조합 색인 (읽기 전용, 만든 뒤에는 바꾸지 않으므로 스레드 간 공유 가능)
+
+      exact   : 조합 번호 → [회차, ...]
+      subsets : 5개 부분집합 키 → [(회차, 나머지 번호, 보너스), ...]
+    """
+
+    def __init__(self, draw_nos, numbers, bonuses):
+        """
+        draw_nos : 회차 배열 (길이 D)
+        numbers  : D×6 당첨번호 행렬
+        bonuses  : 보너스 번호 배열 (길이 D)
+        """
+        self.exact = {}
+        self.subsets = {}
+
+        numbers = np.sort(np.asarray(numbers, dtype=np.int64), axis=1)
+        ranks = combination_ranks(numbers)
+        for draw_no, rank, row, bonus in zip(draw_nos.tolist(), ranks.tolist(), numbers.tolist(), bonuses.tolist()):
+            self.exact.setdefault(rank, []).append(draw_no)
+            for skip in range(PICK_COUNT):
+                subset = row[:skip] + row[skip + 1:]
+                self.subsets.setdefault(_subset_key(subset), []).append((draw_no, row[skip], bonus))
+
+    @classmethod
+    def empty(cls):
+        return cls(np.zeros(0, dtype=np.int32), np.zeros((0, PICK_COUNT), dtype=np.int64), np.zeros(0, dtype=np.int64))
+
+    def __len__(self):
+        return sum(len(v) for v in self.exact.values())
+
+    def exact_hits(self, numbers):
+        """이 조합이 1등 당첨 번호였던 회차 목록"""
+        return list(self.exact.get(combination_rank(numbers), []))
+
+    def lookup(self, numbers):
+        """
+        1등 / 2등(5개 + 보너스) / 3등(5개) 에 해당하는 회차 목록을 반환합니다.
+        반환 형식: {1: [회차, ...], 2: [...], 3: [...]}  (각 목록은 최신 회차부터)
+        """
+        row = sorted(numbers)
+        result = {1: self.exact_hits(row), 2: [], 3: []}
+        for skip in range(PICK_COUNT):
+            extra = row[skip]
+            for draw_no, missing, bonus in self.subsets.get(_subset_key(row[:skip] + row[skip + 1:]), ()):
+                if missing == extra:
+                    # 6개 모두 일치 (1등, 위에서 이미 집계)
+                    continue
+                result[2 if extra == bonus else 3].append(draw_no)
+        for rank in (2, 3):
+            result[rank].sort(reverse=True)
+        return result
@@ -0,0 +1,271 @@
+# services/draw_store.py
+"""
+프로세스에 상주하는 당첨 이력 저장소.
+
+모든 회차를 "번호 비트마스크" 배열로 보관합니다.
+  - 번호 n (1~45) 은 (n - 1) 번째 비트 → 한 회차의 당첨번호 6개 = uint64 하나
+  - 보너스 번호도 같은 방식의 uint64 하나
+사용자 번호와의 일치 개수는 (pick_mask & draw_mask) 의 popcount 로 한 번에 계산하므로,
+회차 수가 수천 개로 늘어나도 한 번의 벡터 연산으로 끝납니다.
+
+데이터는 최초 사용 시 DB 에서 한 번 읽어오고, 이후에는
+  - 같은 프로세스에서 적재가 일어나면 DrawStore.invalidate() 로 즉시,
+  - 다른 프로세스(적재 스크립트 등)의 변경은 데이터 버전(services/cache.py 의 DataVersion)이
+    바뀐 경우에만 다시 읽어옵니다. 적재 스크립트는 --update 로 기존 회차를 고친 경우에도
+    같은 트랜잭션에서 데이터 버전을 올리므로, 회차 수와 최신 회차가 그대로인 수정도 반영됩니다.
+"""
+import threading
+
+import numpy as np
+
+from db.lotto_draw import LottoDrawDB
+from services.cache import DataVersion
+from services.combination_index import CombinationIndex
+
+NUMBER_COUNT = 45
+# 히스토그램에 사용하는 등수 (0 = 낙첨)
+RANKS = (1, 2, 3, 4, 5, 0)
+
+# 일치 개수 → 등수 (5개 일치 + 보너스 = 2등은 별도로 보정)
+_MATCH_RANK = np.array([0, 0, 0, 5, 4, 3, 1], dtype=np.int8)
+
+if hasattr(np, "bitwise_count"):
+    def popcount64(values):
+        """uint64 배열의 원소별 1 비트 개수 (NumPy 2.0+ 내장 popcount)"""
+        return np.bitwise_count(values)
+else:
+    _BYTE_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+    def popcount64(values):
+        """uint64 배열의 원소별 1 비트 개수 (바이트 단위 조회 테이블)"""
+        values = np.ascontiguousarray(values, dtype=np.uint64)
+        counts = _BYTE_POPCOUNT[values.view(np.uint8)]
+        return counts.reshape(values.shape + (8,)).sum(axis=-1, dtype=np.uint8)
+
+
+def numbers_to_mask(numbers):
+    """번호 목록을 45비트 마스크(int)로 변환합니다."""
+    mask = 0
+    for n in numbers:
+        mask |= 1 << (int(n) - 1)
+    return mask
+
+
+def picks_to_masks(picks):
+    """
+    N×6 번호 행렬을 길이 N 의 uint64 마스크 배열로 변환합니다.
+    picks 는 리스트의 리스트 또는 정수형 ndarray 모두 가능합니다.
+    """
+    arr = np.asarray(picks, dtype=np.int64)
+    if arr.size == 0:
+        return np.zeros(0, dtype=np.uint64)
+    if arr.ndim == 1:
+        arr = arr.reshape(1, -1)
+    bits = np.left_shift(np.uint64(1), (arr - 1).astype(np.uint64))
+    return np.bitwise_or.reduce(bits, axis=1)
+
+
+def rank_matrix(ticket_masks, draw_masks, bonus_masks):
+    """
+    티켓 N 개 × 회차 D 개의 등수 행렬(int8, 0 = 낙첨)을 계산합니다.
+    보너스 비교는 드물게 나오는 5개 일치 칸에 대해서만 수행합니다.
+    """
+    match = popcount64(ticket_masks[:, None] & draw_masks[None, :])
+    ranks = _MATCH_RANK[match]
+    i, j = np.nonzero(match == 5)
+    hit = (ticket_masks[i] & bonus_masks[j]) != 0
+    ranks[i[hit], j[hit]] = 2
+    return ranks
+
+
+def rank_histograms(ticket_masks, draw_masks, bonus_masks, chunk_size=256):
+    """
+    티켓별 등수 히스토그램을 N×6 행렬(열 = 등수 0~5 의 횟수)로 계산합니다.
+    N×D 일치 개수 행렬을 chunk_size 행씩(캐시에 들어가는 크기) 만들고,
+    등수별 개수를 행 단위 count_nonzero 로 한 번에 집계합니다.
+    """
+    n = len(ticket_masks)
+    result = np.zeros((n, 6), dtype=np.int64)
+    if n == 0:
+        return result
+    for start in range(0, n, chunk_size):
+        block = ticket_masks[start:start + chunk_size]
+        out = result[start:start + chunk_size]
+        match = popcount64(block[:, None] & draw_masks[None, :])
+
+        five = match == 5
+        i, j = np.nonzero(five)
+        hit = (block[i] & bonus_masks[j]) != 0
+
+        out[:, 1] = np.count_nonzero(match == 6, axis=1)
+        out[:, 2] = np.bincount(i[hit], minlength=len(block))
+        out[:, 3] = np.count_nonzero(five, axis=1) - out[:, 2]
+        out[:, 4] = np.count_nonzero(match == 4, axis=1)
+        out[:, 5] = np.count_nonzero(match == 3, axis=1)
+        out[:, 0] = len(draw_masks) - out[:, 1:].sum(axis=1)
+    return result
+
+
+def rank_counts(ranks):
+    """등수 배열(1차원)을 {1: .., 2: .., ..., 5: .., 0: ..} 히스토그램으로 변환합니다."""
+    counts = np.bincount(ranks.ravel(), minlength=6)
+    return {rank: int(counts[rank]) for rank in RANKS}
+
+
+class DrawStore:
+    """
+    당첨 이력 메모리 저장소 (프로세스 전역, 스레드 안전).
+    클래스 메서드만 사용하며 별도의 인스턴스를 만들지 않습니다.
+    """
+
+    _lock = threading.Lock()
+    _loaded = False
+    _draw_nos = np.zeros(0, dtype=np.int32)        # 최신 회차부터 내림차순
+    _masks = np.zeros(0, dtype=np.uint64)
+    _bonus_masks = np.zeros(0, dtype=np.uint64)
+    _index = CombinationIndex.empty()               # 조합 번호 → 회차 색인
+    _signature = None
+    _data_version = None                            # 마지막으로 읽어온 시점의 데이터 버전
+    # 데이터를 다시 읽어올 때마다 1씩 증가 (파생 캐시의 무효화 키로 사용)
+    version = 0
+
+    # ---------------------------------------------------------
+    # 적재 / 갱신
+    # ---------------------------------------------------------
+    @classmethod
+    def _load_locked(cls):
+        """
+        DB 에서 모든 회차를 다시 읽습니다. 반환: 성공 여부
+        get_all_draws() 는 DB 오류 시에도 [] 를 반환하므로, 빈 결과는 서명으로 실제로 비어 있는지 확인하고
+        읽지 못한 경우에는 이전 배열과 version 을 그대로 두어 다음 호출에서 다시 시도합니다.
+        """
+        rows = LottoDrawDB.get_all_draws()
+        if not rows:
+            signature = LottoDrawDB.get_draw_signature()
+            if signature is None or signature[0]:
+                return False
+        rows = [r for r in rows if len(r) >= 8 and None not in r[:8]]
+        if rows:
+            arr = np.asarray([r[:8] for r in rows], dtype=np.int64)
+        else:
+            arr = np.zeros((0, 8), dtype=np.int64)
+
+        cls._draw_nos = arr[:, 0].astype(np.int32)
+        cls._masks = picks_to_masks(arr[:, 1:7]) if len(arr) else np.zeros(0, dtype=np.uint64)
+        cls._bonus_masks = (np.left_shift(np.uint64(1), (arr[:, 7] - 1).astype(np.uint64))
+                            if len(arr) else np.zeros(0, dtype=np.uint64))
+        cls._index = CombinationIndex(arr[:, 0], arr[:, 1:7], arr[:, 7])
+        cls._signature = (len(arr), int(arr[:, 0].max()) if len(arr) else 0)
+        cls._loaded = True
+        cls.version += 1
+        return True
+
+    @classmethod
+    def ensure_loaded(cls):
+        """
+        필요한 경우에만 DB 에서 다시 읽어옵니다.
+        데이터 버전이 마지막으로 읽어온 시점과 같으면 락 없이 바로 반환합니다.
+        (DB 의 데이터 버전 확인은 DataVersion 이 CACHE_VERSION_CHECK_INTERVAL 초마다 한 번만 수행)
+        """
+        # 회차를 읽기 전의 버전을 기록하므로, 읽는 도중 적재가 커밋되면 다음 호출에서 다시 읽음
+        data_version = DataVersion.current()
+        if cls._loaded and data_version == cls._data_version:
+            return
+        with cls._lock:
+            if cls._loaded and data_version == cls._data_version:
+                return
+            # 읽지 못한 경우에는 버전을 기록하지 않아 다음 호출에서 다시 시도
+            if cls._load_locked():
+                cls._data_version = data_version
+
+    @classmethod
+    def needs_check(cls):
+        """다음 ensure_loaded() 호출이 DB 를 조회하는지 여부 (비동기 코드에서 스레드로 넘길지 판단용)"""
+        return (not cls._loaded or DataVersion.needs_check()
+                or DataVersion.last_known() != cls._data_version)
+
+    @classmethod
+    def invalidate(cls):
+        """당첨 데이터가 변경되었음을 알립니다. 다음 조회 시 DB 에서 다시 읽어옵니다."""
+        with cls._lock:
+            cls._loaded = False
+
+    # ---------------------------------------------------------
+    # 조회
+    # ---------------------------------------------------------
+    @classmethod
+    def snapshot(cls):
+        """
+        (draw_nos, masks, bonus_masks) 를 한 번에 반환합니다.
+        갱신 중에도 세 배열이 항상 같은 시점의 데이터가 되도록 묶어서 읽습니다.
+        """
+        cls.ensure_loaded()
+        with cls._lock:
+            return cls._draw_nos, cls._masks, cls._bonus_masks
+
+    @classmethod
+    def signature(cls):
+        """현재 메모리에 있는 데이터의 (회차 수, 최신 회차). 응답 ETag 등 변경 감지용"""
+        cls.ensure_loaded()
+        return cls._signature
+
+    @classmethod
+    def draw_count(cls):
+        cls.ensure_loaded()
+        return len(cls._draw_nos)
+
+    @classmethod
+    def page_cursor(cls, page, per_page):
+        """
+        최신순 페이지 번호를 키셋 커서로 변환합니다.
+        page 페이지는 "이전 페이지의 마지막 회차보다 작은 회차" 이므로 그 회차 번호를 반환합니다.
+        (1 페이지는 None)
+        """
+        if page <= 1:
+            return None
+        draw_nos, _, _ = cls.snapshot()
+        index = (page - 1) * per_page - 1
+        if index >= len(draw_nos):
+            # 범위를 벗어난 페이지 → 가장 오래된 회차보다 작은 회차 (빈 결과)
+            return int(draw_nos[-1]) if len(draw_nos) else None
+        return int(draw_nos[index])
+
+    @classmethod
+    def page_of_cursor(cls, before_draw_no, per_page):
+        """키셋 커서(before_draw_no)가 가리키는 페이지 번호를 계산합니다."""
+        draw_nos, _, _ = cls.snapshot()
+        # draw_nos 는 내림차순이므로 부호를 바꿔 이진 탐색
+        position = int(np.searchsorted(-draw_nos, -before_draw_no, side='right'))
+        return position // per_page + 1
+
+    @classmethod
+    def rank_histogram(cls, numbers):
+        """
+        번호 6개를 전체 이력과 비교하여 등수별 당첨 횟수를 반환합니다.
+        반환 형식: {'total_draws': D, 1: .., 2: .., 3: .., 4: .., 5: .., 0: ..}
+        """
+        _, masks, bonus_masks = cls.snapshot()
+        ticket = np.array([numbers_to_mask(numbers)], dtype=np.uint64)
+        ranks = rank_matrix(ticket, masks, bonus_masks)[0]
+        result = {'total_draws': int(len(masks))}
+        result.update(rank_counts(ranks))
+        return result
+
+    @classmethod
+    def winning_draws(cls, numbers):
+        """
+        번호 6개가 1등 / 2등 / 3등에 해당했던 회차 목록을 조합 색인으로 조회합니다.
+        반환 형식: {1: [회차, ...], 2: [...], 3: [...]}
+        """
+        cls.ensure_loaded()
+        with cls._lock:
+            index = cls._index
+        return index.lookup(numbers)
+
+    @classmethod
+    def rank_histograms(cls, tickets):
+        """
+        N×6 번호 행렬 전체를 이력과 비교하여 N×6 히스토그램 행렬(열 = 등수 0~5)을 반환합니다.
+        """
+        _, masks, bonus_masks = cls.snapshot()
+        return rank_histograms(picks_to_masks(tickets), masks, bonus_masks), len(masks)
@@ -1,8 +1,23 @@
 from db.lotto_draw import LottoDrawDB
 from db.user_pick import UserPickDB
+from services.draw_store import DrawStore, RANKS
+from services.cache import TTLCache, cached
+from services.combination_index import combination_ranks
+from services.stat_service import StatLookup
+from services.pattern_stats import PatternStats
 import math
+import os
+import numpy as np
 from datetime import datetime
-import random
+
+MAX_BULK_PICKS = 100   # save_user_picks 한 번에 저장할 수 있는 최대 조합 수
+
+# 번호 조합별 과거 등수 히스토그램 캐시: (DrawStore.version, 조합 번호) → 등수 0~5 횟수
+# 당첨 이력이 다시 적재되면 DrawStore.version 이 바뀌므로 이전 항목은 조회되지 않고 LRU 로 밀려납니다.
+pick_history_cache = TTLCache(
+    max_entries=int(os.getenv("PICK_HISTORY_CACHE_ENTRIES", "50000")),
+    ttl=float(os.getenv("PICK_HISTORY_CACHE_TTL", "3600")),
+)
 
 # ---------------------------------------------------------
 # 당첨 판정 함수
@@ -28,55 +43,52 @@ def get_match_counts(user_numbers, win_numbers, bonus_number):
     return 0
 
 
-# ---------------------------------------------------------
-# Mock LottoStatDB
-# ---------------------------------------------------------
-
-class LottoStatDB:
-    @staticmethod
-    def get_stat_for_numbers(numbers):
-        stat_details = []
-        current_draw_id = 1100
-        for number in numbers:
-            freq = random.randint(100, 150)
-            last_draw_id = current_draw_id - random.randint(1, 30)
-            gap = current_draw_id - last_draw_id
-            stat_details.append({
-                "number": number,
-                "frequency": freq,
-                "last_draw_id": last_draw_id,
-                "last_draw_gap": gap
-            })
-        return stat_details
-
-
 # ---------------------------------------------------------
 # Lotto Service
 # ---------------------------------------------------------
 
 class LottoService:
 
-    # 페이징 조회
+    # 페이징 조회 (키셋 방식)
     @staticmethod
-    def get_paginated_draws(page=1, per_page=20):
-        total_count = LottoDrawDB.get_total_count()
+    # 조회 오류(빈 draws)는 캐시하지 않아 다음 요청에서 다시 조회
+    @cached('draw_pages', should_cache=lambda result: bool(result['draws']))
+    def get_paginated_draws(page=1, per_page=20, before=None):
+        """
+        당첨 번호를 최신순으로 페이징합니다.
+        - before(커서)가 있으면 그 회차보다 작은 회차부터 조회하고, 페이지 번호는 커서 위치로 계산합니다.
+        - 페이지 번호만 있으면 메모리의 회차 목록에서 해당 페이지의 커서를 찾아 사용합니다.
+        전체 개수도 메모리 저장소(당첨 데이터가 바뀔 때만 갱신)에서 가져오므로 COUNT(*) 를 실행하지 않습니다.
+        """
+        page = max(page, 1)
+        total_count = DrawStore.draw_count()
         total_pages = math.ceil(total_count / per_page)
-        offset = (page - 1) * per_page
-        draws = LottoDrawDB.get_draw_data(offset, per_page)
+
+        if before is not None:
+            page = DrawStore.page_of_cursor(before, per_page)
+        else:
+            before = DrawStore.page_cursor(page, per_page)
+
+        draws = LottoDrawDB.get_draws_before(before, per_page)
+        next_cursor = draws[-1][0] if draws and page < total_pages else None
 
         return {
             "draws": draws,
             "total_pages": total_pages,
             "current_page": page,
-            "total_count": total_count
+            "total_count": total_count,
+            "next_cursor": next_cursor
         }
 
     # 분석 코멘트 생성기
     @staticmethod
-    def check_analysis_comments(numbers):
+    def check_analysis_comments(numbers, stat_details=None, patterns=None):
         numbers = sorted(numbers)
 
-        stat_details = LottoStatDB.get_stat_for_numbers(numbers)
+        if stat_details is None:
+            stat_details = StatLookup.get_stat_for_numbers(numbers)
+        if patterns is None:
+            patterns = PatternStats.analyze(numbers)
         total_freq = sum(s["frequency"] for s in stat_details)
 
         num_sum = sum(numbers)
@@ -85,7 +97,8 @@ class LottoService:
         consecutive_count = sum(1 for i in range(5) if numbers[i+1] == numbers[i] + 1)
 
         return LottoService._get_analysis_comment(
-            num_sum, odd_count, low_count, consecutive_count, total_freq
+            num_sum, odd_count, low_count, consecutive_count, total_freq,
+            StatLookup.mean_frequency(), patterns
         )
 
     # 사용자 선택 번호 분석
@@ -97,52 +110,37 @@ class LottoService:
         """
 
         try:
-            # 1. 모든 과거 당첨번호 조회
-            all_draws = LottoDrawDB.get_all_draws()
-            if not all_draws:
-                all_draws = []
-
-            # 2. 당첨이력 초기화
-            history_analysis_results = {
-                'total_draws': len(all_draws),
-                1: 0, 2: 0, 3: 0, 4: 0, 5: 0, 0: 0
-            }
-
-            # 3. 당첨 비교
-            for draw in all_draws:
-                if len(draw) < 8:
-                    continue  # 데이터 불완전하면 스킵
-
-                win_numbers = list(draw[1:7])
-                bonus_number = draw[7]
-
-                rank = get_match_counts(user_numbers, win_numbers, bonus_number)
-                history_analysis_results[rank] += 1
-
-            # 4. 코멘트 + 개별 통계
-            comments = LottoService.check_analysis_comments(user_numbers)
-
-            detailed_stats = LottoStatDB.get_stat_for_numbers(user_numbers)
-            if not detailed_stats:
-                detailed_stats = []
-
-            # 안전한 점수 계산 (문자열 필터링 포함)
-            import re
-
-            freqs = []
-            gaps = []
-
+            # 1~3. 메모리에 상주하는 전체 당첨 이력과 한 번에 비교 (비트마스크 + popcount)
+            #      DB 는 당첨 데이터가 바뀐 경우에만 다시 조회합니다.
+            history_analysis_results = DrawStore.rank_histogram(user_numbers)
+            # 1~3등 회차는 조합 색인에서 바로 조회 (조합 번호 / 5개 부분집합 해시 조회)
+            winning_draws = DrawStore.winning_draws(user_numbers)
+            history_analysis_results['winning_draws'] = winning_draws
+
+            # 4. 개별 통계 (45칸 배열 조회, 한 번만 조회하여 코멘트와 점수 계산에 함께 사용)
+            detailed_stats = StatLookup.get_stat_for_numbers(user_numbers)
             for s in detailed_stats:
-                freq_raw = s.get("frequency", 0)
-                freq_num = re.sub(r"\D", "", str(freq_raw))
-                s["frequency"] = int(freq_num) if freq_num.isdigit() else 0
-
-                gap_raw = s.get("last_draw_gap", 0)
-                gap_num = re.sub(r"\D", "", str(gap_raw))
-                s["last_draw_gap"] = int(gap_num) if gap_num.isdigit() else 0
-
-                freqs.append(s["frequency"])
-                gaps.append(s["last_draw_gap"])
+                # 한 번도 나오지 않은 번호(last_draw_gap 이 NULL)는 간격 0 으로 표시
+                if s["last_draw_gap"] is None:
+                    s["last_draw_gap"] = 0
+
+            # 5. 패턴 위치 (통계 갱신 때 만든 분포/동시 출현 배열 조회, 요청마다 이력을 훑지 않음)
+            patterns = PatternStats.analyze(user_numbers)
+            history_analysis_results['patterns'] = patterns
+
+            comments = LottoService.check_analysis_comments(user_numbers, detailed_stats, patterns)
+            # 코멘트는 API(JSON)로도 그대로 나가므로 일반 텍스트로만 만들고, 강조는 템플릿에서 처리
+            highlights = []
+            if winning_draws[1]:
+                draws = ", ".join(f"{d}회" for d in winning_draws[1])
+                highlights.append(f"⭐ 이 조합은 과거 1등 당첨 번호와 완전히 같습니다. ({draws})")
+            if winning_draws[2] or winning_draws[3]:
+                highlights.append(f"⭐ 5개가 일치한 회차가 {len(winning_draws[2]) + len(winning_draws[3])}번 있었습니다. "
+                                  f"(2등 {len(winning_draws[2])}회, 3등 {len(winning_draws[3])}회)")
+            comments = highlights + comments
+
+            freqs = [s["frequency"] for s in detailed_stats]
+            gaps = [s["last_draw_gap"] for s in detailed_stats]
 
             # 안전한 최대값 보호
             max_freq = max(freqs) if freqs and max(freqs) > 0 else 1
@@ -169,18 +167,91 @@ class LottoService:
             print("CHECK_PICK_ANALYSIS ERROR:", e)
             # 템플릿이 깨지지 않도록 기본값 반환
             return (
-                {'total_draws': 0, 1: 0, 2: 0, 3: 0, 4: 0, 5: 0, 0: 0},
+                {'total_draws': 0, 1: 0, 2: 0, 3: 0, 4: 0, 5: 0, 0: 0, 'winning_draws': {1: [], 2: [], 3: []},
+                 'patterns': None},
                 ["❌ 분석 중 오류가 발생했습니다. (console 로그 확인)"],
                 []
             )
             
             
+    # ---------------------------------------------------------
+    # 여러 티켓 일괄 분석 (N×6 행렬)
+    # ---------------------------------------------------------
+    MAX_BATCH_TICKETS = 100000
+
+    @staticmethod
+    def _validate_ticket_matrix(tickets):
+        """
+        티켓 목록을 N×6 정수 행렬로 변환하고 한 번에 검사합니다.
+        성공 시 (True, 정렬된 ndarray), 실패 시 (False, 메시지) 를 반환합니다.
+        """
+        try:
+            arr = np.asarray(tickets, dtype=np.int64)
+        except (ValueError, TypeError):
+            return False, "❌ 모든 번호는 정수여야 하며, 각 티켓은 6개의 번호로 구성되어야 합니다."
+
+        if arr.ndim != 2 or arr.shape[1] != 6 or arr.shape[0] == 0:
+            return False, "❌ 티켓은 6개 번호의 목록(N×6)이어야 합니다."
+        if arr.shape[0] > LottoService.MAX_BATCH_TICKETS:
+            return False, f"❌ 한 번에 최대 {LottoService.MAX_BATCH_TICKETS}개의 티켓만 분석할 수 있습니다."
+
+        bad_range = np.flatnonzero(((arr < 1) | (arr > 45)).any(axis=1))
+        if len(bad_range):
+            return False, f"❌ {int(bad_range[0]) + 1}번째 티켓: 번호는 1~45 사이여야 합니다."
+
+        arr = np.sort(arr, axis=1)
+        bad_dup = np.flatnonzero((np.diff(arr, axis=1) == 0).any(axis=1))
+        if len(bad_dup):
+            return False, f"❌ {int(bad_dup[0]) + 1}번째 티켓: 번호에 중복이 있으면 안 됩니다."
+
+        return True, arr
+
+    @staticmethod
+    def check_picks_batch(tickets):
+        """
+        여러 티켓(N×6)을 전체 당첨 이력과 한 번의 행렬 연산으로 비교합니다.
+        성공 시 (True, 결과 dict), 실패 시 (False, 메시지) 를 반환합니다.
+
+        결과 dict:
+            total_draws: 비교한 회차 수
+            tickets: [{'numbers': [...], 'ranks': {1: .., 2: .., 3: .., 4: .., 5: .., 0: ..}}, ...]
+            summary: 전체 티켓의 등수별 합계
+        """
+        ok, arr = LottoService._validate_ticket_matrix(tickets)
+        if not ok:
+            return False, arr
+
+        histograms, total_draws = DrawStore.rank_histograms(arr)
+
+        results = []
+        for numbers, counts in zip(arr.tolist(), histograms.tolist()):
+            results.append({
+                'numbers': numbers,
+                'ranks': {rank: counts[rank] for rank in RANKS}
+            })
+
+        totals = histograms.sum(axis=0).tolist()
+        return True, {
+            'total_draws': total_draws,
+            'tickets': results,
+            'summary': {rank: totals[rank] for rank in RANKS}
+        }
+
+    @staticmethod
+    def check_user_picks_batch(user_id):
+        """사용자가 저장한 모든 번호를 일괄 분석합니다."""
+        picks = UserPickDB.get_user_picks(user_id)
+        if not picks:
+            return False, "❌ 저장된 번호가 없습니다."
+        return LottoService.check_picks_batch([p['numbers'] for p in picks])
+
     # ---------------------------------------------------------
     # 사용자 PICK 저장
     # ---------------------------------------------------------
     @staticmethod
-    def save_user_pick(user_id, numbers):
-        if not (isinstance(numbers, list) and len(numbers) == 6):
+    def _validate_pick(numbers):
+        """번호 6개 검증. (True, 정렬된 번호) 또는 (False, 오류 메시지)"""
+        if not (isinstance(numbers, (list, tuple)) and len(numbers) == 6):
             return False, "❌ 번호는 정확히 6개여야 합니다."
 
         try:
@@ -194,12 +265,82 @@ class LottoService:
         if len(set(numbers)) != 6:
             return False, "❌ 번호에 중복이 있으면 안 됩니다."
 
-        numbers.sort()
+        return True, sorted(numbers)
+
+    @staticmethod
+    def save_user_pick(user_id, numbers):
+        valid, numbers = LottoService._validate_pick(numbers)
+        if not valid:
+            return False, numbers
+
         return UserPickDB.save_user_pick(user_id, *numbers)
 
+    @staticmethod
+    def save_user_picks(user_id, tickets):
+        """
+        번호 조합 여러 개를 한 번에 저장합니다. (검증 후 한 트랜잭션, INSERT 한 번)
+        하나라도 잘못된 조합이 있으면 아무것도 저장하지 않습니다.
+        반환: (True, [pick_id, ...]) 또는 (False, 오류 메시지)
+        """
+        if not isinstance(tickets, (list, tuple)) or not tickets:
+            return False, "❌ 저장할 번호가 없습니다."
+        if len(tickets) > MAX_BULK_PICKS:
+            return False, f"❌ 한 번에 최대 {MAX_BULK_PICKS}개까지 저장할 수 있습니다."
+
+        rows = []
+        for i, numbers in enumerate(tickets, start=1):
+            valid, result = LottoService._validate_pick(numbers)
+            if not valid:
+                return False, f"{i}번째 번호: {result}"
+            rows.append(result)
+
+        return UserPickDB.save_user_picks_bulk(user_id, rows)
+
     @staticmethod
     def get_user_picks(user_id):
-        return UserPickDB.get_user_picks(user_id)
+        """
+        사용자가 저장한 번호 목록. 각 번호에 과거 전체 회차 기준 등수별 당첨 횟수('history')를 붙입니다.
+        history: {'total_draws': D, 1: .., 2: .., 3: .., 4: .., 5: .., 0: ..}
+        """
+        picks = UserPickDB.get_user_picks(user_id)
+        if picks:
+            histories = LottoService.pick_histories([pick['numbers'] for pick in picks])
+            for pick, history in zip(picks, histories):
+                pick['history'] = history
+        return picks
+
+    @staticmethod
+    def pick_histories(tickets):
+        """
+        여러 번호 조합의 과거 등수 히스토그램을 반환합니다. (tickets 순서대로)
+        캐시에 없는 조합만 모아 DrawStore.rank_histograms 한 번(N×D 비트 연산)으로 계산합니다.
+        """
+        DrawStore.ensure_loaded()
+        version = DrawStore.version
+        total_draws = DrawStore.draw_count()
+        keys = combination_ranks(tickets).tolist()
+
+        counts = [None] * len(keys)
+        missing = []
+        for i, key in enumerate(keys):
+            found, value = pick_history_cache.get((version, key))
+            if found:
+                counts[i] = value
+            else:
+                missing.append(i)
+
+        if missing:
+            histograms, _ = DrawStore.rank_histograms(np.asarray([tickets[i] for i in missing], dtype=np.int64))
+            for i, row in zip(missing, histograms.tolist()):
+                counts[i] = tuple(row)
+                pick_history_cache.set((version, keys[i]), counts[i])
+
+        histories = []
+        for row in counts:
+            history = {'total_draws': total_draws}
+            history.update((rank, row[rank]) for rank in RANKS)
+            histories.append(history)
+        return histories
 
     @staticmethod
     def delete_pick(pick_id, user_id):
@@ -209,7 +350,79 @@ class LottoService:
     # 분석 코멘트 생성기
     # ---------------------------------------------------------
     @staticmethod
-    def _get_analysis_comment(num_sum, odd_count, low_count, consecutive_count, total_freq):
+    def _pattern_comments(patterns):
+        """패턴 통계(과거 당첨 번호의 실제 분포) 기준 코멘트"""
+        comments = []
+        total = patterns['total_draws']
+
+        s = patterns['sum']
+        position = f"과거 {total}회 당첨 조합 중 하위 {s['percentile']}% 위치"
+        if s['percentile'] < 5:
+            comments.append(f"총합계 {s['value']}는 매우 낮은 편입니다. ({position})")
+        elif s['percentile'] > 95:
+            comments.append(f"총합계 {s['value']}는 매우 높은 편입니다. ({position})")
+        else:
+            comments.append(f"총합계 {s['value']}는 일반적인 구간에 있습니다. ({position})")
+
+        for kind, label in (('odd', '홀짝'), ('low', '저/고')):
+            d = patterns[kind]
+            ratio = f"{d['value']}:{6 - d['value']}"
+            if d['share'] < 5:
+                comments.append(f"{label} 비율 {ratio}은 과거 당첨 번호의 {d['share']}%에서만 나온 드문 패턴입니다.")
+            elif d['share'] < 15:
+                comments.append(f"{label} 비율 {ratio}은 과거 당첨 번호의 {d['share']}%로 다소 드문 편입니다.")
+            else:
+                comments.append(f"{label} 비율 {ratio}은 과거 당첨 번호의 {d['share']}%에서 나온 흔한 패턴입니다.")
+
+        c = patterns['consecutive']
+        if c['share'] < 5:
+            comments.append(f"연속 번호 {c['value']}쌍은 과거 당첨 번호의 {c['share']}%에서만 나온 매우 드문 패턴입니다.")
+        else:
+            comments.append(f"연속 번호 {c['value']}쌍은 과거 당첨 번호의 {c['share']}%에서 나온 패턴입니다.")
+
+        pairs = patterns['pairs']
+        strongest = pairs['strongest']
+        comments.append(
+            f"번호 쌍 15개의 평균 동시 출현은 {pairs['mean']}회입니다. (기댓값 {pairs['expected']}회, "
+            f"전체 번호 쌍 중 하위 {pairs['percentile']:.0f}%) "
+            f"가장 자주 함께 나온 쌍은 {strongest['numbers'][0]}-{strongest['numbers'][1]} ({strongest['count']}회)입니다."
+        )
+
+        triples = patterns['triples']
+        best = triples['best']
+        if triples['in_top']:
+            top = ", ".join("-".join(map(str, t)) for t in triples['in_top'])
+            comments.append(f"역대 가장 자주 함께 나온 세 번호 조합({top})이 포함되어 있습니다.")
+        elif best['count'] > 0:
+            comments.append(f"세 번호 조합 중 {'-'.join(map(str, best['numbers']))}가 {best['count']}회 함께 나왔습니다. "
+                            f"(전체 세 번호 조합 중 하위 {triples['best_percentile']:.0f}%)")
+        else:
+            comments.append("세 번호가 함께 나온 적이 있는 조합이 없습니다.")
+        return comments
+
+    @staticmethod
+    def _get_analysis_comment(num_sum, odd_count, low_count, consecutive_count, total_freq, mean_freq=None,
+                              patterns=None):
+        # 패턴 통계가 있으면 실제 분포 기준, 없으면(통계 갱신 전) 고정 기준값을 사용합니다.
+        if patterns:
+            comments = LottoService._pattern_comments(patterns)
+        else:
+            comments = LottoService._fixed_threshold_comments(num_sum, odd_count, low_count, consecutive_count)
+
+        # 기준값: 전체 번호 평균 출현 횟수의 ±5% (통계가 없으면 기존 고정값 사용)
+        avg_freq = total_freq / 6
+        low_freq, high_freq = (mean_freq * 0.95, mean_freq * 1.05) if mean_freq else (110, 140)
+        if avg_freq < low_freq:
+            comments.append("선택된 번호들의 평균 출현 빈도가 낮은 편입니다.")
+        elif avg_freq > high_freq:
+            comments.append("선택된 번호들의 평균 출현 빈도가 높은 편입니다.")
+        else:
+            comments.append("출현 빈도 평균이 적절한 범위입니다.")
+
+        return comments
+
+    @staticmethod
+    def _fixed_threshold_comments(num_sum, odd_count, low_count, consecutive_count):
         comments = []
 
         if num_sum < 80:
@@ -240,12 +453,4 @@ class LottoService:
         else:
             comments.append("1~2쌍의 연속 번호가 있어 자연스러운 패턴입니다.")
 
-        avg_freq = total_freq / 6
-        if avg_freq < 110:
-            comments.append("선택된 번호들의 평균 출현 빈도가 낮은 편입니다.")
-        elif avg_freq > 140:
-            comments.append("선택된 번호들의 평균 출현 빈도가 높은 편입니다.")
-        else:
-            comments.append("출현 빈도 평균이 적절한 범위입니다.")
-
         return comments
@@ -0,0 +1,196 @@
+# services/password_hasher.py
+"""
+bcrypt 해싱/검증 전용 프로세스 풀.
+
+bcrypt 는 한 번에 100~300ms 의 CPU 를 사용하므로 Flask 요청 스레드에서 직접 실행하면
+로그인이 몰릴 때 같은 워커의 다른 요청(/lotto, /statistics 등)까지 함께 느려집니다.
+여기서는 별도 프로세스 풀에서 실행하고, 대기 중인 작업 수를 제한합니다.
+
+  - PASSWORD_HASH_WORKERS      : 해싱 프로세스 수 (0 이면 요청 스레드에서 직접 실행)
+  - PASSWORD_HASH_MAX_PENDING  : 동시에 대기/실행할 수 있는 최대 작업 수
+                                 (초과 시 PasswordHasherBusyError → 429 응답)
+  - PASSWORD_HASH_TIMEOUT      : 작업 하나의 최대 대기 시간(초)
+워커 프로세스가 비정상 종료되어 풀이 깨지면(BrokenProcessPool) 그 풀을 버리고 다음 작업에서 새로 만들며,
+깨진 풀에서 실패한 요청은 PasswordHasherBusyError(429) 로 응답합니다.
+  - BCRYPT_ROUNDS              : bcrypt cost factor. 저장된 해시의 cost 가 다르면 로그인 성공 시 다시 해싱
+"""
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+import bcrypt
+
+
+class PasswordHasherBusyError(Exception):
+    """해싱 작업 대기열이 가득 찬 경우 발생합니다. (HTTP 429 로 응답)"""
+
+
+# ---------------------------------------------------------
+# 워커 프로세스에서 실행되는 함수 (pickle 가능하도록 모듈 최상위에 정의)
+# ---------------------------------------------------------
+def _hash_password(password_bytes, rounds):
+    return bcrypt.hashpw(password_bytes, bcrypt.gensalt(rounds)).decode()
+
+
+def _check_password(password_bytes, hashed_bytes):
+    return bcrypt.checkpw(password_bytes, hashed_bytes)
+
+
+def get_hash_rounds(hashed):
+    """'$2b$12$...' 형식의 해시에서 cost factor 를 읽습니다. 형식이 다르면 None."""
+    try:
+        return int(hashed.split('$')[2])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+
+class PasswordHasher:
+    ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+    WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(max(1, (os.cpu_count() or 2) // 2))))
+    MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", str(max(1, WORKERS) * 4)))
+    TIMEOUT = float(os.getenv("PASSWORD_HASH_TIMEOUT", "10"))
+
+    _lock = threading.Lock()
+    _executor = None
+    _executor_pid = None
+    _slots = threading.BoundedSemaphore(MAX_PENDING)
+
+    # 지연 시간 측정 (최근 1000건)
+    _latencies = {'hash': deque(maxlen=1000), 'check': deque(maxlen=1000)}
+    _counters = {'hash': 0, 'check': 0, 'rejected': 0, 'rehashed': 0, 'timeouts': 0, 'pool_restarts': 0}
+
+    @classmethod
+    def _get_executor(cls):
+        pid = os.getpid()
+        if cls._executor is None or cls._executor_pid != pid:
+            with cls._lock:
+                if cls._executor is None or cls._executor_pid != pid:
+                    cls._executor = ProcessPoolExecutor(max_workers=cls.WORKERS)
+                    cls._executor_pid = pid
+        return cls._executor
+
+    @classmethod
+    def _discard_executor(cls, executor):
+        """깨진 풀을 버립니다. 다음 _get_executor() 호출에서 새 풀을 만듭니다. (이미 교체된 경우 무시)"""
+        with cls._lock:
+            if cls._executor is not executor:
+                return
+            cls._executor = None
+            cls._counters['pool_restarts'] += 1
+        executor.shutdown(wait=False)
+
+    @classmethod
+    def _submit_to_pool(cls, func, *args):
+        """
+        프로세스 풀에 작업을 제출합니다.
+        풀이 이미 깨져 있으면 새 풀로 한 번 더 제출하고, 실행 중 워커가 죽으면 완료 시점에 풀을 버립니다.
+        """
+        executor = cls._get_executor()
+        try:
+            future = executor.submit(func, *args)
+        except BrokenProcessPool:
+            cls._discard_executor(executor)
+            executor = cls._get_executor()
+            future = executor.submit(func, *args)
+
+        def _check_broken(f):
+            if not f.cancelled() and isinstance(f.exception(), BrokenProcessPool):
+                cls._discard_executor(executor)
+
+        future.add_done_callback(_check_broken)
+        return future
+
+    @classmethod
+    def _submit(cls, kind, func, *args):
+        """작업을 풀에 제출하고 Future 를 반환합니다. 대기열이 가득 차면 즉시 거절합니다."""
+        if not cls._slots.acquire(blocking=False):
+            cls._counters['rejected'] += 1
+            raise PasswordHasherBusyError("로그인 요청이 많아 잠시 후 다시 시도해 주세요.")
+
+        started = time.perf_counter()
+
+        def _done(_future):
+            cls._slots.release()
+            cls._latencies[kind].append(time.perf_counter() - started)
+            cls._counters[kind] += 1
+
+        try:
+            if cls.WORKERS <= 0:
+                # 풀 없이 요청 스레드에서 실행 (개발/디버깅용)
+                future = Future()
+                try:
+                    future.set_result(func(*args))
+                except Exception as e:
+                    future.set_exception(e)
+            else:
+                future = cls._submit_to_pool(func, *args)
+        except Exception:
+            cls._slots.release()
+            raise
+        future.add_done_callback(_done)
+        return future
+
+    @classmethod
+    def _wait(cls, future):
+        try:
+            return future.result(timeout=cls.TIMEOUT)
+        except FutureTimeoutError:
+            cls._counters['timeouts'] += 1
+            raise PasswordHasherBusyError("비밀번호 처리 시간이 초과되었습니다. 잠시 후 다시 시도해 주세요.")
+        except BrokenProcessPool:
+            # 작업 중 워커가 죽음: 풀은 완료 콜백에서 버려졌으므로 다음 요청은 새 풀에서 처리
+            raise PasswordHasherBusyError("비밀번호 처리 중 오류가 발생했습니다. 잠시 후 다시 시도해 주세요.")
+
+    # ---------------------------------------------------------
+    # 공개 API
+    # ---------------------------------------------------------
+    @classmethod
+    def hash_password(cls, password):
+        """비밀번호를 현재 cost factor 로 해싱합니다."""
+        return cls._wait(cls._submit('hash', _hash_password, password.encode(), cls.ROUNDS))
+
+    @classmethod
+    def check_password(cls, password, hashed):
+        """비밀번호가 저장된 해시와 일치하는지 확인합니다."""
+        return cls._wait(cls._submit('check', _check_password, password.encode(), hashed.encode()))
+
+    @classmethod
+    def needs_rehash(cls, hashed):
+        """저장된 해시의 cost factor 가 현재 설정과 다른지 확인합니다."""
+        return get_hash_rounds(hashed) != cls.ROUNDS
+
+    @classmethod
+    def rehash_in_background(cls, password, on_done):
+        """
+        현재 cost factor 로 다시 해싱하고, 완료되면 on_done(new_hash) 를 호출합니다.
+        로그인 응답을 기다리게 하지 않기 위해 결과를 기다리지 않습니다. (대기열이 가득 차면 다음 로그인 때 재시도)
+        """
+        try:
+            future = cls._submit('hash', _hash_password, password.encode(), cls.ROUNDS)
+        except PasswordHasherBusyError:
+            return False
+
+        def _store(f):
+            if f.exception() is None:
+                on_done(f.result())
+                cls._counters['rehashed'] += 1
+
+        future.add_done_callback(_store)
+        return True
+
+    @classmethod
+    def stats(cls):
+        """해싱/검증 지연 시간(ms) 통계와 카운터를 반환합니다."""
+        result = dict(cls._counters, rounds=cls.ROUNDS, workers=cls.WORKERS, max_pending=cls.MAX_PENDING)
+        for kind, samples in cls._latencies.items():
+            values = sorted(samples)
+            if values:
+                result[f'{kind}_ms'] = {
+                    'p50': round(values[len(values) // 2] * 1000, 1),
+                    'p95': round(values[min(len(values) - 1, int(len(values) * 0.95))] * 1000, 1),
+                    'max': round(values[-1] * 1000, 1),
+                }
+        return result
@@ -0,0 +1,203 @@
+# services/pattern_stats.py
+"""
+패턴 통계 조회 (프로세스 전역, 데이터 버전이 바뀔 때만 다시 읽음).
+
+통계 갱신 때 만들어 둔 패턴 테이블(db/lotto_pattern_stat.py)을 한 번 읽어 배열로 보관하고,
+분석 요청에서는 배열 인덱스 조회와 이진 탐색만으로 번호 조합의 위치(백분위)를 계산합니다.
+
+  - 합계/홀수 개수/저번호 개수/연속 쌍 개수: 값별 "이 값보다 작은 회차 수" 와 "같은 회차 수" 배열
+  - 번호 쌍: 46×46 동시 출현 행렬 + 990개 쌍의 정렬된 출현 횟수
+  - 세 번호: 46³ 칸 출현 횟수 배열 + 14190개 조합의 정렬된 출현 횟수 + 상위 조합 목록
+"""
+import threading
+from itertools import combinations
+from math import comb
+
+import numpy as np
+
+from db.lotto_pattern_stat import LottoPatternStatDB
+from services.cache import DataVersion
+
+PATTERN_KINDS = ('sum', 'odd', 'low', 'consecutive')
+TOP_TRIPLES = 10
+
+_MAX_VALUE = {'sum': 255, 'odd': 6, 'low': 6, 'consecutive': 5}
+
+
+def _mid_rank_percentile(sorted_values, value):
+    """정렬된 배열에서 value 의 백분위 (같은 값은 절반만 아래로 셈, 0~100)"""
+    if len(sorted_values) == 0:
+        return None
+    lo = np.searchsorted(sorted_values, value, side='left')
+    hi = np.searchsorted(sorted_values, value, side='right')
+    return float((lo + hi) / 2 / len(sorted_values) * 100)
+
+
+def _triple_index(a, b, c):
+    return (a * 46 + b) * 46 + c
+
+
+class PatternStats:
+
+    _lock = threading.Lock()
+    _version = None
+    _total_draws = 0
+    _below = {}          # kind -> ndarray, value 보다 작은 회차 수
+    _equal = {}          # kind -> ndarray, value 와 같은 회차 수
+    _pairs = np.zeros((46, 46), dtype=np.int32)
+    _pair_sorted = np.zeros(0, dtype=np.int32)
+    _triples = np.zeros(46 ** 3, dtype=np.int32)
+    _triple_sorted = np.zeros(0, dtype=np.int32)
+    _top_triples = []
+
+    @classmethod
+    def _ensure_fresh(cls):
+        version = DataVersion.current()
+        if version == cls._version:
+            return
+        with cls._lock:
+            if version == cls._version:
+                return
+            distributions = LottoPatternStatDB.get_distributions()
+            pair_rows = LottoPatternStatDB.get_pair_counts()
+            rows = LottoPatternStatDB.get_triple_counts()
+            if distributions is None or pair_rows is None or rows is None:
+                # DB 오류: 이전 배열을 유지하고 버전을 기록하지 않아 다음 요청에서 다시 시도
+                return
+
+            below, equal = {}, {}
+            for kind in PATTERN_KINDS:
+                counts = np.zeros(_MAX_VALUE[kind] + 1, dtype=np.int64)
+                for k, value, cnt in distributions:
+                    if k == kind and 0 <= value < len(counts):
+                        counts[value] = cnt
+                equal[kind] = counts
+                below[kind] = np.concatenate(([0], np.cumsum(counts)[:-1]))
+            total_draws = int(equal['sum'].sum())
+
+            pairs = np.zeros((46, 46), dtype=np.int32)
+            for a, b, cnt in pair_rows:
+                pairs[a, b] = pairs[b, a] = cnt
+            pair_values = pairs[1:, 1:][np.triu_indices(45, k=1)]
+
+            triples = np.zeros(46 ** 3, dtype=np.int32)
+            for a, b, c, cnt in rows:
+                triples[_triple_index(a, b, c)] = cnt
+            # 한 번도 나오지 않은 조합(테이블에 없는 행)은 0 으로 채워 전체 C(45,3) 개 분포를 만듦
+            triple_values = np.zeros(comb(45, 3), dtype=np.int32)
+            triple_values[:len(rows)] = [row[3] for row in rows]
+            top = sorted(rows, key=lambda row: (-row[3], row[:3]))[:TOP_TRIPLES]
+
+            cls._below, cls._equal, cls._total_draws = below, equal, total_draws
+            cls._pairs, cls._pair_sorted = pairs, np.sort(pair_values)
+            cls._triples, cls._triple_sorted = triples, np.sort(triple_values)
+            cls._top_triples = [((a, b, c), cnt) for a, b, c, cnt in top]
+            # 읽기에 성공했으면 패턴 통계가 비어 있어도(갱신 전 등) 버전을 기록하여,
+            # 요청마다 다시 조회하지 않고 통계 갱신으로 데이터 버전이 바뀔 때 다시 읽음
+            cls._version = version
+
+    @classmethod
+    def available(cls):
+        cls._ensure_fresh()
+        return cls._total_draws > 0
+
+    @classmethod
+    def total_draws(cls):
+        cls._ensure_fresh()
+        return cls._total_draws
+
+    @classmethod
+    def distribution_position(cls, kind, value):
+        """
+        과거 당첨 번호 분포에서 value 의 위치.
+        {'value', 'percentile'(하위 %), 'share'(같은 값 비율 %), 'count'(같은 값 회차 수)}
+        """
+        cls._ensure_fresh()
+        total = cls._total_draws
+        equal = cls._equal.get(kind)
+        if not total or equal is None:
+            return None
+        if not 0 <= value < len(equal):
+            below, count = (total, 0) if value >= len(equal) else (0, 0)
+        else:
+            below, count = int(cls._below[kind][value]), int(equal[value])
+        return {
+            'value': value,
+            'percentile': round((below + count / 2) / total * 100, 1),
+            'share': round(count / total * 100, 1),
+            'count': count,
+        }
+
+    @classmethod
+    def quantile(cls, kind, q):
+        """과거 당첨 번호 분포에서 하위 q (0~1) 위치의 값. 패턴 통계가 없으면 None."""
+        cls._ensure_fresh()
+        total = cls._total_draws
+        equal = cls._equal.get(kind)
+        if not total or equal is None:
+            return None
+        return int(np.searchsorted(np.cumsum(equal), q * total, side='left'))
+
+    @classmethod
+    def pair_summary(cls, numbers):
+        """번호 쌍 15개의 동시 출현 횟수 요약"""
+        cls._ensure_fresh()
+        if not cls._total_draws:
+            return None
+        pairs = [(a, b, int(cls._pairs[a, b])) for a, b in combinations(sorted(numbers), 2)]
+        mean = sum(cnt for _, _, cnt in pairs) / len(pairs)
+        strongest = max(pairs, key=lambda p: p[2])
+        weakest = min(pairs, key=lambda p: p[2])
+        return {
+            'mean': round(mean, 2),
+            # 번호 쌍 하나가 한 회차에 함께 나올 확률 = C(43,4) / C(45,6) = 1/66
+            'expected': round(cls._total_draws / 66, 2),
+            'percentile': round(_mid_rank_percentile(cls._pair_sorted, mean), 1),
+            'strongest': {'numbers': list(strongest[:2]), 'count': strongest[2]},
+            'weakest': {'numbers': list(weakest[:2]), 'count': weakest[2]},
+        }
+
+    @classmethod
+    def triple_summary(cls, numbers):
+        """세 번호 조합 20개 중 가장 자주 함께 나온 조합과 그 백분위"""
+        cls._ensure_fresh()
+        if not cls._total_draws:
+            return None
+        triples = [(t, int(cls._triples[_triple_index(*t)])) for t in combinations(sorted(numbers), 3)]
+        best, best_count = max(triples, key=lambda t: t[1])
+        top = {t for t, _ in cls._top_triples}
+        return {
+            'seen': sum(1 for _, cnt in triples if cnt > 0),
+            'best': {'numbers': list(best), 'count': best_count},
+            'best_percentile': round(_mid_rank_percentile(cls._triple_sorted, best_count), 1),
+            'in_top': [list(t) for t, _ in triples if t in top],
+        }
+
+    @classmethod
+    def analyze(cls, numbers):
+        """
+        번호 6개의 패턴 위치를 한 번에 계산합니다. 패턴 통계가 없으면 None.
+        반환: {'total_draws', 'sum', 'odd', 'low', 'consecutive', 'pairs', 'triples'}
+        """
+        cls._ensure_fresh()
+        if not cls._total_draws:
+            return None
+        numbers = sorted(int(n) for n in numbers)
+        values = {
+            'sum': sum(numbers),
+            'odd': sum(n % 2 for n in numbers),
+            'low': sum(n <= 22 for n in numbers),
+            'consecutive': sum(1 for i in range(5) if numbers[i + 1] == numbers[i] + 1),
+        }
+        result = {'total_draws': cls._total_draws}
+        for kind, value in values.items():
+            result[kind] = cls.distribution_position(kind, value)
+        result['pairs'] = cls.pair_summary(numbers)
+        result['triples'] = cls.triple_summary(numbers)
+        return result
+
+    @classmethod
+    def top_triples(cls):
+        """가장 자주 함께 나온 세 번호 조합 [((a, b, c), 횟수), ...]"""
+        cls._ensure_fresh()
+        return list(cls._top_triples)
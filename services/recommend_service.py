@@ -1,16 +1,36 @@
+import numpy as np
+
 from db.lotto_recommend import LottoRecommendDB
+from db.user_pick import UserPickDB
+from db.user_pick_mask import UserPickMaskDB
+from services.cache import cached
+from services.pattern_stats import PatternStats
+from services.stat_service import StatService
+from services.ticket_sampler import (
+    DEFAULT_ODD_COUNTS, DEFAULT_SUM_BAND, sample_tickets, score_weights
+)
+
+MAX_TICKETS = 10_000
+SUM_BAND_QUANTILES = (0.1, 0.9)   # 합계 구간: 과거 당첨 번호 합계의 하위 10% ~ 90%
 
 class RecommendService:
     @staticmethod
     def generate_recommendation(user_id):
         """
         통계 기반 추천 번호를 생성하고, user_id를 이용해 개인화 필터링을 적용합니다.
+        (추천 VIEW 는 서버 시작 시 준비되고 통계 갱신 시에만 갱신되므로, 여기서는 조회만 합니다.)
+
+        전체 45개 번호의 추천 순위(데이터 버전별 캐시)에서 사용자가 이미 고른 번호의 비트마스크
+        (user_pick_mask, 요청마다 PK 로 한 행 조회)에 해당하는 번호를 빼고 앞에서 6개를 고릅니다.
+        사용자가 저장한 번호 수와 관계없이 45칸 순회 한 번으로 끝납니다.
         """
-        # 1. 추천 점수 계산을 위한 VIEW 생성/갱신
-        LottoRecommendDB.create_recommend_view()
-        
-        # 2. VIEW를 활용하여 개인화 추천 번호 6개 가져오기
-        recommendation = LottoRecommendDB.get_recommended_numbers(user_id, limit=6) 
+        ranking = RecommendService._load_ranking()
+        mask = RecommendService.picked_mask(user_id)
+        if ranking and mask is not None:
+            recommendation = [row for row in ranking if not (mask >> (row[0] - 1)) & 1][:6]
+        else:
+            # 마스크를 쓸 수 없는 경우(트리거 마이그레이션 전, 마스크 행 없음, DB 오류 등)에는 VIEW 와 사용자 번호를 SQL 로 직접 비교
+            recommendation = LottoRecommendDB.get_recommended_numbers(user_id, limit=6)
         
         if not recommendation:
             return False, "❌ 추천 번호 생성에 실패했습니다. (통계 데이터 부족 또는 DB 오류)", []
@@ -20,11 +40,69 @@ class RecommendService:
         
         # True: 성공, numbers: 추천 번호 6개, recommendation: 상세 통계 정보
         return True, numbers, recommendation
-    
+
+    @staticmethod
+    def picked_mask(user_id):
+        """
+        사용자가 이미 고른 번호의 비트마스크 ((n - 1) 번째 비트 = 번호 n). DB 오류 시 None.
+        프로세스 캐시는 다른 워커의 저장/삭제를 알 수 없으므로 캐시하지 않습니다. (PK 조회 한 번)
+        """
+        return UserPickMaskDB.get_mask(user_id)
+
+    @staticmethod
+    @cached('recommend_ranking')
+    def _load_ranking():
+        return LottoRecommendDB.get_ranking()
+
+    @staticmethod
+    def generate_tickets(user_id, count=5, exclude=(), sum_band=None, odd_counts=DEFAULT_ODD_COUNTS, seed=None):
+        """
+        통계 기반 가중치로 서로 다른 추천 티켓을 count 장 생성합니다. (services/ticket_sampler.py)
+          - 번호 가중치: 추천 VIEW 와 같은 점수(빈도 순위 + 미출현 간격 순위)가 낮을수록 큼
+          - 사용자가 이미 저장한 번호는 가중치를 낮추고, 저장한 조합과 같은 티켓은 만들지 않음
+          - 합계 구간(sum_band) 기본값은 과거 당첨 번호 합계의 하위 10% ~ 90%
+        반환: (성공 여부, 티켓 목록 또는 오류 메시지, 생성 조건 dict)
+        """
+        if not 1 <= count <= MAX_TICKETS:
+            return False, f"❌ 티켓 수는 1~{MAX_TICKETS}장이어야 합니다.", {}
+
+        # 저장한 조합은 사용자별로 한 번만 읽어 회피 번호와 중복 제외에 함께 사용 (마스크와 같은 이유로 캐시하지 않음)
+        pick_sets = UserPickDB.get_pick_number_sets(user_id)
+        mask = RecommendService.picked_mask(user_id)
+        if mask is not None:
+            avoid = [n for n in range(1, 46) if (mask >> (n - 1)) & 1]
+        else:
+            avoid = {n for pick in pick_sets for n in pick}
+        weights = score_weights(StatService.get_all_stats(), avoid=avoid)
+        if weights is None:
+            return False, "❌ 추천 티켓 생성에 실패했습니다. (통계 데이터 부족 또는 DB 오류)", {}
+
+        if sum_band is None:
+            sum_band = RecommendService._default_sum_band()
+        rng = np.random.default_rng(seed)
+        try:
+            tickets = sample_tickets(weights, count, rng, exclude=exclude, sum_band=sum_band,
+                                     odd_counts=odd_counts,
+                                     distinct_from=pick_sets)
+        except ValueError as e:
+            return False, f"❌ {e}", {}
+
+        info = {'sum_band': list(sum_band), 'odd_counts': list(odd_counts), 'exclude': sorted(exclude)}
+        if len(tickets) == 0:
+            return False, "❌ 조건을 만족하는 티켓을 만들 수 없습니다. (제외 번호/합계 구간 확인)", info
+        return True, tickets.tolist(), info
+
+    @staticmethod
+    def _default_sum_band():
+        low, high = (PatternStats.quantile('sum', q) for q in SUM_BAND_QUANTILES)
+        if low is None or high is None:
+            return DEFAULT_SUM_BAND
+        return low, high
+
     @staticmethod
-    def create_recommend_view_only():
+    def refresh_recommend_view():
         """
-        로또 통계 갱신 후, 추천 시스템이 사용하는 DB VIEW만 갱신합니다.
+        로또 통계 갱신 후, 추천 시스템이 사용하는 DB VIEW를 갱신합니다.
+        (MATERIALIZED VIEW 모드에서는 REFRESH ... CONCURRENTLY 로 조회를 막지 않고 갱신)
         """
-        LottoRecommendDB.create_recommend_view()
-        return True
\ No newline at end of file
+        return LottoRecommendDB.refresh_recommend_view()
@@ -0,0 +1,23 @@
+import os
+
+from db.pick_reconcile import PickReconcileDB
+
+RECONCILE_BATCH_SIZE = int(os.getenv("RECONCILE_BATCH_SIZE", "10000"))
+
+
+class ReconcileService:
+    @staticmethod
+    def reconcile_picks(batch_size=None, max_batches=None):
+        """
+        [저장 번호 당첨 결과 정산]
+        새 회차 적재(또는 통계 갱신) 후 호출하여, 아직 정산되지 않은 저장 번호의 등수를 계산해 둡니다.
+        /my-picks 는 정산된 결과(user_pick.ranking 등)를 그대로 읽습니다.
+        반환: (성공 여부, 요약 dict 또는 오류 메시지)
+        """
+        return PickReconcileDB.reconcile(batch_size or RECONCILE_BATCH_SIZE, max_batches=max_batches)
+
+    @staticmethod
+    def describe(summary):
+        """정산 요약을 한 줄 메시지로 변환합니다."""
+        return (f"저장 번호 {summary['reconciled']:,}개 정산 "
+                f"(확인 {summary['scanned']:,}개, 배치 {summary['batches']}회, 회차 대기 {summary['pending']:,}개)")
@@ -0,0 +1,205 @@
+# services/result_store.py
+"""
+서버 측 분석 결과 저장소.
+
+/check_pick 의 PRG(POST → Redirect → GET) 과정에서 분석 결과를 쿠키 세션에 직접 넣으면
+이후 모든 요청(정적 파일 포함)이 커다란 서명 쿠키를 주고받게 됩니다.
+결과는 서버에 저장하고, 세션에는 짧은 토큰만 남깁니다.
+
+  - ANALYSIS_STORE_BACKEND     : 'memory' (기본, 프로세스 내 LRU) 또는 'sqlite' (로컬 디스크)
+                                 gunicorn 등으로 여러 워커 프로세스를 띄우는 경우 'sqlite' 를 사용해야
+                                 리다이렉트된 요청이 다른 워커로 가도 결과를 찾을 수 있습니다.
+  - ANALYSIS_STORE_PATH        : sqlite 파일 경로 (기본: 프로젝트의 instance/lotto_analysis.sqlite3)
+                                 결과는 JSON 으로 저장하므로 파일 내용이 코드로 실행되지는 않지만,
+                                 다른 사용자가 쓸 수 있는 디렉터리(/tmp 등)는 피해야 합니다.
+  - ANALYSIS_STORE_TTL         : 결과 보관 시간(초)
+  - ANALYSIS_STORE_MAX_ENTRIES : 최대 보관 개수 (초과 시 오래된 항목부터 삭제)
+
+사용 예:
+
+    token = result_store.put(result, owner=user_id)
+    session['analysis_token'] = token
+    ...
+    result = result_store.pop(session.pop('analysis_token', None), owner=user_id)
+"""
+import json
+import os
+import re
+import secrets
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from decimal import Decimal
+
+# 기본 sqlite 파일 위치 (앱 전용 디렉터리, 소유자만 접근 가능하게 생성)
+DEFAULT_STORE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'instance')
+
+_INT_KEY = re.compile(r'-?\d+')
+
+
+def _json_default(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    if hasattr(value, 'item'):
+        # numpy 스칼라
+        return value.item()
+    raise TypeError(f"JSON 으로 변환할 수 없는 값입니다: {type(value).__name__}")
+
+
+def _restore_int_keys(obj):
+    """JSON 은 dict 키를 문자열로 바꾸므로, 등수처럼 정수였던 키({1: .., 0: ..})를 다시 정수로 바꿉니다."""
+    return {int(k) if _INT_KEY.fullmatch(k) else k: v for k, v in obj.items()}
+
+
+def dumps_result(value):
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':'), default=_json_default)
+
+
+def loads_result(payload):
+    return json.loads(payload, object_hook=_restore_int_keys)
+
+
+class MemoryResultBackend:
+    """프로세스 내 TTL + LRU 저장소"""
+
+    def __init__(self, max_entries=1000, ttl=600):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data = OrderedDict()   # token -> (만료 시각, owner, 값)
+        self._lock = threading.Lock()
+
+    def put(self, token, owner, value):
+        expires_at = time.time() + self.ttl
+        with self._lock:
+            self._data[token] = (expires_at, owner, value)
+            self._data.move_to_end(token)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def pop(self, token, owner):
+        with self._lock:
+            entry = self._data.pop(token, None)
+        if entry is None or entry[0] < time.time() or entry[1] != owner:
+            return None
+        return entry[2]
+
+    def count(self):
+        with self._lock:
+            return len(self._data)
+
+
+class SQLiteResultBackend:
+    """로컬 SQLite 파일 저장소 (같은 서버의 여러 워커 프로세스가 공유)"""
+
+    def __init__(self, path, max_entries=1000, ttl=600):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._local = threading.local()
+        conn = self._connect()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS analysis_result (
+                token TEXT PRIMARY KEY,
+                owner TEXT,
+                expires_at REAL NOT NULL,
+                payload TEXT NOT NULL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_analysis_result_expires ON analysis_result (expires_at)")
+
+    def _connect(self):
+        # sqlite3 연결은 스레드 간에 공유하지 않으므로 스레드마다 하나씩 엽니다.
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or getattr(self._local, 'pid', None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def put(self, token, owner, value):
+        conn = self._connect()
+        now = time.time()
+        conn.execute(
+            "INSERT OR REPLACE INTO analysis_result (token, owner, expires_at, payload) VALUES (?, ?, ?, ?)",
+            (token, str(owner), now + self.ttl, dumps_result(value))
+        )
+        # 만료 항목과 개수 초과분 정리 (만료 시각이 빠른 순서 = 오래된 순서)
+        conn.execute("DELETE FROM analysis_result WHERE expires_at < ?", (now,))
+        conn.execute("""
+            DELETE FROM analysis_result WHERE token IN (
+                SELECT token FROM analysis_result ORDER BY expires_at DESC LIMIT -1 OFFSET ?
+            )
+        """, (self.max_entries,))
+
+    def pop(self, token, owner):
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT owner, expires_at, payload FROM analysis_result WHERE token = ?", (token,)
+            ).fetchone()
+            if row is not None:
+                conn.execute("DELETE FROM analysis_result WHERE token = ?", (token,))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        if row is None or row[1] < time.time() or row[0] != str(owner):
+            return None
+        try:
+            return loads_result(row[2])
+        except (TypeError, ValueError):
+            # 이전 형식(pickle) 이나 손상된 값은 읽지 않고 버립니다.
+            return None
+
+    def count(self):
+        return self._connect().execute("SELECT COUNT(*) FROM analysis_result").fetchone()[0]
+
+
+class ResultStore:
+    """토큰 발급 + 백엔드 위임. 백엔드 오류는 분석 결과 유실로만 처리합니다."""
+
+    def __init__(self, backend):
+        self.backend = backend
+
+    def put(self, value, owner=None):
+        """결과를 저장하고 토큰을 반환합니다. 저장에 실패하면 None."""
+        token = secrets.token_urlsafe(16)
+        try:
+            self.backend.put(token, owner, value)
+        except Exception as e:
+            print("ResultStore Error (put):", e)
+            return None
+        return token
+
+    def pop(self, token, owner=None):
+        """토큰의 결과를 꺼내고 삭제합니다. 없거나 만료되었거나 다른 사용자의 결과면 None."""
+        if not token:
+            return None
+        try:
+            return self.backend.pop(token, owner)
+        except Exception as e:
+            print("ResultStore Error (pop):", e)
+            return None
+
+
+def create_result_store():
+    max_entries = int(os.getenv("ANALYSIS_STORE_MAX_ENTRIES", "1000"))
+    ttl = float(os.getenv("ANALYSIS_STORE_TTL", "600"))
+    backend_name = os.getenv("ANALYSIS_STORE_BACKEND", "memory").lower()
+
+    if backend_name == "sqlite":
+        path = os.getenv("ANALYSIS_STORE_PATH")
+        if not path:
+            os.makedirs(DEFAULT_STORE_DIR, mode=0o700, exist_ok=True)
+            path = os.path.join(DEFAULT_STORE_DIR, "lotto_analysis.sqlite3")
+        return ResultStore(SQLiteResultBackend(path, max_entries=max_entries, ttl=ttl))
+    if backend_name != "memory":
+        print(f"⚠️ 알 수 없는 ANALYSIS_STORE_BACKEND '{backend_name}' → memory 사용")
+    return ResultStore(MemoryResultBackend(max_entries=max_entries, ttl=ttl))
+
+
+result_store = create_result_store()
@@ -0,0 +1,236 @@
+# services/simulation.py
+"""
+번호 선택 전략 몬테카를로 시뮬레이션.
+
+추천 순위(v_lotto_recommend_score)나 분석 코멘트의 "이상적인 조합" 기준이
+무작위 선택보다 나은지 확인하기 위해, 전략별로 티켓을 만들어 추첨과 비교하고 등수 분포를 집계합니다.
+
+  전략 (strategy)
+    - 'random'       : 45개 중 6개를 균등하게 무작위 선택
+    - 'heuristic'    : 무작위 선택 중 분석 코멘트 기준(총합 100~170, 홀짝/저고 3:3 또는 4:2,
+                       연속 번호 1~2쌍)을 만족하는 조합만 사용
+    - 'fixed'        : 주어진 티켓 목록(추천 번호, 사용자의 과거 선택 등)에서 균등하게 선택
+  대상 (target)
+    - 'synthetic'    : 티켓마다 새로운 가상 추첨(6개 + 보너스)을 생성
+    - 'history'      : 티켓마다 과거 회차 하나를 균등하게 선택
+
+전체 티켓 수를 shard_size 단위로 나누어 프로세스 풀에서 실행합니다.
+각 샤드는 SeedSequence.spawn 으로 만든 독립 시드를 사용하므로 워커 수와 관계없이 결과가 재현됩니다.
+"""
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from math import comb
+
+import numpy as np
+
+from services.draw_store import NUMBER_COUNT, RANKS, _MATCH_RANK, picks_to_masks, popcount64, rank_histograms
+from services.stat_service import sql_rank_desc
+
+STRATEGIES = ('random', 'heuristic', 'fixed')
+TARGETS = ('synthetic', 'history')
+
+# 티켓 1장이 무작위 추첨에서 각 등수에 당첨될 이론 확률
+_TOTAL = comb(45, 6)
+BASELINE_PROBABILITY = {
+    1: 1 / _TOTAL,
+    2: 6 / _TOTAL,
+    3: 6 * 38 / _TOTAL,
+    4: comb(6, 4) * comb(39, 2) / _TOTAL,
+    5: comb(6, 3) * comb(39, 3) / _TOTAL,
+}
+BASELINE_PROBABILITY[0] = 1 - sum(BASELINE_PROBABILITY.values())
+
+_BITS = np.left_shift(np.uint64(1), np.arange(NUMBER_COUNT, dtype=np.uint64))
+
+
+# ---------------------------------------------------------
+# 추천 순위 (v_lotto_recommend_score 와 같은 규칙을 메모리에서 계산)
+# ---------------------------------------------------------
+def recommend_order(frequency, last_draw_gap, excluded=None):
+    """
+    번호 1~45 의 추천 순서를 반환합니다. (numpy 배열, 번호 값)
+    total_score = RANK(frequency DESC) + RANK(last_draw_gap DESC), total_score ASC → frequency DESC → 번호 ASC
+    frequency / last_draw_gap 은 번호 1~45 순서의 길이 45 배열(또는 시점별 S×45 행렬)이며,
+    last_draw_gap 의 NaN 은 NULL 을 뜻합니다. excluded(같은 모양의 bool) 인 번호는 맨 뒤로 보냅니다.
+    """
+    frequency = np.asarray(frequency, dtype=np.float64)
+    total_score = sql_rank_desc(frequency) + sql_rank_desc(last_draw_gap)
+    if excluded is not None:
+        total_score = np.where(excluded, np.iinfo(np.int32).max, total_score)
+    numbers = np.broadcast_to(np.arange(1, NUMBER_COUNT + 1), frequency.shape)
+    return np.lexsort((numbers, -frequency, total_score), axis=-1) + 1
+
+
+def recommend_ticket(stats, exclude=()):
+    """
+    StatService.get_all_stats() 결과로 추천 번호 6개를 만듭니다. (exclude 의 번호는 제외)
+    통계가 45개 번호를 모두 포함하지 않으면 빈 목록을 반환합니다.
+    """
+    by_number = {s['number']: s for s in stats}
+    if len(by_number) != NUMBER_COUNT:
+        return []
+    frequency = [by_number[n]['frequency'] for n in range(1, NUMBER_COUNT + 1)]
+    gaps = [np.nan if by_number[n]['last_draw_gap'] is None else by_number[n]['last_draw_gap']
+            for n in range(1, NUMBER_COUNT + 1)]
+    excluded = set(exclude)
+    return sorted([int(n) for n in recommend_order(frequency, gaps) if n not in excluded][:6])
+
+
+# ---------------------------------------------------------
+# 벡터화된 티켓/추첨 생성
+# ---------------------------------------------------------
+def _random_indices(rng, n, k):
+    """n 행 × k 개의 서로 다른 0~44 인덱스 (각 행은 균등한 무작위 부분집합, 정렬되지 않음)"""
+    keys = rng.random((n, NUMBER_COUNT), dtype=np.float32)
+    return np.argpartition(keys, k - 1, axis=1)[:, :k]
+
+
+def _indices_to_masks(indices):
+    return _BITS[indices].sum(axis=1, dtype=np.uint64)
+
+
+def _heuristic_accept(indices):
+    """분석 코멘트의 "일반적/이상적" 기준을 모두 만족하는 행인지 반환합니다."""
+    numbers = np.sort(indices, axis=1) + 1
+    num_sum = numbers.sum(axis=1)
+    odd_count = (numbers % 2 == 1).sum(axis=1)
+    low_count = (numbers <= 22).sum(axis=1)
+    consecutive = (np.diff(numbers, axis=1) == 1).sum(axis=1)
+    return ((num_sum >= 100) & (num_sum <= 170)
+            & (odd_count >= 2) & (odd_count <= 4)
+            & (low_count >= 2) & (low_count <= 4)
+            & (consecutive >= 1) & (consecutive <= 2))
+
+
+def generate_tickets(rng, strategy, n, fixed_masks=None):
+    """전략에 따라 n 장의 티켓 비트마스크(uint64 배열)를 생성합니다."""
+    if strategy == 'random':
+        return _indices_to_masks(_random_indices(rng, n, 6))
+    if strategy == 'heuristic':
+        parts, remaining = [], n
+        while remaining > 0:
+            # 기준을 만족하는 비율이 약 1/3 이므로 넉넉하게 만들어 한 번에 거른다
+            indices = _random_indices(rng, max(remaining * 3, 1024), 6)
+            accepted = indices[_heuristic_accept(indices)][:remaining]
+            parts.append(_indices_to_masks(accepted))
+            remaining -= len(accepted)
+        return np.concatenate(parts)
+    if strategy == 'fixed':
+        return fixed_masks[rng.integers(0, len(fixed_masks), size=n)]
+    raise ValueError(f"알 수 없는 전략입니다: {strategy}")
+
+
+def generate_draws(rng, n):
+    """n 회의 가상 추첨 (당첨번호 마스크, 보너스 마스크)"""
+    indices = _random_indices(rng, n, 7)
+    return _indices_to_masks(indices[:, :6]), _BITS[indices[:, 6]]
+
+
+def pairwise_ranks(ticket_masks, draw_masks, bonus_masks):
+    """티켓 i 와 추첨 i 를 짝지어 등수 배열을 계산합니다. (행렬이 아닌 1:1 비교)"""
+    matches = popcount64(ticket_masks & draw_masks)
+    ranks = _MATCH_RANK[matches]
+    second = (matches == 5) & ((ticket_masks & bonus_masks) != 0)
+    ranks[second] = 2
+    return ranks
+
+
+# ---------------------------------------------------------
+# 샤드 실행 (워커 프로세스)
+# ---------------------------------------------------------
+def _run_shard(task):
+    """
+    task = (strategy, target, n, seed_sequence, fixed_masks, history_masks, history_bonus_masks, chunk_size)
+    반환: 등수별 개수 (길이 6, 인덱스 = 등수, 0 = 낙첨)
+    """
+    strategy, target, n, seed_sequence, fixed_masks, history_masks, history_bonus_masks, chunk_size = task
+    rng = np.random.default_rng(seed_sequence)
+    counts = np.zeros(6, dtype=np.int64)
+    for start in range(0, n, chunk_size):
+        size = min(chunk_size, n - start)
+        tickets = generate_tickets(rng, strategy, size, fixed_masks)
+        if target == 'synthetic':
+            draws, bonuses = generate_draws(rng, size)
+        else:
+            picked = rng.integers(0, len(history_masks), size=size)
+            draws, bonuses = history_masks[picked], history_bonus_masks[picked]
+        counts += np.bincount(pairwise_ranks(tickets, draws, bonuses), minlength=6)
+    return counts
+
+
+def _summarize(counts, total):
+    result = {'counts': {}, 'rates': {}, 'lift': {}}
+    for rank in RANKS:
+        count = int(counts[rank])
+        rate = count / total if total else 0.0
+        result['counts'][rank] = count
+        result['rates'][rank] = rate
+        # 이론 확률 대비 배율 (1.0 이면 무작위와 같음)
+        result['lift'][rank] = rate / BASELINE_PROBABILITY[rank]
+    return result
+
+
+def simulate(strategy, n_tickets, target='synthetic', tickets=None, history=None,
+             seed=None, workers=None, shard_size=1_000_000, chunk_size=250_000):
+    """
+    전략 하나를 n_tickets 장 시뮬레이션하고 등수 분포를 반환합니다.
+
+    tickets : strategy='fixed' 일 때 사용할 번호 목록 [[n1..n6], ...]
+    history : target='history' 일 때 사용할 (masks, bonus_masks)  (DrawStore.snapshot() 의 뒤 두 값)
+    workers : 프로세스 수 (None 이면 CPU 수, 1 이면 현재 프로세스에서 실행)
+    """
+    if strategy not in STRATEGIES:
+        raise ValueError(f"알 수 없는 전략입니다: {strategy}")
+    if target not in TARGETS:
+        raise ValueError(f"알 수 없는 대상입니다: {target}")
+
+    fixed_masks = None
+    if strategy == 'fixed':
+        fixed_masks = picks_to_masks(tickets or [])
+        if not len(fixed_masks):
+            raise ValueError("fixed 전략에는 티켓이 1장 이상 필요합니다.")
+
+    history_masks = history_bonus_masks = None
+    if target == 'history':
+        if history is None or not len(history[0]):
+            raise ValueError("history 대상에는 과거 당첨 데이터가 필요합니다.")
+        history_masks, history_bonus_masks = history
+
+    started = time.perf_counter()
+    shard_sizes = [min(shard_size, n_tickets - start) for start in range(0, n_tickets, shard_size)]
+    root_seed = np.random.SeedSequence(seed)
+    seeds = root_seed.spawn(len(shard_sizes))
+    tasks = [
+        (strategy, target, size, child, fixed_masks, history_masks, history_bonus_masks, chunk_size)
+        for size, child in zip(shard_sizes, seeds)
+    ]
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(tasks) <= 1:
+        results = [_run_shard(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as executor:
+            results = list(executor.map(_run_shard, tasks))
+
+    counts = np.sum(results, axis=0) if results else np.zeros(6, dtype=np.int64)
+    elapsed = time.perf_counter() - started
+
+    # seed 를 주지 않은 경우에도 같은 결과를 다시 만들 수 있도록 실제 사용한 엔트로피를 기록
+    summary = {'strategy': strategy, 'target': target, 'tickets': n_tickets, 'seed': root_seed.entropy}
+    summary.update(_summarize(counts, n_tickets))
+    summary['seconds'] = elapsed
+    summary['tickets_per_sec'] = n_tickets / elapsed if elapsed > 0 else 0.0
+    return summary
+
+
+def replay_history(tickets, masks, bonus_masks):
+    """
+    티켓 목록을 과거 모든 회차와 비교한 정확한 등수 분포를 반환합니다. (무작위 표본 없이 티켓 × 회차 전체)
+    """
+    ticket_masks = picks_to_masks(tickets)
+    total = len(ticket_masks) * len(masks)
+    counts = rank_histograms(ticket_masks, masks, bonus_masks).sum(axis=0) if total else np.zeros(6, dtype=np.int64)
+    summary = {'strategy': 'replay', 'target': 'history', 'tickets': total}
+    summary.update(_summarize(counts, total))
+    return summary
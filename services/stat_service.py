@@ -1,24 +1,136 @@
+import threading
+
+import numpy as np
+
 from db.lotto_stat import LottoStatDB
+from services.cache import cached, DataVersion
+
+
+def sql_rank_desc(values):
+    """
+    PostgreSQL 의 RANK() OVER (ORDER BY value DESC) 와 같은 순위를 계산합니다. (마지막 축 기준)
+    NULL(None/NaN) 은 DESC 정렬에서 가장 앞에 오므로 1위입니다.
+    추천 VIEW 의 점수(빈도 순위 + 미출현 간격 순위)를 메모리에서 다시 계산할 때 사용합니다. (시뮬레이션, 티켓 생성)
+    """
+    values = np.asarray(values, dtype=np.float64)
+    key = np.where(np.isnan(values), np.inf, values)
+    # 나보다 큰 값의 개수 + 1 (동점은 같은 순위, 다음 순위는 건너뜀)
+    return (key[..., None, :] > key[..., :, None]).sum(axis=-1) + 1
+
 
 class StatService:
+    UPDATE_MODES = ('incremental', 'full', 'verify')
+
     @staticmethod
-    def update_statistics():
+    def update_statistics(mode='incremental'):
         """
         [로또 통계 갱신]
-        실제 DB의 통계 계산 및 갱신(TRUNCATE + INSERT)을 LottoStatDB에 위임합니다.
+        실제 DB의 통계 계산 및 갱신을 LottoStatDB에 위임합니다.
+        - incremental: 마지막 갱신 이후 추가된 회차만 반영 (기본값)
+        - full: 전체 이력으로 재계산
+        - verify: 전체 재계산 결과와 비교 후, 다르면 교정
         
         *서비스 계층에서는 DB 연결(connection) 및 트랜잭션(commit/rollback)을 직접 처리하지 않습니다.*
         """
         # LottoStatDB의 트랜잭션 함수 호출 (DB 계층에 위임)
-        success, msg = LottoStatDB.update_statistics_transaction()
+        success, msg = LottoStatDB.update_statistics_transaction(mode)
+        if success:
+            # 이 프로세스의 캐시(통계/추천 등)를 즉시 무효화 (다른 프로세스는 DB 데이터 버전으로 감지)
+            DataVersion.bump()
         return success, msg
     
     @staticmethod
     def get_all_stats():
         """
         [로또 통계 조회]
-        로또 통계 데이터를 DB에서 조회하여 반환합니다. 
+        로또 통계 데이터를 조회하여 반환합니다. (데이터 버전 기반 캐시 사용)
         이 메서드가 app.py에서 호출되어 AttributeError를 해결합니다.
         """
+        # 캐시된 목록은 여러 요청이 공유하므로, 호출한 쪽에서 정렬할 수 있도록 복사본을 반환합니다.
+        # (DB 오류(None)는 캐시되지 않고 빈 목록으로 반환)
+        return list(StatService._load_all_stats() or [])
+
+    @staticmethod
+    def sort_stats(stats, sort_by='frequency', sort_order='desc'):
+        """
+        통계 목록을 제자리 정렬합니다. (통계 페이지용)
+        잘못된 정렬 기준이면 출현 횟수 내림차순으로 정렬하고 False 를 반환합니다.
+        """
+        reverse_flag = sort_order == 'desc'
+        try:
+            # last_draw_gap에 None이 있을 경우, -1로 처리하여 가장 낮은 값으로 둡니다.
+            if sort_by == 'last_draw_gap':
+                stats.sort(key=lambda x: x.get(sort_by) if x.get(sort_by) is not None else -1, reverse=reverse_flag)
+            else:
+                # frequency나 number는 None이 없으므로 단순 키 정렬
+                stats.sort(key=lambda x: x[sort_by], reverse=reverse_flag)
+            return True
+        except KeyError:
+            # 잘못된 정렬 기준이 들어왔을 경우 기본값(frequency 내림차순)으로 재정렬
+            stats.sort(key=lambda x: x['frequency'], reverse=True)
+            return False
+
+    @staticmethod
+    @cached('stats')
+    def _load_all_stats():
         # LottoStatDB의 조회 메서드를 호출
-        return LottoStatDB.get_all_stats()
\ No newline at end of file
+        return LottoStatDB.get_all_stats()
+
+
+class StatLookup:
+    """
+    번호별 통계를 번호(1~45)로 바로 찾을 수 있는 45칸 배열로 보관합니다. (프로세스 전역)
+    lotto_stat 을 한 번 읽어 배열을 만들고, 데이터 버전(통계 갱신/데이터 적재 시 증가)이
+    바뀐 경우에만 다시 만듭니다. 분석 요청에서는 배열 인덱스 조회만 수행합니다.
+    """
+
+    _lock = threading.Lock()
+    _version = None
+    _frequency = [0] * 46        # 인덱스 = 번호 (0번 칸은 사용하지 않음)
+    _last_draw_gap = [None] * 46
+    _mean_frequency = 0.0
+
+    @classmethod
+    def _ensure_fresh(cls):
+        version = DataVersion.current()
+        if version == cls._version:
+            return
+        with cls._lock:
+            if version == cls._version:
+                return
+            stats = StatService._load_all_stats()
+            if stats is None:
+                # DB 오류: 이전 배열을 유지하고 버전을 기록하지 않아 다음 요청에서 다시 시도
+                return
+            frequency = [0] * 46
+            last_draw_gap = [None] * 46
+            for s in stats:
+                number = s['number']
+                if 1 <= number <= 45:
+                    frequency[number] = s['frequency'] or 0
+                    last_draw_gap[number] = s['last_draw_gap']
+            cls._frequency = frequency
+            cls._last_draw_gap = last_draw_gap
+            cls._mean_frequency = sum(frequency) / 45
+            # 읽기에 성공했으면 통계가 비어 있어도 버전을 기록하여, 데이터 버전이 바뀔 때만 다시 읽음
+            cls._version = version
+
+    @classmethod
+    def get_stat_for_numbers(cls, numbers):
+        """번호 목록의 통계를 [{'number', 'frequency', 'last_draw_gap'}, ...] 로 반환합니다."""
+        cls._ensure_fresh()
+        frequency, last_draw_gap = cls._frequency, cls._last_draw_gap
+        return [
+            {
+                "number": n,
+                "frequency": frequency[n],
+                "last_draw_gap": last_draw_gap[n]
+            }
+            for n in numbers
+        ]
+
+    @classmethod
+    def mean_frequency(cls):
+        """45개 번호의 평균 출현 횟수"""
+        cls._ensure_fresh()
+        return cls._mean_frequency
@@ -0,0 +1,139 @@
+# services/ticket_sampler.py
+"""
+가중치 기반 추천 티켓 생성기 (벡터화).
+
+번호별 가중치 w_n (통계의 추천 점수에서 계산) 에 비례하여 6개를 비복원 추출한 티켓을
+한 번에 수천~수만 장 만들고, 조건(합계 구간, 홀수 개수, 저번호 개수)을 행렬 연산으로 걸러냅니다.
+
+  - 비복원 가중 추출: 번호마다 E ~ Exp(1) 을 뽑아 E / w 가 가장 작은 6개를 고르면
+                      "w 에 비례해 하나씩 뽑고 빼는" 추출과 같은 분포가 됩니다. (exponential race / Gumbel-top-k)
+                      N×45 난수 행렬 + argpartition 한 번으로 N 장을 만듭니다.
+  - 제외 번호      : 난수 행렬의 열에서 아예 빼므로 선택되지 않고, 남은 번호가 적을수록 빨라짐
+  - 조건           : 통과 비율을 보고 다음 배치 크기를 정하는 벡터화 기각 샘플링
+  - 중복 제거      : 조합 번호(combination_ranks) 기준, 먼저 나온 티켓을 유지
+
+    rng = np.random.default_rng()
+    weights = score_weights(stats)
+    tickets = sample_tickets(weights, 10_000, rng, sum_band=(100, 170), odd_counts=(2, 3, 4))
+"""
+import numpy as np
+
+from services.combination_index import combination_ranks
+from services.draw_store import NUMBER_COUNT
+from services.stat_service import sql_rank_desc
+
+PICK_COUNT = 6
+
+DEFAULT_TEMPERATURE = 25.0      # 추천 점수 차이가 이만큼이면 가중치가 e 배 차이
+DEFAULT_AVOID_FACTOR = 0.2      # 회피 번호(사용자가 이미 고른 번호)의 가중치 배율
+DEFAULT_SUM_BAND = (100, 170)   # 패턴 통계가 없을 때의 합계 구간 (분석 코멘트의 일반적 범위)
+DEFAULT_ODD_COUNTS = (2, 3, 4)
+
+MAX_BATCH = 100_000             # 한 번에 만드는 후보 수 상한 (N×45 float32 ≈ 18MB)
+
+
+def score_weights(stats, temperature=DEFAULT_TEMPERATURE, avoid=(), avoid_factor=DEFAULT_AVOID_FACTOR):
+    """
+    StatService.get_all_stats() 결과로 번호 1~45 의 가중치(길이 45 배열)를 만듭니다.
+    total_score = RANK(frequency DESC) + RANK(last_draw_gap DESC) (추천 VIEW 와 같은 규칙, 낮을수록 좋음)
+    w = exp(-(total_score - 최소 점수) / temperature), avoid 의 번호는 avoid_factor 배
+    통계가 45개 번호를 모두 포함하지 않으면 None.
+    """
+    by_number = {s['number']: s for s in stats}
+    if len(by_number) != NUMBER_COUNT:
+        return None
+    frequency = [by_number[n]['frequency'] or 0 for n in range(1, NUMBER_COUNT + 1)]
+    gaps = [np.nan if by_number[n]['last_draw_gap'] is None else by_number[n]['last_draw_gap']
+            for n in range(1, NUMBER_COUNT + 1)]
+    total_score = sql_rank_desc(frequency) + sql_rank_desc(gaps)
+    weights = np.exp(-(total_score - total_score.min()) / max(float(temperature), 1e-6))
+    for n in avoid:
+        if 1 <= n <= NUMBER_COUNT:
+            weights[n - 1] *= avoid_factor
+    return weights
+
+
+def constraint_mask(numbers, sum_band=None, odd_counts=None, low_counts=None):
+    """N×6 정렬된 번호 행렬 중 조건을 모두 만족하는 행 (bool 배열)"""
+    ok = np.ones(len(numbers), dtype=bool)
+    if sum_band is not None:
+        total = numbers.sum(axis=1)
+        ok &= (total >= sum_band[0]) & (total <= sum_band[1])
+    if odd_counts is not None:
+        ok &= np.isin((numbers & 1).sum(axis=1), odd_counts)
+    if low_counts is not None:
+        ok &= np.isin((numbers <= 22).sum(axis=1), low_counts)
+    return ok
+
+
+def _weighted_rows(numbers, inverse_weights, rng, n):
+    """
+    가중 비복원 추출로 n 장의 티켓(정렬된 N×6 번호 행렬)을 만듭니다.
+    numbers 는 후보 번호(오름차순), key = E × (1 / w) 가 가장 작은 6개를 고름 (E ~ Exp(1))
+    """
+    keys = rng.standard_exponential((n, len(numbers)), dtype=np.float32)
+    keys *= inverse_weights
+    picked = np.argpartition(keys, PICK_COUNT - 1, axis=1)[:, :PICK_COUNT]
+    picked.sort(axis=1)
+    return numbers[picked]
+
+
+def _sum_reachable(numbers, sum_band):
+    """후보 번호로 만들 수 있는 합계 범위가 sum_band 와 겹치는지"""
+    return sum_band is None or (numbers[:PICK_COUNT].sum() <= sum_band[1]
+                                and numbers[-PICK_COUNT:].sum() >= sum_band[0])
+
+
+def sample_tickets(weights, count, rng, exclude=(), sum_band=None, odd_counts=None, low_counts=None,
+                   distinct_from=(), max_rounds=20):
+    """
+    서로 다른 티켓 최대 count 장을 만들어 (K×6 int 행렬, 정렬) 로 반환합니다.
+
+    weights       : 번호 1~45 의 가중치 (score_weights)
+    exclude       : 절대 포함하지 않을 번호
+    sum_band      : (최소, 최대) 합계, odd_counts / low_counts : 허용하는 홀수 / 저번호(1~22) 개수
+    distinct_from : 결과에서 뺄 조합(번호 6개 목록들, 예: 사용자가 이미 저장한 번호)
+    max_rounds    : 조건이 너무 좁아 count 장을 채우지 못하면 이 횟수만큼 시도한 뒤 만든 만큼만 반환
+    조건을 만족할 수 없는 경우(제외 후 남은 번호가 6개 미만)에는 ValueError.
+    """
+    weights = np.asarray(weights, dtype=np.float64).copy()
+    for n in exclude:
+        if 1 <= n <= NUMBER_COUNT:
+            weights[n - 1] = 0.0
+    allowed = np.flatnonzero(weights > 0)
+    if len(allowed) < PICK_COUNT:
+        raise ValueError("제외 후 남은 번호가 6개 미만입니다.")
+    numbers_pool = allowed + 1
+    inverse_weights = (1.0 / weights[allowed]).astype(np.float32)
+    if not _sum_reachable(numbers_pool, sum_band):
+        return np.zeros((0, PICK_COUNT), dtype=np.int64)
+
+    seen = combination_ranks(distinct_from) if len(distinct_from) else np.zeros(0, dtype=np.int64)
+    parts, have = [], 0
+    accept_rate = 0.5
+    for _ in range(max_rounds):
+        remaining = count - have
+        if remaining <= 0:
+            break
+        # 통과 비율로 필요한 후보 수를 추정하고 여유분(30%)을 더해 한 번에 생성
+        batch = int(min(MAX_BATCH, max(256, remaining / max(accept_rate, 0.01) * 1.3)))
+        numbers = _weighted_rows(numbers_pool, inverse_weights, rng, batch)
+        numbers = numbers[constraint_mask(numbers, sum_band, odd_counts, low_counts)]
+        if not len(numbers) and batch == MAX_BATCH:
+            break                                       # 사실상 만족할 수 없는 조건
+        accept_rate = max(len(numbers) / batch, 0.001)
+
+        ranks = combination_ranks(numbers)
+        _, first = np.unique(ranks, return_index=True)
+        first.sort()                                    # 생성 순서 유지
+        fresh = first[~np.isin(ranks[first], seen)][:remaining]
+        if len(fresh):
+            parts.append(numbers[fresh])
+            seen = np.concatenate((seen, ranks[fresh]))
+            have += len(fresh)
+        # 중복만 나오는 경우도 통과 비율에 반영
+        accept_rate = max(accept_rate * (len(fresh) / max(len(first), 1)), 0.001)
+
+    if not parts:
+        return np.zeros((0, PICK_COUNT), dtype=np.int64)
+    return np.concatenate(parts).astype(np.int64)
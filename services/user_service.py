@@ -1,5 +1,5 @@
-import bcrypt
 from db.user_account import UserAccountDB
+from services.password_hasher import PasswordHasher
 
 class UserService:
     @staticmethod
@@ -9,8 +9,8 @@ class UserService:
         if existing:
             return False, "❌ 이미 존재하는 사용자입니다."
 
-        # 비밀번호 해시 생성
-        password_hash = bcrypt.hashpw(password.encode(), bcrypt.gensalt()).decode()
+        # 비밀번호 해시 생성 (bcrypt 는 별도 프로세스 풀에서 실행. 대기열이 가득 차면 PasswordHasherBusyError)
+        password_hash = PasswordHasher.hash_password(password)
 
         # DB 삽입
         created = UserAccountDB.create_user(username, password_hash)
@@ -29,8 +29,14 @@ class UserService:
 
         user_id, uname, stored_password_hash, status = user_tuple # 튜플 언패킹
         
-        # 비밀번호 검증
-        if bcrypt.checkpw(password.encode(), stored_password_hash.encode()):
+        # 비밀번호 검증 (별도 프로세스 풀에서 실행)
+        if PasswordHasher.check_password(password, stored_password_hash):
+            # 저장된 해시의 cost factor 가 현재 설정(BCRYPT_ROUNDS)과 다르면 백그라운드에서 다시 해싱하여 저장
+            if PasswordHasher.needs_rehash(stored_password_hash):
+                PasswordHasher.rehash_in_background(
+                    password, lambda new_hash: UserAccountDB.update_password_hash(user_id, new_hash)
+                )
+
             # 로그인 성공 시: 딕셔너리 형태로 반환하여 app.py에서 키 접근 가능하도록 함
             user_data = {
                 'user_id': user_id, 
@@ -39,4 +45,4 @@ class UserService:
             }
             return True, f"✅ 로그인 성공! {uname}님 환영합니다.", user_data
         else:
-            return False, "❌ 비밀번호가 일치하지 않습니다.", None
\ No newline at end of file
+            return False, "❌ 비밀번호가 일치하지 않습니다.", None
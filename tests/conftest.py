@@ -0,0 +1,16 @@
+# tests/conftest.py
+"""
+pytest 공통 설정.
+
+저장소 루트를 import 경로에 추가하고, 테스트 중에는 DB 없이 동작하도록 계측/부트스트랩을 끕니다.
+DB 에 접근하는 코드는 각 테스트에서 가짜 커서/연결로 대체합니다.
+"""
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+os.environ.setdefault("METRICS_ENABLED", "0")
+os.environ.setdefault("DB_BOOTSTRAP_ON_STARTUP", "0")
@@ -0,0 +1,110 @@
+import pytest
+
+import services.cache as cache
+from services.cache import TTLCache, cached, invalidate
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache.time, "monotonic", clock)
+    return clock
+
+
+@pytest.fixture
+def app_cache(monkeypatch):
+    fresh = TTLCache(max_entries=100, ttl=60)
+    monkeypatch.setattr(cache, "app_cache", fresh)
+    monkeypatch.setattr(cache.DataVersion, "current", classmethod(lambda cls: (1, 0)))
+    return fresh
+
+
+def test_entry_expires_after_ttl(clock):
+    c = TTLCache(max_entries=10, ttl=30)
+    c.set("a", 1)
+    c.set("b", 2, ttl=5)
+
+    clock.now += 5
+    assert c.get("b") == (True, 2)
+    clock.now += 0.001
+    assert c.get("b") == (False, None)
+    assert c.get("a") == (True, 1)
+    clock.now += 25
+    assert c.get("a") == (False, None)
+    assert c.stats()['entries'] == 0
+
+
+def test_lru_eviction(clock):
+    c = TTLCache(max_entries=2, ttl=30)
+    c.set("a", 1)
+    c.set("b", 2)
+    c.get("a")                     # a 를 최근 사용으로
+    c.set("c", 3)
+
+    assert c.get("b") == (False, None)
+    assert c.get("a") == (True, 1)
+    assert c.get("c") == (True, 3)
+    assert c.stats()['evictions'] == 1
+
+
+def test_delete_where():
+    c = TTLCache()
+    for key in [("x", 1), ("x", 2), ("y", 1)]:
+        c.set(key, True)
+    assert c.delete_where(lambda key: key[0] == "x") == 2
+    assert c.get(("y", 1)) == (True, True)
+
+
+def test_cached_and_invalidate(app_cache):
+    calls = []
+
+    @cached("square")
+    def square(n):
+        calls.append(n)
+        return n * n
+
+    assert [square(2), square(2), square(3)] == [4, 4, 9]
+    assert calls == [2, 3]
+
+    assert invalidate("square", 2) == 1
+    square(2)
+    square(3)
+    assert calls == [2, 3, 2]
+
+    invalidate("square")
+    square(3)
+    assert calls == [2, 3, 2, 3]
+
+
+def test_cached_skips_results_rejected_by_should_cache(app_cache):
+    pages = iter([{'draws': []}, {'draws': [(1,)]}, {'draws': [(2,)]}])
+
+    @cached("pages", should_cache=lambda page: bool(page['draws']))
+    def load_page():
+        return next(pages)
+
+    assert load_page() == {'draws': []}            # 조회 실패는 캐시하지 않음
+    assert load_page() == {'draws': [(1,)]}
+    assert load_page() == {'draws': [(1,)]}
+
+
+def test_cached_new_data_version_misses(app_cache, monkeypatch):
+    calls = []
+
+    @cached("v")
+    def load():
+        calls.append(1)
+        return [1]
+
+    load()
+    monkeypatch.setattr(cache.DataVersion, "current", classmethod(lambda cls: (2, 0)))
+    load()
+    assert len(calls) == 2
@@ -0,0 +1,50 @@
+from itertools import combinations
+
+import numpy as np
+
+from services.combination_index import (
+    COMBINATION_COUNT, CombinationIndex, combination_rank, combination_ranks, combination_unrank
+)
+
+
+def test_rank_bounds():
+    assert combination_rank([1, 2, 3, 4, 5, 6]) == 1
+    assert combination_rank([40, 41, 42, 43, 44, 45]) == COMBINATION_COUNT == 8_145_060
+
+
+def test_rank_ignores_input_order():
+    assert combination_rank([45, 3, 17, 1, 22, 9]) == combination_rank([1, 3, 9, 17, 22, 45])
+
+
+def test_rank_unrank_round_trip():
+    rng = np.random.default_rng(3)
+    for _ in range(2000):
+        numbers = sorted(int(n) for n in rng.choice(np.arange(1, 46), size=6, replace=False))
+        rank = combination_rank(numbers)
+        assert 1 <= rank <= COMBINATION_COUNT
+        assert combination_unrank(rank) == numbers
+
+
+def test_first_ranks_cover_smallest_numbers():
+    # 앞쪽 조합 번호는 1~8 범위 번호의 모든 조합을 빠짐없이, 중복 없이 덮어야 함
+    first = [combination_unrank(r) for r in range(1, 29)]
+    assert sorted(map(tuple, first)) == sorted(combinations(range(1, 9), 6))
+    for rank in (1, 2, 1000, COMBINATION_COUNT - 1, COMBINATION_COUNT):
+        assert combination_rank(combination_unrank(rank)) == rank
+
+
+def test_vectorized_ranks_match_scalar():
+    rng = np.random.default_rng(5)
+    matrix = np.array([rng.choice(np.arange(1, 46), size=6, replace=False) for _ in range(500)])
+    assert combination_ranks(matrix).tolist() == [combination_rank(row.tolist()) for row in matrix]
+    assert combination_ranks(np.zeros((0, 6), dtype=np.int64)).shape == (0,)
+
+
+def test_index_lookup():
+    index = CombinationIndex(np.array([10, 11]), [[1, 2, 3, 4, 5, 6], [7, 8, 9, 10, 11, 12]], np.array([7, 13]))
+    assert len(index) == 2
+    assert index.exact_hits([6, 5, 4, 3, 2, 1]) == [10]
+    assert index.lookup([1, 2, 3, 4, 5, 6]) == {1: [10], 2: [], 3: []}
+    assert index.lookup([1, 2, 3, 4, 5, 7]) == {1: [], 2: [10], 3: []}
+    assert index.lookup([1, 2, 3, 4, 5, 45]) == {1: [], 2: [], 3: [10]}
+    assert index.lookup([1, 2, 3, 4, 44, 45]) == {1: [], 2: [], 3: []}
@@ -0,0 +1,69 @@
+"""
+fork 하는 서버에서의 연결 풀 동작 (db/db_config.py).
+
+풀은 생성 시 연결을 미리 열지 않고, fork 된 자식은 부모의 연결을 닫지 않고 떼어 냅니다.
+"""
+import os
+import socket
+
+import pytest
+
+import db.db_config as db_config
+from db.db_config import ConnectionPool
+
+
+class FakeConn:
+    """부모 프로세스의 DB 연결 대신 socketpair 한쪽 끝을 들고 있는 가짜 연결"""
+
+    def __init__(self, sock):
+        self.sock = sock
+        self.close_calls = 0
+
+    def fileno(self):
+        return self.sock.fileno()
+
+    def close(self):
+        self.close_calls += 1
+
+
+@pytest.fixture
+def no_connect(monkeypatch):
+    def connect(**kwargs):
+        raise AssertionError("연결을 열면 안 됩니다")
+    monkeypatch.setattr(db_config.psycopg2, "connect", connect)
+
+
+def test_pool_does_not_open_connections_on_creation(no_connect):
+    pool = ConnectionPool(minconn=3, maxconn=5)
+    status = pool.status()
+    assert status['opened'] == 0
+    assert status['idle'] == 0
+
+
+def test_child_detaches_inherited_pool_without_closing(monkeypatch, no_connect):
+    parent_end, server_end = socket.socketpair()
+    # fork 후에도 부모 프로세스가 들고 있는 같은 소켓
+    parent_copy = os.dup(parent_end.fileno())
+    inherited = ConnectionPool(minconn=1, maxconn=2)
+    conn = FakeConn(parent_end)
+    inherited._idle.append((conn, 0.0))
+
+    monkeypatch.setattr(db_config, "_pool", inherited)
+    monkeypatch.setattr(db_config, "_pool_pid", os.getpid() - 1)
+    monkeypatch.setattr(db_config, "_inherited_pools", [])
+    try:
+        child_pool = db_config.get_pool()
+
+        assert child_pool is not inherited
+        assert db_config._inherited_pools == [inherited]
+        assert conn.close_calls == 0
+        # 자식 쪽 소켓 번호는 /dev/null 을 가리키므로, 연결이 해제되어도 부모의 세션에 아무것도 보내지 않음
+        assert os.fstat(conn.fileno()).st_rdev == os.stat(os.devnull).st_rdev
+        server_end.setblocking(False)
+        with pytest.raises(BlockingIOError):
+            server_end.recv(1)
+    finally:
+        os.close(parent_copy)
+        parent_end.close()
+        server_end.close()
+        db_config._pool = None
@@ -0,0 +1,132 @@
+import numpy as np
+import pytest
+
+import services.draw_store as draw_store
+from services.draw_store import (
+    DrawStore, RANKS, numbers_to_mask, picks_to_masks, popcount64, rank_counts, rank_histograms, rank_matrix
+)
+
+
+def naive_rank(ticket, draw, bonus):
+    """일치 개수를 직접 세어 등수를 계산합니다. (비교 기준)"""
+    match = len(set(ticket) & set(draw))
+    if match == 6:
+        return 1
+    if match == 5:
+        return 2 if bonus in ticket else 3
+    return {4: 4, 3: 5}.get(match, 0)
+
+
+@pytest.fixture
+def sample():
+    """무작위 회차 + 1~3등이 반드시 나오도록 만든 티켓을 섞은 데이터"""
+    rng = np.random.default_rng(7)
+    draws, bonuses = [], []
+    for _ in range(60):
+        picked = rng.choice(np.arange(1, 46), size=7, replace=False)
+        draws.append(sorted(int(n) for n in picked[:6]))
+        bonuses.append(int(picked[6]))
+
+    tickets = [sorted(int(n) for n in rng.choice(np.arange(1, 46), size=6, replace=False)) for _ in range(300)]
+    for draw, bonus in zip(draws[:5], bonuses[:5]):
+        others = [n for n in range(1, 46) if n not in draw and n != bonus]
+        tickets.append(list(draw))                                  # 1등
+        tickets.append(sorted(draw[1:] + [bonus]))                  # 2등
+        tickets.append(sorted(draw[1:] + [others[0]]))             # 3등
+        tickets.append(sorted(draw[2:] + others[:2]))               # 4등
+    return tickets, draws, bonuses
+
+
+def test_numbers_to_mask_matches_picks_to_masks():
+    picks = [[1, 2, 3, 4, 5, 6], [40, 41, 42, 43, 44, 45], [3, 11, 19, 27, 35, 45]]
+    assert picks_to_masks(picks).tolist() == [numbers_to_mask(p) for p in picks]
+    assert picks_to_masks([]).shape == (0,)
+
+
+def test_popcount64():
+    values = np.array([0, 1, 0b1011, (1 << 45) - 1, (1 << 64) - 1], dtype=np.uint64)
+    assert popcount64(values).tolist() == [0, 1, 3, 45, 64]
+
+
+def test_rank_matrix_matches_naive(sample):
+    tickets, draws, bonuses = sample
+    ranks = rank_matrix(picks_to_masks(tickets), picks_to_masks(draws), picks_to_masks([[b] for b in bonuses]))
+
+    expected = [[naive_rank(t, d, b) for d, b in zip(draws, bonuses)] for t in tickets]
+    assert ranks.tolist() == expected
+    # 만든 티켓으로 1~5등이 모두 나와야 비교가 의미 있음
+    assert set(np.unique(ranks)) == {0, 1, 2, 3, 4, 5}
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 256])
+def test_rank_histograms_match_naive(sample, chunk_size):
+    tickets, draws, bonuses = sample
+    histograms = rank_histograms(picks_to_masks(tickets), picks_to_masks(draws),
+                                 picks_to_masks([[b] for b in bonuses]), chunk_size=chunk_size)
+
+    for ticket, row in zip(tickets, histograms):
+        ranks = [naive_rank(ticket, d, b) for d, b in zip(draws, bonuses)]
+        assert row.tolist() == [ranks.count(rank) for rank in range(6)]
+    assert (histograms.sum(axis=1) == len(draws)).all()
+
+
+def test_rank_histograms_empty():
+    draws = picks_to_masks([[1, 2, 3, 4, 5, 6]])
+    assert rank_histograms(np.zeros(0, dtype=np.uint64), draws, draws).shape == (0, 6)
+
+
+def test_rank_counts():
+    counts = rank_counts(np.array([[0, 1, 5], [5, 0, 0]], dtype=np.int8))
+    assert list(counts) == list(RANKS)
+    assert counts == {1: 1, 2: 0, 3: 0, 4: 0, 5: 2, 0: 3}
+
+
+@pytest.fixture
+def data_version(monkeypatch):
+    """DataVersion 을 DB 대신 테스트가 정하는 값으로 고정하고, DrawStore 를 빈 상태에서 시작합니다."""
+    current = [(1, 0)]
+    monkeypatch.setattr(draw_store.DataVersion, "current", classmethod(lambda cls: current[0]))
+    monkeypatch.setattr(DrawStore, "_loaded", False)
+    monkeypatch.setattr(DrawStore, "_data_version", None)
+    monkeypatch.setattr(DrawStore, "version", 0)
+    return current
+
+
+def test_reload_failure_keeps_previous_arrays(monkeypatch, data_version):
+    rows = [(2, 1, 2, 3, 4, 5, 6, 7), (1, 8, 9, 10, 11, 12, 13, 14)]
+    monkeypatch.setattr(draw_store.LottoDrawDB, "get_all_draws", staticmethod(lambda: rows))
+    DrawStore.ensure_loaded()
+    assert DrawStore.version == 1
+    assert DrawStore.snapshot()[0].tolist() == [2, 1]
+
+    # DB 오류: get_all_draws 는 [] 를, 서명 조회는 None 을 반환
+    DrawStore.invalidate()
+    monkeypatch.setattr(draw_store.LottoDrawDB, "get_all_draws", staticmethod(lambda: []))
+    monkeypatch.setattr(draw_store.LottoDrawDB, "get_draw_signature", staticmethod(lambda: None))
+    draw_nos, masks, _ = DrawStore.snapshot()
+    assert draw_nos.tolist() == [2, 1]
+    assert len(masks) == 2
+    assert DrawStore.version == 1
+    assert not DrawStore._loaded
+
+    # 실제로 비어 있는 경우에는 빈 배열로 교체
+    monkeypatch.setattr(draw_store.LottoDrawDB, "get_draw_signature", staticmethod(lambda: (0, None)))
+    assert DrawStore.snapshot()[0].tolist() == []
+    assert DrawStore.version == 2
+
+
+def test_in_place_correction_reloads_on_data_version(monkeypatch, data_version):
+    rows = [(2, 1, 2, 3, 4, 5, 6, 7), (1, 8, 9, 10, 11, 12, 13, 14)]
+    monkeypatch.setattr(draw_store.LottoDrawDB, "get_all_draws", staticmethod(lambda: rows))
+    assert DrawStore.rank_histogram([1, 2, 3, 4, 5, 6])[1] == 1
+
+    # --update 로 2회 번호만 수정 (회차 수와 최신 회차는 그대로)
+    rows = [(2, 20, 21, 22, 23, 24, 25, 26), (1, 8, 9, 10, 11, 12, 13, 14)]
+    DrawStore.ensure_loaded()
+    assert DrawStore.version == 1
+
+    # 적재 스크립트가 같은 트랜잭션에서 올린 데이터 버전을 보고 다시 읽음
+    data_version[0] = (2, 0)
+    assert DrawStore.rank_histogram([1, 2, 3, 4, 5, 6])[1] == 0
+    assert DrawStore.rank_histogram([20, 21, 22, 23, 24, 25])[1] == 1
+    assert DrawStore.version == 2
@@ -0,0 +1,102 @@
+"""
+적재 스크립트가 통계 워터마크 아래 회차의 추가/수정을 같은 트랜잭션에서 처리하는지 확인합니다. (scripts/load_lotto_data.py)
+"""
+import pandas as pd
+import pytest
+
+import scripts.load_lotto_data as loader
+from db.lotto_stat import LottoStatDB
+
+
+class FakeCursor:
+    def __init__(self, written_draws, watermark):
+        self.written_draws = list(written_draws)
+        self.watermark = watermark
+        self.executed = []
+        self.rowcount = 0
+        self._result = None
+
+    def execute(self, query, params=None):
+        sql = " ".join(query.split())
+        self.executed.append((sql, params))
+        self.rowcount = 0
+        self._result = None
+        if "FROM written" in sql:
+            self._result = (len(self.written_draws), min(self.written_draws, default=None))
+        elif sql.startswith("DELETE FROM lotto_stat_meta"):
+            if self.watermark is not None and self.watermark >= params[0]:
+                self.watermark = None
+                self.rowcount = 1
+
+    def copy_expert(self, sql, buffer):
+        pass
+
+    def fetchone(self):
+        return self._result
+
+    def close(self):
+        pass
+
+    def statements(self, needle):
+        return [(sql, params) for sql, params in self.executed if needle in sql]
+
+
+class FakeConnection:
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self.committed = False
+
+    def cursor(self):
+        return self._cursor
+
+    def commit(self):
+        self.committed = True
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def copy(monkeypatch):
+    def copy(cursor, update_existing=False):
+        conn = FakeConnection(cursor)
+        monkeypatch.setattr(loader, "get_connection", lambda: conn)
+        valid = pd.DataFrame([[1, '2002-12-07', 10, 23, 29, 33, 37, 40, 16]], columns=loader.DRAW_COLUMNS)
+        written = loader.copy_draws_to_db(valid, update_existing=update_existing)
+        assert conn.committed
+        return written
+    return copy
+
+
+def test_new_draws_above_watermark_keep_it(copy):
+    cursor = FakeCursor(written_draws=[101, 102], watermark=100)
+    assert copy(cursor) == 2
+    (_, params), = cursor.statements("DELETE FROM lotto_stat_meta")
+    assert params == (101,)
+    assert cursor.watermark == 100
+
+
+@pytest.mark.parametrize("update_existing", [False, True])
+def test_draw_at_or_below_watermark_clears_it(copy, update_existing):
+    # 누락 회차 적재(50회) 또는 --update 로 이미 반영된 회차 수정
+    cursor = FakeCursor(written_draws=[50, 101], watermark=100)
+    copy(cursor, update_existing=update_existing)
+    assert cursor.watermark is None
+    # 워터마크 삭제와 데이터 버전 증가가 적재와 같은 트랜잭션에서 실행됨
+    assert cursor.statements("app_cache_version")
+
+
+def test_nothing_written_leaves_stats_alone(copy):
+    cursor = FakeCursor(written_draws=[], watermark=100)
+    assert copy(cursor) == 0
+    assert not cursor.statements("DELETE FROM lotto_stat_meta")
+    assert cursor.watermark == 100
+
+
+def test_reset_watermark_only_when_draw_is_covered():
+    cursor = FakeCursor(written_draws=[], watermark=100)
+    assert not LottoStatDB.reset_watermark(cursor, 101)
+    assert LottoStatDB.reset_watermark(cursor, 100)
@@ -0,0 +1,138 @@
+"""
+증분 통계 갱신의 워터마크 경계 (db/lotto_stat.py).
+
+가짜 커서가 lotto_draw 의 회차 목록을 들고 있다가, 최신 회차(new_max)를 읽은 직후에
+다른 트랜잭션이 새 회차를 커밋한 상황을 흉내 냅니다.
+"""
+from contextlib import contextmanager
+
+import pytest
+
+import db.lotto_stat as lotto_stat
+from db.lotto_stat import INCREMENTAL_STAT_UPDATE, LottoStatDB
+
+
+class FakeCursor:
+    def __init__(self, draws, watermark, stat_rows=45, commit_after_max=()):
+        self.draws = list(draws)
+        self.watermark = watermark
+        self.stat_rows = stat_rows
+        self.commit_after_max = list(commit_after_max)
+        self.executed = []
+        self._result = None
+
+    def execute(self, query, params=None):
+        sql = " ".join(query.split())
+        self.executed.append((sql, params))
+        if "FOR UPDATE" in sql:
+            self._result = None if self.watermark is None else (self.watermark,)
+        elif sql == "SELECT COUNT(*) FROM lotto_stat;":
+            self._result = (self.stat_rows,)
+        elif sql == "SELECT COALESCE(MAX(draw_no), 0) FROM lotto_draw;":
+            self._result = (max(self.draws, default=0),)
+            # 최신 회차를 읽은 직후 다른 적재 트랜잭션이 커밋
+            self.draws.extend(self.commit_after_max)
+        elif sql.startswith("SELECT COUNT(*) FROM lotto_draw WHERE draw_no > %s AND draw_no <= %s"):
+            low, high = params
+            self._result = (sum(low < d <= high for d in self.draws),)
+        elif "FROM lotto_pattern_stat WHERE kind = 'sum'" in sql:
+            below = sum(d <= params[0] for d in self.draws)
+            self._result = (below, below)
+        else:
+            self._result = None
+
+    def fetchone(self):
+        return self._result
+
+    def close(self):
+        pass
+
+    def statements(self, needle):
+        return [(sql, params) for sql, params in self.executed if needle in sql]
+
+
+class FakeConnection:
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self.committed = False
+
+    def cursor(self):
+        return self._cursor
+
+    def commit(self):
+        self.committed = True
+
+    def rollback(self):
+        pass
+
+
+@pytest.fixture
+def run(monkeypatch):
+    def run(cursor, mode='incremental'):
+        conn = FakeConnection(cursor)
+
+        @contextmanager
+        def pooled_connection():
+            yield conn
+
+        monkeypatch.setattr(lotto_stat, "pooled_connection", pooled_connection)
+        success, msg = LottoStatDB.update_statistics_transaction(mode)
+        assert success, msg
+        assert conn.committed
+        return msg
+    return run
+
+
+def saved_watermark(cursor):
+    saves = cursor.statements("INSERT INTO lotto_stat_meta")
+    assert len(saves) == 1
+    return saves[0][1][0]
+
+
+def test_incremental_update_is_bounded_by_captured_max(run):
+    cursor = FakeCursor(draws=range(1, 106), watermark=100, commit_after_max=[106])
+    run(cursor)
+
+    (_, params), = cursor.statements("UPDATE lotto_stat s")
+    assert params == {'watermark': 100, 'new_max': 105}
+    # 패턴 통계도 같은 범위만 더함
+    for _, pattern_params in cursor.statements("INSERT INTO lotto_pattern_stat"):
+        assert pattern_params == {'watermark': 100, 'upper': 105}
+    # 갱신 도중 커밋된 106 회는 건너뛰지 않도록 워터마크는 105
+    assert saved_watermark(cursor) == 105
+
+
+def test_draw_committed_mid_refresh_is_applied_next_time(run):
+    first = FakeCursor(draws=range(1, 106), watermark=100, commit_after_max=[106])
+    run(first)
+
+    second = FakeCursor(draws=first.draws, watermark=saved_watermark(first))
+    msg = run(second)
+    (_, params), = second.statements("UPDATE lotto_stat s")
+    assert params == {'watermark': 105, 'new_max': 106}
+    assert "1개 회차" in msg
+    assert saved_watermark(second) == 106
+
+
+def test_update_statement_has_upper_bound():
+    sql = " ".join(INCREMENTAL_STAT_UPDATE.split())
+    assert "WHERE draw_no > %(watermark)s AND draw_no <= %(new_max)s" in sql
+
+
+def test_no_new_draws_keeps_watermark(run):
+    cursor = FakeCursor(draws=range(1, 101), watermark=100, commit_after_max=[101])
+    msg = run(cursor)
+    assert "새로 추가된 회차가 없습니다" in msg
+    assert not cursor.statements("UPDATE lotto_stat s")
+    assert not cursor.statements("INSERT INTO lotto_stat_meta")
+
+
+@pytest.mark.parametrize("watermark, stat_rows", [(None, 45), (100, 44)])
+def test_falls_back_to_full_rebuild_with_captured_max(run, watermark, stat_rows):
+    cursor = FakeCursor(draws=range(1, 106), watermark=watermark, stat_rows=stat_rows, commit_after_max=[106])
+    run(cursor)
+
+    assert not cursor.statements("UPDATE lotto_stat s")
+    (_, params), = cursor.statements("INSERT INTO lotto_stat (number, frequency, last_draw_gap)")
+    assert params == {'upper': 105}
+    assert saved_watermark(cursor) == 105
@@ -0,0 +1,50 @@
+"""
+해싱 프로세스 풀의 워커가 죽은 뒤의 복구 (services/password_hasher.py).
+"""
+import os
+
+import pytest
+
+from services.password_hasher import PasswordHasher, PasswordHasherBusyError, _hash_password
+
+
+def _crash_worker():
+    os._exit(1)
+
+
+@pytest.fixture
+def hasher(monkeypatch):
+    monkeypatch.setattr(PasswordHasher, "WORKERS", 1)
+    monkeypatch.setattr(PasswordHasher, "ROUNDS", 4)
+    monkeypatch.setattr(PasswordHasher, "_executor", None)
+    monkeypatch.setattr(PasswordHasher, "_executor_pid", None)
+    yield PasswordHasher
+    if PasswordHasher._executor is not None:
+        PasswordHasher._executor.shutdown()
+
+
+def test_dead_worker_maps_to_busy_and_pool_recovers(hasher):
+    assert hasher.check_password("secret", hasher.hash_password("secret"))
+    broken = hasher._executor
+    restarts = hasher.stats()['pool_restarts']
+
+    with pytest.raises(PasswordHasherBusyError):
+        hasher._wait(hasher._submit('hash', _crash_worker))
+
+    # 다음 요청은 새 풀에서 처리
+    assert hasher.check_password("secret", hasher.hash_password("secret"))
+    assert hasher._executor is not broken
+    assert hasher.stats()['pool_restarts'] == restarts + 1
+
+
+def test_submit_to_already_broken_pool_retries_on_new_pool(hasher):
+    hasher._get_executor()
+    broken = hasher._executor
+    with pytest.raises(PasswordHasherBusyError):
+        hasher._wait(hasher._submit('hash', _crash_worker))
+    # 완료 콜백 전에 다른 요청이 깨진 풀을 잡은 경우를 흉내 냄
+    hasher._executor = broken
+
+    hashed = hasher._wait(hasher._submit('hash', _hash_password, b"secret", 4))
+    assert hasher.check_password("secret", hashed)
+    assert hasher._executor is not broken
@@ -0,0 +1,76 @@
+"""StatLookup / PatternStats 의 데이터 버전 기록 (DB 오류와 빈 통계 구분)"""
+import pytest
+
+import services.cache as cache
+import services.pattern_stats as pattern_stats
+import services.stat_service as stat_service
+from services.pattern_stats import PatternStats
+from services.stat_service import StatLookup
+
+
+class Calls:
+    def __init__(self, *results):
+        self.results = list(results)
+        self.count = 0
+
+    def __call__(self):
+        self.count += 1
+        return self.results.pop(0) if len(self.results) > 1 else self.results[0]
+
+
+@pytest.fixture(autouse=True)
+def isolated(monkeypatch):
+    monkeypatch.setattr(cache, "app_cache", cache.TTLCache())
+    monkeypatch.setattr(cache.DataVersion, "current", classmethod(lambda cls: (1, 0)))
+    for target in (StatLookup, PatternStats):
+        monkeypatch.setattr(target, "_version", None)
+    monkeypatch.setattr(StatLookup, "_mean_frequency", 0.0)
+    monkeypatch.setattr(PatternStats, "_total_draws", 0)
+
+
+def stats_rows(frequency):
+    return [{'number': n, 'frequency': frequency, 'last_draw_gap': 1} for n in range(1, 46)]
+
+
+def test_stat_lookup_empty_stats_are_loaded_once(monkeypatch):
+    load = Calls([])
+    monkeypatch.setattr(stat_service.LottoStatDB, "get_all_stats", staticmethod(load))
+    for _ in range(3):
+        assert StatLookup.mean_frequency() == 0
+    assert load.count == 1
+
+
+def test_stat_lookup_db_error_is_retried_and_keeps_previous(monkeypatch):
+    load = Calls(stats_rows(7), None, stats_rows(9))
+    monkeypatch.setattr(stat_service.LottoStatDB, "get_all_stats", staticmethod(load))
+    assert StatLookup.mean_frequency() == 7
+
+    # 새 데이터 버전에서 DB 오류 → 이전 값 유지, 다음 요청에서 다시 시도
+    monkeypatch.setattr(cache.DataVersion, "current", classmethod(lambda cls: (2, 0)))
+    assert StatLookup.mean_frequency() == 7
+    assert StatLookup.get_stat_for_numbers([1])[0]['frequency'] == 9
+    assert load.count == 3
+
+
+def patch_patterns(monkeypatch, distributions, pairs, triples):
+    db = pattern_stats.LottoPatternStatDB
+    monkeypatch.setattr(db, "get_distributions", staticmethod(distributions))
+    monkeypatch.setattr(db, "get_pair_counts", staticmethod(pairs))
+    monkeypatch.setattr(db, "get_triple_counts", staticmethod(triples))
+
+
+def test_pattern_stats_empty_tables_are_loaded_once(monkeypatch):
+    distributions = Calls([])
+    patch_patterns(monkeypatch, distributions, Calls([]), Calls([]))
+    for _ in range(3):
+        assert PatternStats.total_draws() == 0
+    assert distributions.count == 1
+
+
+def test_pattern_stats_db_error_is_retried(monkeypatch):
+    distributions = Calls(None, [('sum', 100, 3)])
+    patch_patterns(monkeypatch, distributions, Calls([]), Calls([]))
+    assert PatternStats.total_draws() == 0
+    assert PatternStats.total_draws() == 3
+    assert PatternStats.total_draws() == 3
+    assert distributions.count == 2
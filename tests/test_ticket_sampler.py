@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+from services.combination_index import combination_ranks
+from services.ticket_sampler import constraint_mask, sample_tickets, score_weights
+
+
+@pytest.fixture
+def weights():
+    return np.linspace(1.0, 3.0, 45)
+
+
+def test_tickets_are_sorted_valid_and_distinct(weights):
+    tickets = sample_tickets(weights, 2000, np.random.default_rng(1))
+
+    assert tickets.shape == (2000, 6)
+    assert ((tickets >= 1) & (tickets <= 45)).all()
+    assert (np.diff(tickets, axis=1) > 0).all()            # 정렬 + 번호 중복 없음
+    assert len(np.unique(combination_ranks(tickets))) == len(tickets)
+
+
+def test_constraints_are_respected(weights):
+    sum_band, odd_counts, low_counts = (110, 160), (2, 3), (3,)
+    exclude = (1, 7, 13, 45)
+    tickets = sample_tickets(weights, 500, np.random.default_rng(2), exclude=exclude,
+                             sum_band=sum_band, odd_counts=odd_counts, low_counts=low_counts)
+
+    assert len(tickets) == 500
+    sums = tickets.sum(axis=1)
+    assert ((sums >= sum_band[0]) & (sums <= sum_band[1])).all()
+    assert np.isin((tickets % 2).sum(axis=1), odd_counts).all()
+    assert ((tickets <= 22).sum(axis=1) == 3).all()
+    assert not np.isin(tickets, exclude).any()
+    assert constraint_mask(tickets, sum_band, odd_counts, low_counts).all()
+
+
+def test_distinct_from_is_never_returned(weights):
+    # 번호 7개만 남기면 가능한 조합은 C(7, 6) = 7 개
+    allowed = [3, 8, 15, 21, 30, 36, 42]
+    exclude = [n for n in range(1, 46) if n not in allowed]
+    saved = [[3, 8, 15, 21, 30, 36], [8, 15, 21, 30, 36, 42]]
+
+    tickets = sample_tickets(weights, 10, np.random.default_rng(3), exclude=exclude, distinct_from=saved)
+
+    assert len(tickets) == 5
+    assert not np.isin(combination_ranks(tickets), combination_ranks(saved)).any()
+    assert len(np.unique(combination_ranks(tickets))) == 5
+
+
+def test_same_seed_reproduces(weights):
+    first = sample_tickets(weights, 50, np.random.default_rng(9), sum_band=(100, 170))
+    second = sample_tickets(weights, 50, np.random.default_rng(9), sum_band=(100, 170))
+    assert np.array_equal(first, second)
+
+
+def test_unsatisfiable_constraints(weights):
+    assert sample_tickets(weights, 5, np.random.default_rng(4), sum_band=(0, 20)).shape == (0, 6)
+    with pytest.raises(ValueError):
+        sample_tickets(weights, 5, np.random.default_rng(4), exclude=range(1, 41))
+
+
+def test_score_weights_prefer_low_total_score():
+    stats = [{'number': n, 'frequency': n, 'last_draw_gap': n} for n in range(1, 46)]
+    weights = score_weights(stats, avoid=[45], avoid_factor=0.5)
+
+    assert weights.shape == (45,)
+    # 45 는 빈도/간격 모두 1위(가중치 1)지만 회피 배율이 적용되고, 나머지는 번호가 클수록 가중치가 큼
+    assert weights[44] == pytest.approx(0.5)
+    assert weights[43] < 1.0
+    assert np.all(np.diff(weights[:44]) > 0)
+    assert score_weights(stats[:-1]) is None